@@ -0,0 +1,57 @@
+import inspect
+from functools import wraps
+
+from fastapi import APIRouter, Depends
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db, get_async_db
+
+
+# Асинхронные версии эндпоинтов: sync-обработчик выполняется через AsyncSession.run_sync
+# в greenlet на соединении asyncpg, поэтому запрос не занимает поток из threadpool.
+def to_async_endpoint(endpoint):
+    signature = inspect.signature(endpoint)
+    db_param = next((name for name, param in signature.parameters.items()
+                     if isinstance(param.default, DependsParam) and param.default.dependency is get_db), None)
+    if db_param is None:
+        return endpoint
+
+    @wraps(endpoint)
+    async def async_endpoint(**kwargs):
+        db: AsyncSession = kwargs.pop(db_param)
+        return await db.run_sync(lambda session: endpoint(**kwargs, **{db_param: session}))
+
+    async_endpoint.__signature__ = signature.replace(parameters=[
+        param.replace(default=Depends(get_async_db), annotation=AsyncSession) if name == db_param else param
+        for name, param in signature.parameters.items()
+    ])
+    return async_endpoint
+
+
+def to_async_router(router: APIRouter) -> APIRouter:
+    async_router = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            async_router.routes.append(route)
+            continue
+        async_router.add_api_route(
+            route.path,
+            to_async_endpoint(route.endpoint),
+            response_model=route.response_model,
+            response_model_exclude_none=route.response_model_exclude_none,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+        )
+    return async_router
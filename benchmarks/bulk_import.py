@@ -0,0 +1,97 @@
+# Массовый импорт против поштучных POST .../new: 100000 тендеров и 100000 предложений.
+# Поштучный путь измеряется на --sample запросах и пересчитывается на весь объем.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/bulk_import.py --rows 100000
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+import orjson
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from main import app  # noqa: E402
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def seed():
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    author = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible, author])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+    db.commit()
+    db.close()
+    return str(organization.id), responsible.username, str(author.id)
+
+
+def ndjson(items):
+    return b"\n".join(orjson.dumps(item) for item in items)
+
+
+def measure_single(client, path, items):
+    started = time.perf_counter()
+    for item in items:
+        response = client.post(path, json=item)
+        assert response.status_code == 200, response.text
+    return time.perf_counter() - started
+
+
+def measure_bulk(client, path, items):
+    started = time.perf_counter()
+    response = client.post(path, content=ndjson(items), headers=NDJSON)
+    elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["failed"] == 0, result["items"][:5]
+    return elapsed
+
+
+def report(rows, sample, single, bulk):
+    return {
+        "rows": rows,
+        "single_rows_per_second": round(sample / single, 1),
+        "single_estimated_seconds": round(single / sample * rows, 1),
+        "bulk_seconds": round(bulk, 2),
+        "bulk_rows_per_second": round(rows / bulk, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--sample", type=int, default=1000)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    organization_id, username, author_id = seed()
+    tender = {"name": "benchmark", "description": "benchmark", "serviceType": "Construction",
+              "organizationId": organization_id, "creatorUsername": username}
+
+    results = {}
+    single = measure_single(client, "/api/tenders/new", [tender] * args.sample)
+    bulk = measure_bulk(client, "/api/tenders/bulk", [tender] * args.rows)
+    results["tenders"] = report(args.rows, args.sample, single, bulk)
+
+    tender_id = client.post("/api/tenders/new", json=tender).json()["id"]
+    client.put(f"/api/tenders/{tender_id}/status", params={"status": "Published", "username": username})
+    bid = {"name": "benchmark", "description": "benchmark", "tenderId": tender_id,
+           "authorType": "User", "authorId": author_id}
+    single = measure_single(client, "/api/bids/new", [bid] * args.sample)
+    bulk = measure_bulk(client, "/api/bids/bulk", [bid] * args.rows)
+    results["bids"] = report(args.rows, args.sample, single, bulk)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# Параллельные правки одного тендера: сотни PATCH /api/tenders/{id}/edit одновременно.
+# Проверяет, что версии в tenderVersion идут подряд без дублей и пропусков, и печатает пропускную способность.
+# Сервер запускается отдельно с нужным VERSION_MODE и HISTORY_RETENTION=0, база — из переменных POSTGRES_*:
+#   VERSION_MODE=cas uvicorn main:app
+#   python benchmarks/concurrent_edits.py --edits 500 --concurrency 50
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+
+
+def seed():
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+    db.commit()
+    db.close()
+    return str(organization.id), responsible.username
+
+
+# Конфликт (409/412) повторяется: клиент перечитывает версию и отправляет правку снова
+async def edit(client, tender_id, username, number, stats):
+    while True:
+        started = time.perf_counter()
+        response = await client.patch(f"/api/tenders/{tender_id}/edit", params={"username": username},
+                                      json={"description": f"edit {number}"})
+        stats["latencies"].append(time.perf_counter() - started)
+        if response.status_code == 200:
+            stats["versions"].append(response.json()["version"])
+            return
+        if response.status_code not in (409, 412):
+            raise AssertionError(response.text)
+        stats["conflicts"] += 1
+
+
+async def run(base_url, edits, concurrency):
+    organization_id, username = seed()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        tender = (await client.post("/api/tenders/new", json={
+            "name": "benchmark", "description": "benchmark", "serviceType": "Construction",
+            "organizationId": organization_id, "creatorUsername": username
+        })).json()
+
+        stats = {"versions": [], "latencies": [], "conflicts": 0}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(number):
+            async with semaphore:
+                await edit(client, tender["id"], username, number, stats)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(limited(number) for number in range(edits)))
+        elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    history = [row.version for row in db.query(models.TenderVersion.version).filter(
+        models.TenderVersion.tenderId == tender["id"]).order_by(models.TenderVersion.version)]
+    current = db.query(models.Tender.version).filter(models.Tender.id == tender["id"]).scalar()
+    db.close()
+
+    expected = list(range(1, edits + 2))
+    latencies = sorted(stats["latencies"])
+    return {
+        "edits": edits,
+        "concurrency": concurrency,
+        "conflicts": stats["conflicts"],
+        "edits_per_second": round(edits / elapsed, 1),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000, 2),
+        "current_version": current,
+        "versions_contiguous": history == expected and current == edits + 1,
+        "responses_unique": sorted(stats["versions"]) == expected[1:],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--edits", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.base_url, args.edits, args.concurrency))
+    print(json.dumps(result, indent=2))
+    if not (result["versions_contiguous"] and result["responses_unique"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# Лента изменений: задержка от отправки PUT /api/tenders/{tenderId}/status до события в потоке GET /api/events/
+# и поведение при медленном подписчике (очередь переполняется — событие overflow и закрытие потока).
+# EVENTS_BROKER=memory проверяет рассылку внутри процесса, EVENTS_BROKER=postgres — через NOTIFY.
+# Поток читается вызовом приложения по ASGI в отдельном потоке: TestClient отдает тело ответа только после его
+# завершения, а поток событий не завершается.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/events.py --changes 200
+import argparse
+import asyncio
+import json
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from events import OVERFLOW, broker, events_broker, events_queue_size  # noqa: E402
+from main import app  # noqa: E402
+
+
+def seed():
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+    tender = models.Tender(id=uuid.uuid4(), name="benchmark", description="benchmark", version=1,
+                           serviceType=models.TenderServiceType.CONSTRUCTION,
+                           status=models.TenderStatus.CREATED, organizationId=organization.id)
+    db.add(tender)
+    db.commit()
+    result = responsible.username, str(tender.id)
+    db.close()
+    return result
+
+
+def subscribe(params: dict, received: queue.Queue, connected: threading.Event):
+    state = {"requested": False, "buffer": b""}
+
+    async def receive():
+        if not state["requested"]:
+            state["requested"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # клиент не отключается до конца прогона
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message["status"]
+        elif message["type"] == "http.response.body":
+            *lines, state["buffer"] = (state["buffer"] + message.get("body", b"")).split(b"\n")
+            for line in lines:
+                if line.startswith(b": connected"):
+                    connected.set()
+                elif line.startswith(b"data:"):
+                    received.put((time.perf_counter(), json.loads(line.removeprefix(b"data:"))))
+
+    path = "/api/events/"
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": urlencode(params).encode(),
+        "headers": [(b"host", b"benchmark")], "client": ("127.0.0.1", 0), "server": ("benchmark", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+
+
+def delivery_latency(client: TestClient, username: str, tender_id: str, changes: int) -> dict:
+    received = queue.Queue()
+    connected = threading.Event()
+    threading.Thread(target=subscribe, args=({"username": username, "tenderId": tender_id}, received, connected),
+                     daemon=True).start()
+    assert connected.wait(10), "subscription was not established"
+
+    latencies = []
+    for index in range(changes):
+        status = "Published" if index % 2 == 0 else "Created"
+        started = time.perf_counter()
+        response = client.put(f"/api/tenders/{tender_id}/status", params={"status": status, "username": username})
+        assert response.status_code == 200, response.text
+        delivered, change = received.get(timeout=10)
+        assert change["status"] == status, change
+        latencies.append((delivered - started) * 1000)
+    return {"p50_ms": round(statistics.median(latencies), 3), "max_ms": round(max(latencies), 3)}
+
+
+async def slow_consumer() -> bool:
+    subscription = broker.subscribe(tender_id="slow", organization_id=None)
+    broker.publish([{"type": "tender.status", "tenderId": "slow", "organizationId": "slow"}] * (events_queue_size + 1))
+    await asyncio.sleep(0.1)
+    drained = []
+    while not subscription.queue.empty():
+        drained.append(subscription.queue.get_nowait())
+    broker.unsubscribe(subscription)
+    return drained == [OVERFLOW]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--changes", type=int, default=200)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    username, tender_id = seed()
+
+    results = {
+        "broker": events_broker,
+        "delivery": delivery_latency(client, username, tender_id, args.changes),
+        "slow_consumer_overflow": asyncio.run(slow_consumer()),
+        "stats": client.get("/api/events/stats").json(),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
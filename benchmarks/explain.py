@@ -0,0 +1,161 @@
+# Проверка планов запросов роутеров: каждый запрос к заполненной базе должен идти по индексу.
+# Запросы не переписываются вручную: обработчики вызываются через приложение, а SQL, который они отправляют
+# в базу (before_cursor_execute), объясняется с теми же параметрами — resolve_identity, проекции списков,
+# пакетные статусы, дашборд, поиск, чтение версии для отката. Пишущие обработчики не вызываются,
+# откат запрашивает версию 0 и завершается 404 до изменения данных.
+# Запуск против базы из переменных окружения POSTGRES_* после alembic upgrade head и заполнения данными:
+#   python benchmarks/seed.py --tenders 100000 && python benchmarks/explain.py
+# Завершается с кодом 1, если в плане какого-либо запроса есть Seq Scan (в том числе параллельный), обработчик
+# ответил не так, как ожидалось, или в базе нет данных для проверки — на пустых таблицах планировщик выбирает
+# Seq Scan и проверка ничего не доказывает.
+import json
+import os
+import sys
+
+# Кэши скрыли бы запросы за попаданиями; поиск — средствами Postgres
+for name, value in {"DB_MODE": "sync", "LIST_CACHE_BACKEND": "none", "CACHE_TTL": "0",
+                    "SEARCH_BACKEND": "postgres"}.items():
+    os.environ[name] = value
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, select, text  # noqa: E402
+from sqlalchemy.orm import aliased  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import engine  # noqa: E402
+from main import app  # noqa: E402
+
+captured = {"statements": None}
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def capture_statement(connection, cursor, statement, parameters, context, executemany):
+    if captured["statements"] is not None:
+        captured["statements"].append((statement, parameters))
+
+
+class EmptyTable(Exception):
+    pass
+
+
+def first_row(connection, query, name):
+    row = connection.execute(query.limit(1)).first()
+    if row is None:
+        raise EmptyTable(name)
+    return row
+
+
+# Ответственный организации, ее тендер с предложением и автор предложения; автор отзывов
+def sample(connection):
+    author = aliased(models.Employee)
+    subject = first_row(connection, select(
+        models.Employee.username.label("responsible"), models.Tender.organizationId,
+        models.Tender.id.label("tender"), models.Tender.name.label("tender_name"), models.Tender.serviceType,
+        models.Bid.id.label("bid"), models.Bid.name.label("bid_name"), author.username.label("author")
+    ).join(models.OrganizationResponsible, models.OrganizationResponsible.user_id == models.Employee.id)
+        .join(models.Tender, models.Tender.organizationId == models.OrganizationResponsible.organization_id)
+        .join(models.Bid, models.Bid.tenderId == models.Tender.id)
+        .join(author, author.id == models.Bid.authorId), "bid")
+    reviewer = first_row(connection, select(models.Employee.username).join(
+        models.BidReview, models.BidReview.bidAuthorId == models.Employee.id), "bidReview")
+    return subject, reviewer.username
+
+
+def router_calls(client, subject, review_author):
+    tender, bid = str(subject.tender), str(subject.bid)
+    responsible, author = subject.responsible, subject.author
+
+    def next_page(path, params):
+        cursor = client.get(path, params=params).headers.get("X-Next-Cursor")
+        return client.get(path, params={**params, "cursor": cursor} if cursor else params)
+
+    return {
+        "get_tenders": (200, lambda: client.get("/api/tenders/")),
+        "get_tenders cursor": (200, lambda: next_page("/api/tenders/", {})),
+        "get_tenders service_type": (200, lambda: client.get("/api/tenders/", params={
+            "service_type": subject.serviceType.value})),
+        "get_user_tenders": (200, lambda: client.get("/api/tenders/my", params={"username": responsible})),
+        "get_tenders_status": (200, lambda: client.get("/api/tenders/status", params={
+            "username": responsible, "ids": [tender]})),
+        "get_organization_stats": (200, lambda: client.get("/api/tenders/stats", params={
+            "username": responsible, "organizationId": str(subject.organizationId)})),
+        "get_tender_stats": (200, lambda: client.get(f"/api/tenders/{tender}/stats",
+                                                     params={"username": responsible})),
+        "get_tender_status": (200, lambda: client.get(f"/api/tenders/{tender}/status",
+                                                      params={"username": responsible})),
+        "search_tenders": (200, lambda: client.get("/api/tenders/search", params={"q": subject.tender_name})),
+        "search_tenders fuzzy": (200, lambda: client.get("/api/tenders/search", params={
+            "q": subject.tender_name, "fuzzy": True})),
+        "rollback_tender version": (404, lambda: client.put(f"/api/tenders/{tender}/rollback/0",
+                                                            params={"username": responsible})),
+        "get_employee_bids": (200, lambda: client.get("/api/bids/my", params={"username": author})),
+        "get_bids_status": (200, lambda: client.get("/api/bids/status", params={"username": author, "ids": [bid]})),
+        "get_bid_status": (200, lambda: client.get(f"/api/bids/{bid}/status", params={"username": author})),
+        "get_bids_tender": (200, lambda: client.get(f"/api/bids/{tender}/list", params={"username": responsible})),
+        "get_bids_tender cursor": (200, lambda: next_page(f"/api/bids/{tender}/list", {"username": responsible})),
+        "search_bids": (200, lambda: client.get("/api/bids/search", params={
+            "q": subject.bid_name, "username": author})),
+        "search_bids fuzzy": (200, lambda: client.get("/api/bids/search", params={
+            "q": subject.bid_name, "username": author, "fuzzy": True})),
+        "rollback_bid version": (404, lambda: client.put(f"/api/bids/{bid}/rollback/0", params={"username": author})),
+        "get_reviews": (200, lambda: client.get(f"/api/bids/{tender}/reviews", params={
+            "authorUsername": review_author, "requesterUsername": responsible})),
+    }
+
+
+def seq_scans(plan):
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        found += seq_scans(child)
+    return found
+
+
+def reads(statements):
+    seen = set()
+    for statement, parameters in statements:
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "WITH") and statement not in seen:
+            seen.add(statement)
+            yield statement, parameters
+
+
+def main():
+    failed = []
+    with engine.connect() as connection:
+        connection.execute(text("ANALYZE"))
+        try:
+            subject, review_author = sample(connection)
+        except EmptyTable as exc:
+            print(f"no data in {exc}: fill the database with benchmarks/seed.py first", file=sys.stderr)
+            sys.exit(1)
+        connection.commit()
+
+        client = TestClient(app)
+        for name, (status, call) in router_calls(client, subject, review_author).items():
+            captured["statements"] = []
+            response = call()
+            statements, captured["statements"] = captured["statements"], None
+            if response.status_code != status:
+                failed.append(name)
+                print(f"{'STATUS':8} {name} {response.status_code}, expected {status}")
+                continue
+            for number, (statement, parameters) in enumerate(reads(statements), 1):
+                plan = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                tables = seq_scans(plan[0]["Plan"])
+                if tables:
+                    failed.append(f"{name} #{number}")
+                print(f"{'SEQ SCAN' if tables else 'ok':8} {name} #{number} {', '.join(tables)}")
+                if tables:
+                    print(statement, file=sys.stderr)
+    if failed:
+        print("sequential scans or unexpected responses in: " + ", ".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
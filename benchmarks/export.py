@@ -0,0 +1,117 @@
+# Потоковый экспорт 1000000 тендеров: RSS процесса снимается до запроса и каждые --every строк; если он вырос
+# больше чем на --max-growth-mb, прогон завершается с кодом 1. Приложение вызывается напрямую по ASGI, а части
+# ответа отбрасываются сразу после подсчета строк: TestClient копит тело ответа целиком и мерил бы его, а не
+# экспорт. Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/export.py --rows 1000000 --format ndjson
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from urllib.parse import urlencode
+
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from main import app  # noqa: E402
+
+
+def rss_mb():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def seed(count, batch_size=10000):
+    db = SessionLocal()
+    organization_id = uuid.uuid4()
+    db.execute(insert(models.Organization), [{
+        "id": organization_id, "name": "benchmark", "type": models.OrganizationType.LLC
+    }])
+    for start in range(0, count, batch_size):
+        db.execute(insert(models.Tender), [{
+            "id": uuid.uuid4(), "name": "benchmark", "description": "benchmark",
+            "serviceType": models.TenderServiceType.CONSTRUCTION, "status": models.TenderStatus.PUBLISHED,
+            "organizationId": organization_id, "version": 1
+        } for _ in range(min(batch_size, count - start))])
+        db.commit()
+    db.close()
+    return organization_id
+
+
+async def stream_export(path: str, params: dict, every: int, samples: list) -> int:
+    finished = asyncio.Event()
+    state = {"status": None, "lines": 0, "requested": False}
+
+    async def receive():
+        if not state["requested"]:
+            state["requested"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            state["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            before = state["lines"]
+            state["lines"] += message.get("body", b"").count(b"\n")
+            if state["lines"] // every > before // every:
+                samples.append({"rows": state["lines"], "rss_mb": round(rss_mb(), 1)})
+            if not message.get("more_body", False):
+                finished.set()
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": urlencode(params).encode(),
+        "headers": [(b"host", b"benchmark")], "client": ("127.0.0.1", 0), "server": ("benchmark", 80),
+    }
+    await app(scope, receive, send)
+    assert state["status"] == 200, state["status"]
+    return state["lines"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--every", type=int, default=100000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--max-growth-mb", type=float, default=50)
+    args = parser.parse_args()
+
+    organization_id = seed(args.rows)
+
+    baseline = rss_mb()
+    samples = []
+    started = time.perf_counter()
+    lines = asyncio.run(stream_export("/api/tenders/export",
+                                      {"organizationId": str(organization_id), "format": args.format},
+                                      args.every, samples))
+    elapsed = time.perf_counter() - started
+    samples.append({"rows": lines, "rss_mb": round(rss_mb(), 1)})
+
+    rows = lines - (1 if args.format == "csv" else 0)
+    growth = max(sample["rss_mb"] for sample in samples) - baseline
+    print(json.dumps({
+        "rows": rows,
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed, 1),
+        "rss_baseline_mb": round(baseline, 1),
+        "rss_growth_mb": round(growth, 1),
+        "max_growth_mb": args.max_growth_mb,
+        "samples": samples,
+    }, indent=2))
+    if rows != args.rows:
+        print(f"exported {rows} rows, expected {args.rows}", file=sys.stderr)
+        sys.exit(1)
+    if growth > args.max_growth_mb:
+        print(f"RSS grew by {growth:.1f} MB > {args.max_growth_mb} MB", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Общий кэш списков: параллельные запросы к холодной записи (single-flight) и доля попаданий при опросе.
+# Запускается с нужным бэкендом, для redis подойдет локальный сервер с протоколом Redis:
+#   docker run -p 6379:6379 valkey/valkey
+#   LIST_CACHE_BACKEND=redis python benchmarks/list_cache.py --concurrency 50 --requests 2000
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import engine  # noqa: E402
+from list_cache import TENDERS_GENERATION, backend, bump_generation, list_cache_stats  # noqa: E402
+from main import app  # noqa: E402
+
+statements = {"tender_lists": 0}
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_statement(connection, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT") and "FROM tender" in statement:
+        statements["tender_lists"] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    assert backend is not None, "LIST_CACHE_BACKEND is not set"
+    bump_generation(TENDERS_GENERATION)
+    client = TestClient(app)
+    path = "/api/tenders/?limit=5"
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        responses = list(pool.map(lambda _: client.get(path), range(args.concurrency)))
+    assert all(response.status_code == 200 for response in responses)
+    cold_queries = statements["tender_lists"]
+
+    timings = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+
+    print(json.dumps({
+        "cold_concurrent_requests": args.concurrency,
+        "cold_list_queries": cold_queries,
+        "warm_list_queries": statements["tender_lists"] - cold_queries,
+        "warm_p50_ms": round(statistics.median(timings), 3),
+        "stats": list_cache_stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# Нагрузочный прогон для сравнения режимов DB_MODE=sync и DB_MODE=async.
+# Сервер запускается отдельно, например:
+#   DB_MODE=sync uvicorn main:app --workers 1
+#   python benchmarks/load.py --label sync --path /api/tenders/ --path "/api/bids/<tenderId>/list?username=<user>"
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def worker(client, path, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get(path)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 500:
+            errors.append(response.status_code)
+
+
+async def run_path(base_url, path, concurrency, duration):
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(client, path, deadline, latencies, errors) for _ in range(concurrency)))
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", action="append", required=True)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--label", default="")
+    args = parser.parse_args()
+
+    results = [await run_path(args.base_url, path, args.concurrency, args.duration) for path in args.path]
+    print(json.dumps({"label": args.label, "results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
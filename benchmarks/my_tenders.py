@@ -0,0 +1,100 @@
+# GET /api/tenders/my: прежние два запроса (все tender_user пользователя + Tender.id IN (...)) против join.
+# Пользователи с 10, 100, 1000, 10000 и 100000 тендеров, первая страница limit=5.
+# Работает с базой из переменных окружения POSTGRES_*:
+#   python benchmarks/my_tenders.py --sizes 10 100 1000 10000 100000
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+import schemas  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from serialization import list_query  # noqa: E402
+from tenders import user_tenders_query  # noqa: E402
+
+ORDER = [models.Tender.createdAt, models.Tender.id]
+
+
+def seed(db, organization_id, count, batch_size=10000):
+    user_id = uuid.uuid4()
+    db.execute(insert(models.Employee), [{"id": user_id, "username": f"bench-{user_id.hex[:12]}"}])
+    for start in range(0, count, batch_size):
+        tender_ids = [uuid.uuid4() for _ in range(min(batch_size, count - start))]
+        db.execute(insert(models.Tender), [{
+            "id": tender_id, "name": "benchmark", "description": "benchmark",
+            "serviceType": models.TenderServiceType.CONSTRUCTION, "status": models.TenderStatus.PUBLISHED,
+            "organizationId": organization_id, "version": 1
+        } for tender_id in tender_ids])
+        db.execute(insert(models.TenderUser), [{
+            "id": uuid.uuid4(), "tenderId": tender_id, "userId": user_id
+        } for tender_id in tender_ids])
+        db.commit()
+    return user_id
+
+
+def two_step(db, user_id, limit):
+    tender_ids = [row.tenderId for row in db.query(models.TenderUser).filter(models.TenderUser.userId == user_id)]
+    return list_query(db, models.Tender, schemas.Tender).filter(
+        models.Tender.id.in_(tender_ids)
+    ).order_by(*ORDER).limit(limit).all()
+
+
+def join(db, user_id, limit):
+    return user_tenders_query(db, user_id).order_by(*ORDER).limit(limit).all()
+
+
+def measure(user_id, repeat, limit, fetch):
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        start = time.perf_counter()
+        fetch(db, user_id, limit)
+        timings.append((time.perf_counter() - start) * 1000)
+        db.close()
+    return round(statistics.median(timings), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    organization_id = uuid.uuid4()
+    db.execute(insert(models.Organization), [{
+        "id": organization_id, "name": "benchmark", "type": models.OrganizationType.LLC
+    }])
+    db.commit()
+
+    results = {}
+    user_ids = []
+    try:
+        for size in args.sizes:
+            user_id = seed(db, organization_id, size)
+            user_ids.append(user_id)
+            results[size] = {
+                "two_step_p50_ms": measure(user_id, args.repeat, args.limit, two_step),
+                "join_p50_ms": measure(user_id, args.repeat, args.limit, join),
+            }
+    finally:
+        db.query(models.Tender).filter(models.Tender.organizationId == organization_id).delete()
+        db.query(models.Employee).filter(models.Employee.id.in_(user_ids)).delete()
+        db.query(models.Organization).filter(models.Organization.id == organization_id).delete()
+        db.commit()
+        db.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
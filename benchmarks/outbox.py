@@ -0,0 +1,115 @@
+# Outbox: время POST /api/tenders/new, отставание и пропускная способность воркера, падение воркера посреди пачки.
+# Упавший воркер (процесс завершается до коммита пачки) не оставляет следов: сообщения снова ожидают обработки,
+# следующий воркер выполняет их ровно один раз — у каждого тендера одна связь с создателем в tender_user.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/outbox.py --tenders 200
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import uuid
+
+os.environ["OUTBOX_MODE"] = "outbox"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+import outbox  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+
+
+def seed():
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+    db.commit()
+    result = responsible.username, str(organization.id)
+    db.close()
+    return result
+
+
+def create_tenders(client: TestClient, username: str, organization_id: str, count: int):
+    latencies, tender_ids = [], []
+    for index in range(count):
+        started = time.perf_counter()
+        response = client.post("/api/tenders/new", json={
+            "name": f"benchmark {index}", "description": "benchmark", "serviceType": "Construction",
+            "organizationId": organization_id, "creatorUsername": username,
+        })
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+        tender_ids.append(response.json()["id"])
+    return tender_ids, {"p50_ms": round(statistics.median(latencies), 3), "max_ms": round(max(latencies), 3)}
+
+
+def crashing_worker():
+    # соединения родителя не переиспользуются в дочернем процессе
+    engine.dispose(close=False)
+    db = SessionLocal()
+    db.commit = lambda: os._exit(1)
+    outbox.process_batch(db)
+
+
+def messages(db, tender_ids: list):
+    keys = [f"tender.link_user:{tender_id}" for tender_id in tender_ids]
+    return db.scalars(select(models.Outbox).where(models.Outbox.idempotencyKey.in_(keys))).all()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenders", type=int, default=200)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    username, organization_id = seed()
+    tender_ids, latency = create_tenders(client, username, organization_id, args.tenders)
+
+    process = multiprocessing.get_context("fork").Process(target=crashing_worker)
+    process.start()
+    process.join()
+    assert process.exitcode == 1, process.exitcode
+
+    db = SessionLocal()
+    assert all(message.processedAt is None for message in messages(db, tender_ids)), "crashed batch was committed"
+    db.rollback()
+
+    started = time.perf_counter()
+    outbox.run(once=True)
+    drain_seconds = time.perf_counter() - started
+
+    processed = messages(db, tender_ids)
+    links = dict(db.execute(
+        select(models.TenderUser.tenderId, func.count()).where(models.TenderUser.tenderId.in_(tender_ids))
+        .group_by(models.TenderUser.tenderId)
+    ).all())
+    lag = max(message.processedAt - message.createdAt for message in processed)
+    db.close()
+
+    assert all(message.processedAt is not None and message.attempts == 0 for message in processed)
+    assert len(links) == len(tender_ids) and set(links.values()) == {1}, links
+
+    print(json.dumps({
+        "create_tender": latency,
+        "crashed_worker_exit_code": process.exitcode,
+        "drain": {
+            "messages": len(processed),
+            "seconds": round(drain_seconds, 3),
+            "per_second": round(len(processed) / drain_seconds, 1),
+            "max_lag_seconds": round(lag.total_seconds(), 3),
+        },
+        "links_per_tender": 1,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Задержка первой и глубокой страницы списка предложений тендера: limit/offset против курсора.
+# Работает с базой из переменных окружения POSTGRES_*:
+#   python benchmarks/pagination.py --bids 1000000 --page 10000
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+from fastapi import Response
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from pagination import encode_cursor, paginate  # noqa: E402
+
+
+def seed(db, count, batch_size=10000):
+    organization_id = uuid.uuid4()
+    tender_id = uuid.uuid4()
+    db.execute(insert(models.Organization), [{
+        "id": organization_id, "name": "benchmark", "type": models.OrganizationType.LLC
+    }])
+    db.execute(insert(models.Tender), [{
+        "id": tender_id, "name": "benchmark", "description": "benchmark",
+        "serviceType": models.TenderServiceType.CONSTRUCTION,
+        "status": models.TenderStatus.PUBLISHED, "organizationId": organization_id, "version": 1
+    }])
+    for start in range(0, count, batch_size):
+        db.execute(insert(models.Bid), [{
+            "id": uuid.uuid4(), "name": f"bid-{number:09d}", "description": "benchmark",
+            "status": models.BidStatus.PUBLISHED, "tenderId": tender_id,
+            "authorType": models.BidAuthorType.USER, "authorId": uuid.uuid4(), "version": 1
+        } for number in range(start, min(start + batch_size, count))])
+    db.commit()
+    return tender_id
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bids", type=int, default=1000000)
+    parser.add_argument("--page", type=int, default=10000)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tender-id", help="использовать уже заполненный тендер")
+    args = parser.parse_args()
+
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tender_id = args.tender_id or seed(db, args.bids)
+    columns = [models.Bid.name, models.Bid.id]
+
+    def query():
+        return db.query(models.Bid).filter(models.Bid.tenderId == tender_id)
+
+    results = {"bids": args.bids, "limit": args.limit, "pages": {}}
+    for page in (1, args.page):
+        offset = (page - 1) * args.limit
+        cursor = ""
+        if offset:
+            last = query().order_by(*columns).offset(offset - 1).limit(1).one()
+            cursor = encode_cursor([last.name, last.id])
+        results["pages"][page] = {
+            "offset_ms": measure(lambda: paginate(query(), columns, args.limit, offset, None, Response()), args.repeat),
+            "cursor_ms": measure(lambda: paginate(query(), columns, args.limit, 0, cursor, Response()), args.repeat),
+        }
+        db.expunge_all()
+
+    db.close()
+    print(json.dumps({"tender_id": str(tender_id), **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
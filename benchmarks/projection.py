@@ -0,0 +1,93 @@
+# Чтение списка предложений: полные ORM-объекты Bid против кортежей колонок схемы ответа.
+# Время и пик памяти Python на выборку, по умолчанию 10000 строк.
+# Работает с базой из переменных окружения POSTGRES_*:
+#   python benchmarks/projection.py --bids 10000 --repeat 20
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+import schemas  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from serialization import list_query  # noqa: E402
+
+
+def seed(db, count):
+    organization_id = uuid.uuid4()
+    tender_id = uuid.uuid4()
+    db.execute(insert(models.Organization), [{
+        "id": organization_id, "name": "benchmark", "type": models.OrganizationType.LLC
+    }])
+    db.execute(insert(models.Tender), [{
+        "id": tender_id, "name": "benchmark", "description": "benchmark",
+        "serviceType": models.TenderServiceType.CONSTRUCTION, "status": models.TenderStatus.PUBLISHED,
+        "organizationId": organization_id, "version": 1
+    }])
+    db.execute(insert(models.Bid), [{
+        "id": uuid.uuid4(), "name": f"bid {i}", "description": "x" * 500,
+        "status": models.BidStatus.PUBLISHED, "tenderId": tender_id,
+        "authorType": models.BidAuthorType.ORGANIZATION, "authorId": organization_id, "version": 1
+    } for i in range(count)])
+    db.commit()
+    return organization_id, tender_id
+
+
+def cleanup(db, organization_id, tender_id):
+    db.query(models.Bid).filter(models.Bid.tenderId == tender_id).delete()
+    db.query(models.Tender).filter(models.Tender.id == tender_id).delete()
+    db.query(models.Organization).filter(models.Organization.id == organization_id).delete()
+    db.commit()
+
+
+queries = {
+    "entities": lambda db: db.query(models.Bid),
+    "projected": lambda db: list_query(db, models.Bid, schemas.Bid),
+}
+
+
+def measure(tender_id, repeat, query):
+    timings, peaks = [], []
+    for _ in range(repeat):
+        db = SessionLocal()
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = query(db).filter(models.Bid.tenderId == tender_id).all()
+        timings.append((time.perf_counter() - start) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del rows
+        db.close()
+    return {
+        "p50_ms": round(statistics.median(timings), 2),
+        "peak_mb": round(statistics.median(peaks) / 1024 / 1024, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bids", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    organization_id, tender_id = seed(db, args.bids)
+    try:
+        results = {name: measure(tender_id, args.repeat, query) for name, query in queries.items()}
+    finally:
+        cleanup(db, organization_id, tender_id)
+        db.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
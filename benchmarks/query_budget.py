@@ -0,0 +1,91 @@
+# Проверка бюджетов SQL-запросов: обработчики вызываются с QUERY_DEBUG=raise, превышение бюджета
+# или повторяющиеся запросы (N+1) завершают прогон с ошибкой и списком запросов. Отдельно проверяется сама
+# проверка: обработчик с заниженным бюджетом обязан упасть с QueryBudgetExceeded.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/query_budget.py
+import os
+import sys
+import uuid
+
+os.environ["QUERY_DEBUG"] = "raise"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from main import app  # noqa: E402
+from query_budget import QueryBudgetExceeded  # noqa: E402
+
+
+def seed():
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    author = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible, author])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+    db.commit()
+    db.close()
+    return str(organization.id), responsible.username, author
+
+
+# Временно объявляет обработчику нулевой бюджет: любой SQL-запрос в строгом режиме должен остановить запрос
+def exceeds_lowered_budget(name: str, call) -> bool:
+    endpoint = next(route.endpoint for route in app.routes if getattr(route, "name", None) == name)
+    declared = endpoint.query_budget
+    endpoint.query_budget = (0, None)
+    try:
+        call()
+    except QueryBudgetExceeded:
+        return True
+    finally:
+        endpoint.query_budget = declared
+    return False
+
+
+def main():
+    client = TestClient(app)
+    organization_id, username, author = seed()
+    tender = client.post("/api/tenders/new", json={
+        "name": "benchmark", "description": "benchmark", "serviceType": "Construction",
+        "organizationId": organization_id, "creatorUsername": username
+    }).json()
+    client.put(f"/api/tenders/{tender['id']}/status", params={"status": "Published", "username": username})
+    bids = [client.post("/api/bids/new", json={
+        "name": f"benchmark {number}", "description": "benchmark", "tenderId": tender["id"],
+        "authorType": "User", "authorId": str(author.id)
+    }).json() for number in range(10)]
+    client.put(f"/api/bids/{bids[0]['id']}/feedback", params={"bidFeedback": "benchmark", "username": username})
+
+    checks = {
+        "get_bids_tender": lambda: client.get(f"/api/bids/{tender['id']}/list",
+                                              params={"username": username, "limit": 10}),
+        "get_reviews": lambda: client.get(f"/api/bids/{tender['id']}/reviews", params={
+            "authorUsername": author.username, "requesterUsername": username}),
+        "submit_decision": lambda: client.put(f"/api/bids/{bids[1]['id']}/submit_decision",
+                                              params={"decision": "Approved", "username": username}),
+    }
+
+    failed = False
+    for name, call in checks.items():
+        try:
+            response = call()
+            print(f"{name}: ok ({response.status_code})")
+        except QueryBudgetExceeded as exc:
+            failed = True
+            print(f"{name}: {exc}")
+
+    if exceeds_lowered_budget("get_bids_tender", checks["get_bids_tender"]):
+        print("get_bids_tender with budget 0: QueryBudgetExceeded raised")
+    else:
+        failed = True
+        print("get_bids_tender with budget 0: budget was not enforced")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
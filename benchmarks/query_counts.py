@@ -0,0 +1,126 @@
+# Число SQL-запросов на HTTP-запрос для обработчиков, которые получают пользователя, членство в организации и
+# тендер/предложение одним запросом (identity.py). Превышение потолка или ответ не 200 завершают прогон
+# с кодом 1 — возврат к отдельным запросам пользователя, тендера и прав не пройдет незамеченным.
+# Потолки посчитаны для конфигурации по умолчанию, поэтому режимы, добавляющие запросы, фиксируются ниже.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/query_counts.py
+import json
+import os
+import sys
+import uuid
+
+for name, value in {"VERSION_MODE": "cas", "HISTORY_MODE": "app", "HISTORY_FORMAT": "full", "HISTORY_RETENTION": "0",
+                    "OUTBOX_MODE": "inline", "EVENTS_BROKER": "memory", "LIST_CACHE_BACKEND": "none",
+                    "QUORUM_MODE": "count"}.items():
+    os.environ[name] = value
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from history import add_snapshot  # noqa: E402
+from main import app  # noqa: E402
+
+counters = {"statements": 0}
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_statement(connection, cursor, statement, parameters, context, executemany):
+    counters["statements"] += 1
+
+
+def seed():
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    author = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible, author])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+    tender = models.Tender(id=uuid.uuid4(), name="benchmark", description="benchmark", version=1,
+                           serviceType=models.TenderServiceType.CONSTRUCTION,
+                           status=models.TenderStatus.PUBLISHED, organizationId=organization.id)
+    db.add(tender)
+    db.flush()
+    db.add(models.TenderUser(tenderId=tender.id, userId=responsible.id))
+    bids = [models.Bid(id=uuid.uuid4(), name=f"benchmark {number}", description="benchmark", version=1,
+                       status=models.BidStatus.CREATED, tenderId=tender.id,
+                       authorType=models.BidAuthorType.USER, authorId=author.id)
+            for number in range(2)]
+    db.add_all(bids)
+    for bid in bids:
+        add_snapshot(db, bid)
+    db.flush()
+    db.add(models.BidReview(bidAuthorId=author.id, bidId=bids[0].id, description="benchmark"))
+    db.commit()
+    result = {"username": responsible.username, "author": author.username, "organization": str(organization.id),
+              "tender": str(tender.id), "bids": [str(bid.id) for bid in bids]}
+    db.close()
+    return result
+
+
+def main():
+    client = TestClient(app)
+    data = seed()
+    username, author, tender_id = data["username"], data["author"], data["tender"]
+    edited_bid, voted_bid = data["bids"]
+    created = {}
+
+    def create_tender():
+        response = client.post("/api/tenders/new", json={
+            "name": "benchmark", "description": "benchmark", "serviceType": "Construction",
+            "organizationId": data["organization"], "creatorUsername": username})
+        created["tender"] = response.json().get("id")
+        return response
+
+    # Потолок — 1 запрос resolve_identity (пользователь, права и цель) плюс записи обработчика:
+    # версия тендера/предложения и ее снимок, tender_user, счетчики tenderStats, голос и approvalCount.
+    # Предложения меняет их автор: права автора проверяются без запроса к organization_responsible
+    checks = {
+        "create_tender": (4, create_tender),  # + tender, tenderVersion, tender_user
+        "put_tender_status": (2, lambda: client.put(f"/api/tenders/{created['tender']}/status",
+                                                    params={"status": "Published", "username": username})),
+        "update_tender": (3, lambda: client.patch(f"/api/tenders/{created['tender']}/edit",
+                                                  params={"username": username}, json={"name": "edited"})),
+        "rollback_tender": (4, lambda: client.put(f"/api/tenders/{created['tender']}/rollback/1",
+                                                  params={"username": username})),  # + чтение версии
+        "get_tender_status": (1, lambda: client.get(f"/api/tenders/{tender_id}/status",
+                                                    params={"username": username})),
+        "get_user_tenders": (2, lambda: client.get("/api/tenders/my", params={"username": username})),
+        "get_bid_status": (1, lambda: client.get(f"/api/bids/{edited_bid}/status", params={"username": author})),
+        "put_bid_status": (3, lambda: client.put(f"/api/bids/{edited_bid}/status",
+                                                 params={"status": "Published", "username": author})),
+        "update_bid": (3, lambda: client.patch(f"/api/bids/{edited_bid}/edit",
+                                               params={"username": author}, json={"name": "edited"})),
+        "rollback_bid": (5, lambda: client.put(f"/api/bids/{edited_bid}/rollback/1",
+                                               params={"username": author})),  # + чтение версии, tenderStats
+        "get_employee_bids": (2, lambda: client.get("/api/bids/my", params={"username": author})),
+        "get_bids_tender": (2, lambda: client.get(f"/api/bids/{tender_id}/list", params={"username": username})),
+        "submit_review": (3, lambda: client.put(f"/api/bids/{edited_bid}/feedback",
+                                                params={"bidFeedback": "benchmark", "username": username})),
+        "get_reviews": (2, lambda: client.get(f"/api/bids/{tender_id}/reviews", params={
+            "authorUsername": author, "requesterUsername": username})),
+        # единственный ответственный — кворум, поэтому тендер закрывается в той же транзакции
+        "submit_decision": (7, lambda: client.put(f"/api/bids/{voted_bid}/submit_decision",
+                                                  params={"decision": "Approved", "username": username})),
+    }
+
+    results, failed = {}, []
+    for name, (ceiling, call) in checks.items():
+        counters["statements"] = 0
+        response = call()
+        results[name] = {"status": response.status_code, "statements": counters["statements"], "ceiling": ceiling}
+        if response.status_code != 200 or counters["statements"] > ceiling:
+            failed.append(name)
+
+    print(json.dumps(results, indent=2))
+    if failed:
+        print("query count check failed: " + ", ".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
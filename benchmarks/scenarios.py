@@ -0,0 +1,159 @@
+# Сценарный нагрузочный прогон по всем маршрутам tenders.py и bids.py на данных benchmarks/seed.py.
+# Маршруты выбираются случайно с весами сценария (--scenario read|write|mixed), порядок воспроизводим (--seed).
+# Результат — JSON с RPS и p50/p95/p99 по каждому маршруту; с --baseline сравнивается с сохраненным прогоном
+# и завершается с ошибкой при регрессии больше --tolerance. Сервер запускается отдельно:
+#   uvicorn main:app --workers 4
+#   python benchmarks/scenarios.py --scenario mixed --save-baseline benchmarks/baseline.json
+#   python benchmarks/scenarios.py --scenario mixed --baseline benchmarks/baseline.json
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+import httpx
+
+from load import percentile
+
+TENDER = {"name": "load", "description": "load", "serviceType": "Construction"}
+BID = {"name": "load", "description": "load", "authorType": "User"}
+
+
+# Маршрут -> (запрос по случайному тендеру t и предложению b из манифеста, веса в сценариях read/write/mixed)
+ROUTES = {
+    "get_tenders": (lambda t, b: ("GET", "/api/tenders/", {"params": {"limit": 5}}), (20, 0, 10)),
+    "create_tender": (lambda t, b: ("POST", "/api/tenders/new", {"json": {
+        **TENDER, "organizationId": t["organizationId"], "creatorUsername": t["username"]}}), (0, 10, 3)),
+    "create_tenders_bulk": (lambda t, b: ("POST", "/api/tenders/bulk", {"json": [{
+        **TENDER, "organizationId": t["organizationId"], "creatorUsername": t["username"]}] * 10}), (0, 1, 1)),
+    "get_user_tenders": (lambda t, b: ("GET", "/api/tenders/my", {"params": {"username": t["username"]}}), (10, 0, 5)),
+    "get_tender_status": (lambda t, b: ("GET", f"/api/tenders/{t['id']}/status",
+                                        {"params": {"username": t["username"]}}), (10, 0, 5)),
+    "put_tender_status": (lambda t, b: ("PUT", f"/api/tenders/{t['id']}/status",
+                                        {"params": {"username": t["username"], "status": "Published"}}), (0, 5, 2)),
+    "update_tender": (lambda t, b: ("PATCH", f"/api/tenders/{t['id']}/edit",
+                                    {"params": {"username": t["username"]}, "json": {"description": "edited"}}),
+                      (0, 10, 3)),
+    "rollback_tender": (lambda t, b: ("PUT", f"/api/tenders/{t['id']}/rollback/1",
+                                      {"params": {"username": t["username"]}}), (0, 5, 2)),
+    "export_tenders": (lambda t, b: ("GET", "/api/tenders/export",
+                                     {"params": {"organizationId": t["organizationId"]}}), (1, 0, 1)),
+    "export_tenders_history": (lambda t, b: ("GET", "/api/tenders/history/export", {"params": {
+        "username": t["username"], "organizationId": t["organizationId"]}}), (1, 0, 1)),
+    "create_bid": (lambda t, b: ("POST", "/api/bids/new", {"json": {
+        **BID, "tenderId": b["tenderId"], "authorId": b["authorId"]}}), (0, 10, 3)),
+    "create_bids_bulk": (lambda t, b: ("POST", "/api/bids/bulk", {"json": [{
+        **BID, "tenderId": b["tenderId"], "authorId": b["authorId"]}] * 10}), (0, 1, 1)),
+    "get_employee_bids": (lambda t, b: ("GET", "/api/bids/my", {"params": {"username": b["author"]}}), (10, 0, 5)),
+    "get_bid_status": (lambda t, b: ("GET", f"/api/bids/{b['id']}/status",
+                                     {"params": {"username": b["author"]}}), (10, 0, 5)),
+    "put_bid_status": (lambda t, b: ("PUT", f"/api/bids/{b['id']}/status",
+                                     {"params": {"username": b["author"], "status": "Published"}}), (0, 5, 2)),
+    "get_bids_tender": (lambda t, b: ("GET", f"/api/bids/{b['tenderId']}/list",
+                                      {"params": {"username": b["username"]}}), (20, 0, 10)),
+    "export_bids_tender": (lambda t, b: ("GET", f"/api/bids/{b['tenderId']}/export",
+                                         {"params": {"username": b["username"]}}), (1, 0, 1)),
+    "export_bids_history": (lambda t, b: ("GET", f"/api/bids/{b['tenderId']}/history/export",
+                                          {"params": {"username": b["username"]}}), (1, 0, 1)),
+    "update_bid": (lambda t, b: ("PATCH", f"/api/bids/{b['id']}/edit",
+                                 {"params": {"username": b["author"]}, "json": {"description": "edited"}}), (0, 10, 3)),
+    "rollback_bid": (lambda t, b: ("PUT", f"/api/bids/{b['id']}/rollback/1",
+                                   {"params": {"username": b["author"]}}), (0, 5, 2)),
+    "submit_decision": (lambda t, b: ("PUT", f"/api/bids/{b['id']}/submit_decision",
+                                      {"params": {"username": b["username"], "decision": "Approved"}}), (0, 5, 2)),
+    "submit_review": (lambda t, b: ("PUT", f"/api/bids/{b['id']}/feedback",
+                                    {"params": {"username": b["username"], "bidFeedback": "load"}}), (0, 5, 2)),
+    "get_reviews": (lambda t, b: ("GET", f"/api/bids/{b['tenderId']}/reviews", {"params": {
+        "authorUsername": b["author"], "requesterUsername": b["username"]}}), (10, 0, 5)),
+}
+SCENARIOS = {"read": 0, "write": 1, "mixed": 2}
+
+
+def route_stats(latencies, statuses, duration):
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / duration, 1),
+        "server_errors": sum(1 for status in statuses if status >= 500),
+        "client_errors": sum(1 for status in statuses if 400 <= status < 500),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def worker(client, manifest, rng, names, weights, deadline, samples):
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights=weights)[0]
+        method, url, kwargs = ROUTES[name][0](rng.choice(manifest["tenders"]), rng.choice(manifest["bids"]))
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        samples.setdefault(name, ([], []))
+        samples[name][0].append(time.perf_counter() - started)
+        samples[name][1].append(response.status_code)
+
+
+async def run(args, manifest):
+    column = SCENARIOS[args.scenario]
+    names = [name for name, (_, weights) in ROUTES.items() if weights[column] > 0]
+    weights = [ROUTES[name][1][column] for name in names]
+    samples = {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(worker(client, manifest, random.Random(args.seed + number), names, weights,
+                                      deadline, samples) for number in range(args.concurrency)))
+
+    routes = {name: route_stats(*samples[name], args.duration) for name in sorted(samples)}
+    latencies = [latency for route_latencies, _ in samples.values() for latency in route_latencies]
+    statuses = [status for _, route_statuses in samples.values() for status in route_statuses]
+    return {"scenario": args.scenario, "concurrency": args.concurrency, "duration": args.duration,
+            "total": route_stats(latencies, statuses, args.duration), "routes": routes}
+
+
+# Регрессия: p95 выросла или RPS упал больше чем на tolerance относительно базового прогона
+def compare(result, baseline, tolerance):
+    regressions = []
+    for name, current in {"total": result["total"], **result["routes"]}.items():
+        previous = baseline["total"] if name == "total" else baseline["routes"].get(name)
+        if previous is None:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append({"route": name, "metric": "p95_ms",
+                                "baseline": previous["p95_ms"], "current": current["p95_ms"]})
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append({"route": name, "metric": "rps", "baseline": previous["rps"], "current": current["rps"]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", default="benchmarks/manifest.json")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline")
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with open(args.manifest) as file:
+        manifest = json.load(file)
+    result = asyncio.run(run(args, manifest))
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            result["regressions"] = compare(result, json.load(file), args.tolerance)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(result, file, indent=2)
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if result.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
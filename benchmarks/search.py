@@ -0,0 +1,171 @@
+# Задержка поиска тендеров на синтетическом корпусе (по умолчанию 1000000 строк): частое и редкое слово,
+# фраза из двух слов, фильтр по типу услуги, глубокая страница по курсору и нечеткий поиск с опечаткой.
+# Слова корпуса выбираются по закону Ципфа из словаря --vocabulary, одинаковый --seed дает одинаковый корпус.
+# Бэкенд задается SEARCH_BACKEND; для memory первый запрос строит индекс, его время выводится отдельно.
+# Перед замерами курсор проходит по --ties одинаковым тендерам (равная релевантность): каждый должен встретиться
+# ровно один раз, иначе прогон завершается с кодом 1.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/search.py --rows 1000000
+#   SEARCH_BACKEND=memory python benchmarks/search.py --rows 1000000 --skip-seed
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from main import app  # noqa: E402
+from search import search_backend  # noqa: E402
+from load import percentile  # noqa: E402
+
+SYLLABLES = ["ка", "ро", "ми", "ту", "ле", "на", "во", "за", "пи", "се", "до", "бу", "ря", "жи", "фо", "цу"]
+
+
+def vocabulary(rng: random.Random, size: int) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def seed(args, words: list) -> str:
+    rng = random.Random(args.seed)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    service_types = list(models.TenderServiceType)
+
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="search benchmark", type=models.OrganizationType.LLC)
+    db.add(organization)
+    db.commit()
+
+    started = time.perf_counter()
+    for start in range(0, args.rows, args.batch_size):
+        db.execute(insert(models.Tender), [{
+            "id": uuid.uuid4(),
+            "name": " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(3, 6))),
+            "description": " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(10, 30))),
+            "serviceType": rng.choice(service_types),
+            "status": models.TenderStatus.PUBLISHED,
+            "organizationId": organization.id,
+            "version": 1,
+        } for _ in range(start, min(start + args.batch_size, args.rows))])
+        db.commit()
+    db.execute(text("ANALYZE tender"))
+    db.commit()
+    db.close()
+    print(f"seeded {args.rows} tenders in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return str(organization.id)
+
+
+def measure(client: TestClient, params: dict, requests: int) -> dict:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get("/api/tenders/search", params=params)
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+    return {
+        "results": len(response.json()),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def tied_cursor_walk(client: TestClient, organization_id: str, count: int, limit: int) -> dict:
+    rng = random.Random()
+    token = "ничья" + "".join(rng.choice("бвгдзклмнпрст") for _ in range(10))
+    db = SessionLocal()
+    ids = {str(uuid.uuid4()) for _ in range(count)}
+    db.execute(insert(models.Tender), [{
+        "id": tender_id, "name": f"{token} тендер", "description": f"{token} одинаковое описание",
+        "serviceType": models.TenderServiceType.CONSTRUCTION, "status": models.TenderStatus.PUBLISHED,
+        "organizationId": organization_id, "version": 1,
+    } for tender_id in ids])
+    db.commit()
+    db.close()
+
+    results = {}
+    for fuzzy in ("false", "true"):
+        seen, cursor, pages = [], "", 0
+        while cursor is not None and pages <= count:
+            page = client.get("/api/tenders/search",
+                              params={"q": token, "fuzzy": fuzzy, "limit": limit, "cursor": cursor})
+            assert page.status_code == 200, page.text
+            seen += [tender["id"] for tender in page.json()]
+            cursor = page.headers.get("X-Next-Cursor")
+            pages += 1
+        ok = len(seen) == len(set(seen)) == count and set(seen) == ids
+        results["fuzzy" if fuzzy == "true" else "exact"] = {"rows": len(seen), "unique": len(set(seen)), "ok": ok}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ties", type=int, default=53, help="тендеров с равной релевантностью для прохода курсором")
+    parser.add_argument("--skip-seed", action="store_true", help="корпус уже вставлен прошлым прогоном")
+    args = parser.parse_args()
+
+    words = vocabulary(random.Random(args.seed), args.vocabulary)
+    if not args.skip_seed:
+        organization_id = seed(args, words)
+    else:
+        db = SessionLocal()
+        organization = models.Organization(id=uuid.uuid4(), name="search benchmark", type=models.OrganizationType.LLC)
+        db.add(organization)
+        db.commit()
+        organization_id = str(organization.id)
+        db.close()
+
+    client = TestClient(app)
+    frequent, rare = words[0], words[-1]
+    typo = frequent[:-1] + ("а" if frequent[-1] != "а" else "о")
+
+    results = {"backend": search_backend}
+    if search_backend == "memory":
+        started = time.perf_counter()
+        client.get("/api/tenders/search", params={"q": frequent, "limit": 1})
+        results["index_build_s"] = round(time.perf_counter() - started, 2)
+
+    results["tied_cursor_walk"] = tied_cursor_walk(client, organization_id, args.ties, min(args.limit, 10))
+    if not all(walk["ok"] for walk in results["tied_cursor_walk"].values()):
+        print(json.dumps(results, indent=2, ensure_ascii=False), file=sys.stderr)
+        sys.exit(1)
+
+    page = client.get("/api/tenders/search", params={"q": frequent, "limit": args.limit, "cursor": ""})
+    deep_cursor = page.headers.get("X-Next-Cursor", "")
+    for _ in range(9):
+        page = client.get("/api/tenders/search", params={"q": frequent, "limit": args.limit, "cursor": deep_cursor})
+        deep_cursor = page.headers.get("X-Next-Cursor", deep_cursor)
+
+    queries = {
+        "frequent_word": {"q": frequent},
+        "rare_word": {"q": rare},
+        "phrase": {"q": f"{words[1]} {words[2]}"},
+        "service_type": {"q": frequent, "service_type": models.TenderServiceType.DELIVERY.value},
+        "cursor_page_10": {"q": frequent, "cursor": deep_cursor},
+        "fuzzy_typo": {"q": typo, "fuzzy": "true"},
+    }
+    for name, params in queries.items():
+        results[name] = measure(client, {"limit": args.limit, **params}, args.requests)
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
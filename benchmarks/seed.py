@@ -0,0 +1,214 @@
+# Генератор синтетических данных для нагрузочных прогонов: employee, organization, organization_responsible,
+# tender (с tender_user и первой версией), bid (с первой версией), BidDecisionUsers и bidReview.
+# Объем задается числом тендеров, остальные таблицы — через коэффициенты; распределение неравномерное:
+# тендеры и предложения по закону Ципфа концентрируются у небольшого числа организаций и тендеров.
+# Один и тот же --seed дает одинаковые данные. Манифест с выборкой id и пользователей читает benchmarks/scenarios.py.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/seed.py --tenders 10000 --manifest benchmarks/manifest.json
+#   python benchmarks/seed.py --tenders 1000000 --seed 2 --manifest benchmarks/manifest-10m.json
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from array import array
+
+from sqlalchemy import bindparam, insert, update
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from history import add_initial_snapshots  # noqa: E402
+
+KINDS = {"employee": 1, "organization": 2, "responsible": 3, "tender": 4, "link": 5, "bid": 6, "review": 7, "decision": 8}
+SERVICE_TYPES = list(models.TenderServiceType)
+SAMPLE_SIZE = 1000
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.prefix = self.random.getrandbits(64)
+        self.employees = args.employees or max(100, args.tenders // 10)
+        self.organizations = args.organizations or max(10, args.tenders // 100)
+        self.bids = int(args.tenders * args.bids_per_tender)
+        self.reviews = int(self.bids * args.review_ratio)
+        self.decisions = int(self.bids * args.decision_ratio)
+        self.counts = {}
+
+    # Детерминированные UUID: префикс прогона, тип сущности и порядковый номер
+    def make_id(self, kind: str, index: int) -> uuid.UUID:
+        return uuid.UUID(int=(self.prefix << 64) | (KINDS[kind] << 48) | index)
+
+    def username(self, index: int) -> str:
+        return f"seed-{self.prefix:016x}-{index}"
+
+    def zipf_weights(self, count: int):
+        return list(itertools.accumulate(1 / (rank + 1) ** self.args.skew for rank in range(count)))
+
+    def choose(self, cum_weights, count: int) -> list:
+        return self.random.choices(range(len(cum_weights)), cum_weights=cum_weights, k=count)
+
+    def insert(self, db, model, rows):
+        db.execute(insert(model), rows)
+        self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+
+    def insert_decisions(self, db, rows, approvals):
+        self.insert(db, models.BidDecisionUsers, rows)
+        bid = models.Bid.__table__
+        db.execute(update(bid).where(bid.c.id == bindparam("bid_id")).values(approvalCount=bindparam("approvals")),
+                   approvals)
+        db.commit()
+
+    def batches(self, total: int):
+        for start in range(0, total, self.args.batch_size):
+            yield start, min(start + self.args.batch_size, total)
+
+    def run(self, db) -> dict:
+        args = self.args
+        for start, end in self.batches(self.employees):
+            self.insert(db, models.Employee, [{
+                "id": self.make_id("employee", index), "username": self.username(index),
+                "first_name": "Seed", "last_name": str(index)
+            } for index in range(start, end)])
+        self.insert(db, models.Organization, [{
+            "id": self.make_id("organization", index), "name": f"Seed organization {index}",
+            "description": "seed", "type": self.random.choice(list(models.OrganizationType))
+        } for index in range(self.organizations)])
+
+        # У каждой организации 1–5 ответственных из общего пула сотрудников
+        responsible = []
+        rows = []
+        for organization in range(self.organizations):
+            members = self.random.sample(range(self.employees), min(self.employees, self.random.randint(1, 5)))
+            responsible.append(members)
+            rows += [{
+                "id": self.make_id("responsible", len(rows) + number),
+                "organization_id": self.make_id("organization", organization),
+                "user_id": self.make_id("employee", member)
+            } for number, member in enumerate(members)]
+        for start, end in self.batches(len(rows)):
+            self.insert(db, models.OrganizationResponsible, rows[start:end])
+        db.commit()
+
+        tender_organization = array("I")
+        organization_weights = self.zipf_weights(self.organizations)
+        for start, end in self.batches(args.tenders):
+            organizations = self.choose(organization_weights, end - start)
+            tender_organization.extend(organizations)
+            tenders = [{
+                "id": self.make_id("tender", index), "name": f"Seed tender {index}", "description": "seed",
+                "serviceType": self.random.choice(SERVICE_TYPES),
+                "status": models.TenderStatus.PUBLISHED if self.random.random() < 0.8 else models.TenderStatus.CREATED,
+                "organizationId": self.make_id("organization", organization), "version": 1
+            } for index, organization in zip(range(start, end), organizations)]
+            self.insert(db, models.Tender, tenders)
+            add_initial_snapshots(db, models.Tender, tenders)
+            self.insert(db, models.TenderUser, [{
+                "id": self.make_id("link", index), "tenderId": self.make_id("tender", index),
+                "userId": self.make_id("employee", self.random.choice(responsible[organization]))
+            } for index, organization in zip(range(start, end), organizations)])
+            db.commit()
+
+        bid_tender = array("I")
+        bid_author = array("I")
+        tender_weights = self.zipf_weights(args.tenders)
+        for start, end in self.batches(self.bids):
+            tenders = self.choose(tender_weights, end - start)
+            authors = [self.random.randrange(self.employees) for _ in tenders]
+            bid_tender.extend(tenders)
+            bid_author.extend(authors)
+            bids = [{
+                "id": self.make_id("bid", index), "name": f"Seed bid {index}", "description": "seed",
+                "status": models.BidStatus.PUBLISHED, "tenderId": self.make_id("tender", tender),
+                "authorType": models.BidAuthorType.USER, "authorId": self.make_id("employee", author), "version": 1
+            } for index, tender, author in zip(range(start, end), tenders, authors)]
+            self.insert(db, models.Bid, bids)
+            add_initial_snapshots(db, models.Bid, bids)
+            db.commit()
+
+        for start, end in self.batches(self.reviews):
+            self.insert(db, models.BidReview, [{
+                "id": self.make_id("review", index),
+                "bidAuthorId": self.make_id("employee", bid_author[self.random.randrange(self.bids)]),
+                "description": "seed review"
+            } for index in range(start, end)])
+            db.commit()
+
+        # Голоса: ответственные организации тендера, не больше одного голоса пользователя за предложение
+        # и счетчик одобрений bid.approvalCount, который поддерживает submit_decision
+        decided = self.random.sample(range(self.bids), min(self.bids, self.decisions))
+        rows, approvals = [], []
+        index = 0
+        for bid in decided:
+            members = responsible[tender_organization[bid_tender[bid]]]
+            voters = self.random.sample(members, self.random.randint(1, len(members)))
+            for member in voters:
+                rows.append({"id": self.make_id("decision", index), "bidId": self.make_id("bid", bid),
+                             "decision": models.BibDecision.APPROVED, "username": self.username(member)})
+                index += 1
+            approvals.append({"bid_id": self.make_id("bid", bid), "approvals": len(voters)})
+            if len(rows) >= args.batch_size:
+                self.insert_decisions(db, rows, approvals)
+                rows, approvals = [], []
+        if rows:
+            self.insert_decisions(db, rows, approvals)
+
+        return self.manifest(tender_organization, responsible, bid_tender, bid_author)
+
+    def manifest(self, tender_organization, responsible, bid_tender, bid_author) -> dict:
+        tender_sample = self.random.sample(range(self.args.tenders), min(SAMPLE_SIZE, self.args.tenders))
+        bid_sample = self.random.sample(range(self.bids), min(SAMPLE_SIZE, self.bids))
+        return {
+            "seed": self.args.seed,
+            "prefix": f"{self.prefix:016x}",
+            "counts": self.counts,
+            "tenders": [{
+                "id": str(self.make_id("tender", tender)),
+                "organizationId": str(self.make_id("organization", tender_organization[tender])),
+                "username": self.username(responsible[tender_organization[tender]][0]),
+            } for tender in tender_sample],
+            "bids": [{
+                "id": str(self.make_id("bid", bid)),
+                "tenderId": str(self.make_id("tender", bid_tender[bid])),
+                "authorId": str(self.make_id("employee", bid_author[bid])),
+                "author": self.username(bid_author[bid]),
+                "username": self.username(responsible[tender_organization[bid_tender[bid]]][0]),
+            } for bid in bid_sample],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenders", type=int, default=10000)
+    parser.add_argument("--employees", type=int, default=0, help="по умолчанию tenders / 10")
+    parser.add_argument("--organizations", type=int, default=0, help="по умолчанию tenders / 100")
+    parser.add_argument("--bids-per-tender", type=float, default=3.0)
+    parser.add_argument("--review-ratio", type=float, default=0.2)
+    parser.add_argument("--decision-ratio", type=float, default=0.3)
+    parser.add_argument("--skew", type=float, default=1.1, help="показатель закона Ципфа")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--manifest", default="benchmarks/manifest.json")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        manifest = Generator(args).run(db)
+    finally:
+        db.close()
+    manifest["seconds"] = round(time.perf_counter() - started, 1)
+
+    with open(args.manifest, "w") as file:
+        json.dump(manifest, file, indent=2)
+    print(json.dumps({"counts": manifest["counts"], "seconds": manifest["seconds"]}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
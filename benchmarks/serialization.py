@@ -0,0 +1,117 @@
+# Чтение и сериализация списка тендеров: response_model + json (как раньше), response_model + orjson,
+# TypeAdapter на весь список и строки нужных колонок без ORM-объектов. Время на 1000 тендеров.
+# Работает с базой из переменных окружения POSTGRES_*:
+#   python benchmarks/serialization.py --tenders 1000 --repeat 50
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+import schemas  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from serialization import list_adapter, list_query  # noqa: E402
+
+
+def seed(db, count):
+    organization_id = uuid.uuid4()
+    db.execute(insert(models.Organization), [{
+        "id": organization_id, "name": "benchmark", "type": models.OrganizationType.LLC
+    }])
+    db.execute(insert(models.Tender), [{
+        "id": uuid.uuid4(), "name": f"tender {i}", "description": "x" * 500,
+        "serviceType": models.TenderServiceType.CONSTRUCTION, "status": models.TenderStatus.PUBLISHED,
+        "organizationId": organization_id, "version": 1
+    } for i in range(count)])
+    db.commit()
+    return organization_id
+
+
+def cleanup(db, organization_id):
+    db.query(models.Tender).filter(models.Tender.organizationId == organization_id).delete()
+    db.query(models.Organization).filter(models.Organization.id == organization_id).delete()
+    db.commit()
+
+
+def fetch(db, organization_id, rows):
+    query = list_query(db, models.Tender, schemas.Tender) if rows else db.query(models.Tender)
+    result = query.filter(models.Tender.organizationId == organization_id).all()
+    db.expunge_all()
+    return result
+
+
+field = create_model_field(name="Response", type_=List[schemas.Tender], mode="serialization")
+
+
+def response_model_body(tenders, response_class):
+    content = asyncio.run(serialize_response(field=field, response_content=tenders, is_coroutine=True))
+    return response_class(content).body
+
+
+def adapter_body(tenders):
+    adapter = list_adapter(schemas.Tender)
+    return adapter.dump_json(adapter.validate_python(tenders, from_attributes=True))
+
+
+def rows_body(rows):
+    adapter = list_adapter(schemas.Tender)
+    return adapter.dump_json(adapter.validate_python([row._asdict() for row in rows]))
+
+
+modes = {
+    "model+json": (False, lambda tenders: response_model_body(tenders, JSONResponse)),
+    "model+orjson": (False, lambda tenders: response_model_body(tenders, ORJSONResponse)),
+    "adapter": (False, adapter_body),
+    "rows+adapter": (True, rows_body),
+}
+
+
+def measure(db, organization_id, count, repeat, rows, serialize):
+    fetch_timings, serialize_timings = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tenders = fetch(db, organization_id, rows)
+        fetched = time.perf_counter()
+        serialize(tenders)
+        fetch_timings.append((fetched - start) * 1000 * 1000 / count)
+        serialize_timings.append((time.perf_counter() - fetched) * 1000 * 1000 / count)
+    fetch_ms, serialize_ms = statistics.median(fetch_timings), statistics.median(serialize_timings)
+    return {
+        "fetch_ms_per_1000": round(fetch_ms, 3),
+        "serialize_ms_per_1000": round(serialize_ms, 3),
+        "tenders_per_second": round(1000 * 1000 / (fetch_ms + serialize_ms)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenders", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    organization_id = seed(db, args.tenders)
+    try:
+        results = {name: measure(db, organization_id, args.tenders, args.repeat, rows, serialize)
+                   for name, (rows, serialize) in modes.items()}
+    finally:
+        cleanup(db, organization_id)
+        db.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Статистика тендера: задержка GET /api/tenders/{tenderId}/stats для тендеров с разным числом предложений
+# (не должна зависеть от --bids) и сверка счетчиков, накопленных обработчиками, с полным пересчетом.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/stats.py --bids 10 1000 100000
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal  # noqa: E402
+from main import app  # noqa: E402
+from stats import COUNTERS, rebuild  # noqa: E402
+
+
+def seed(bid_counts: list):
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="stats benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    author = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible, author])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+
+    tenders = {}
+    for bids in bid_counts:
+        tender_id = uuid.uuid4()
+        db.add(models.Tender(id=tender_id, name="benchmark", description="benchmark", version=1,
+                             serviceType=models.TenderServiceType.CONSTRUCTION,
+                             status=models.TenderStatus.PUBLISHED, organizationId=organization.id))
+        db.flush()
+        for start in range(0, bids, 10_000):
+            db.execute(insert(models.Bid), [{
+                "id": uuid.uuid4(), "name": "benchmark", "description": "benchmark", "version": 1,
+                "status": models.BidStatus.CREATED, "tenderId": tender_id,
+                "authorType": models.BidAuthorType.USER, "authorId": author.id,
+            } for _ in range(start, min(start + 10_000, bids))])
+        tenders[bids] = str(tender_id)
+    db.commit()
+    db.close()
+    return str(organization.id), responsible.username, author, tenders
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bids", type=int, nargs="+", default=[10, 1000, 100_000])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    organization_id, username, author, tenders = seed(args.bids)
+    # Предложения вставлены мимо обработчиков, поэтому счетчики заполняет пересчет
+    rebuild()
+
+    results = {"p50_ms": {}}
+    for bids, tender_id in tenders.items():
+        timings = []
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            response = client.get(f"/api/tenders/{tender_id}/stats", params={"username": username})
+            timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.text
+        assert response.json()["bids"] == bids, response.json()
+        results["p50_ms"][bids] = round(statistics.median(timings), 3)
+
+    # Изменения через обработчики: создание, публикация, отклонение, отзыв
+    tender_id = tenders[min(tenders)]
+    for _ in range(20):
+        bid = client.post("/api/bids/new", json={
+            "name": "benchmark", "description": "benchmark", "tenderId": tender_id,
+            "authorType": "User", "authorId": str(author.id)
+        }).json()
+        client.put(f"/api/bids/{bid['id']}/status", params={"status": "Published", "username": author.username})
+        client.put(f"/api/bids/{bid['id']}/feedback", params={"bidFeedback": "ok", "username": username})
+        client.put(f"/api/bids/{bid['id']}/submit_decision", params={"decision": "Rejected", "username": username})
+
+    incremental = client.get(f"/api/tenders/{tender_id}/stats", params={"username": username}).json()
+    rebuild()
+    rebuilt = client.get(f"/api/tenders/{tender_id}/stats", params={"username": username}).json()
+    results["consistent"] = all(incremental[counter] == rebuilt[counter] for counter in COUNTERS)
+    results["stats"] = {counter: incremental[counter] for counter in COUNTERS}
+    dashboard = client.get("/api/tenders/stats", params={
+        "username": username, "organizationId": organization_id, "limit": len(tenders)
+    }).json()
+    results["dashboard_bids"] = sum(row["bids"] for row in dashboard)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Опрос статусов: --ids запросов GET /api/tenders/{tenderId}/status и /api/bids/{bidId}/status по одному
+# против одного GET /api/tenders/status и /api/bids/status со всеми id. Выводит время и число SQL-запросов.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/status_batch.py --ids 100
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+
+counters = {"statements": 0}
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_statement(connection, cursor, statement, parameters, context, executemany):
+    counters["statements"] += 1
+
+
+def seed(count: int):
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+
+    tenders = [models.Tender(id=uuid.uuid4(), name="benchmark", description="benchmark", version=1,
+                             serviceType=models.TenderServiceType.CONSTRUCTION,
+                             status=models.TenderStatus.PUBLISHED, organizationId=organization.id)
+               for _ in range(count)]
+    db.add_all(tenders)
+    db.flush()
+    bids = [models.Bid(id=uuid.uuid4(), name="benchmark", description="benchmark", version=1,
+                       status=models.BidStatus.CREATED, tenderId=tender.id,
+                       authorType=models.BidAuthorType.USER, authorId=responsible.id)
+            for tender in tenders]
+    db.add_all(bids)
+    db.commit()
+    result = responsible.username, [str(tender.id) for tender in tenders], [str(bid.id) for bid in bids]
+    db.close()
+    return result
+
+
+def measure(call) -> dict:
+    counters["statements"] = 0
+    started = time.perf_counter()
+    requests = call()
+    return {
+        "http_requests": requests,
+        "statements": counters["statements"],
+        "ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def one_by_one(client: TestClient, prefix: str, ids: list, username: str) -> int:
+    for entity_id in ids:
+        response = client.get(f"{prefix}/{entity_id}/status", params={"username": username})
+        assert response.status_code == 200, response.text
+    return len(ids)
+
+
+def batch(client: TestClient, prefix: str, ids: list, username: str) -> int:
+    response = client.get(f"{prefix}/status", params={"username": username, "ids": ids})
+    assert response.status_code == 200, response.text
+    assert all(item["code"] == 200 for item in response.json().values()), response.text
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ids", type=int, default=100)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    username, tender_ids, bid_ids = seed(args.ids)
+
+    results = {}
+    for name, prefix, ids in (("tenders", "/api/tenders", tender_ids), ("bids", "/api/bids", bid_ids)):
+        results[name] = {
+            "one_by_one": measure(lambda: one_by_one(client, prefix, ids, username)),
+            "batch": measure(lambda: batch(client, prefix, ids, username)),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# Число коммитов, SQL-запросов и задержка на запрос для пишущих эндпоинтов тендеров и предложений.
+# Работает с базой из переменных окружения POSTGRES_* (после alembic upgrade head):
+#   python benchmarks/writes.py --requests 200
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+
+counters = {"commits": 0, "statements": 0}
+
+
+@event.listens_for(engine, "commit")
+def count_commit(connection):
+    counters["commits"] += 1
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_statement(connection, cursor, statement, parameters, context, executemany):
+    counters["statements"] += 1
+
+
+def seed():
+    db = SessionLocal()
+    organization = models.Organization(id=uuid.uuid4(), name="benchmark", type=models.OrganizationType.LLC)
+    responsible = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    author = models.Employee(id=uuid.uuid4(), username=f"bench-{uuid.uuid4().hex[:12]}")
+    db.add_all([organization, responsible, author])
+    db.flush()
+    db.add(models.OrganizationResponsible(organization_id=organization.id, user_id=responsible.id))
+    db.commit()
+    db.close()
+    return str(organization.id), responsible.username, author
+
+
+def measure(name, requests, call, results):
+    timings = []
+    counters.update(commits=0, statements=0)
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = call()
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    results[name] = {
+        "commits_per_request": counters["commits"] / requests,
+        "statements_per_request": counters["statements"] / requests,
+        "p50_ms": round(statistics.median(timings), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    organization_id, username, author = seed()
+    tender = client.post("/api/tenders/new", json={
+        "name": "benchmark", "description": "benchmark", "serviceType": "Construction",
+        "organizationId": organization_id, "creatorUsername": username
+    }).json()
+    client.put(f"/api/tenders/{tender['id']}/status", params={"status": "Published", "username": username})
+    bid = client.post("/api/bids/new", json={
+        "name": "benchmark", "description": "benchmark", "tenderId": tender["id"],
+        "authorType": "User", "authorId": str(author.id)
+    }).json()
+
+    results = {}
+    measure("create_tender", args.requests, lambda: client.post("/api/tenders/new", json={
+        "name": "benchmark", "description": "benchmark", "serviceType": "Construction",
+        "organizationId": organization_id, "creatorUsername": username
+    }), results)
+    measure("update_tender", args.requests, lambda: client.patch(
+        f"/api/tenders/{tender['id']}/edit", params={"username": username}, json={"description": "edited"}), results)
+    measure("rollback_tender", args.requests, lambda: client.put(
+        f"/api/tenders/{tender['id']}/rollback/2", params={"username": username}), results)
+    measure("create_bid", args.requests, lambda: client.post("/api/bids/new", json={
+        "name": "benchmark", "description": "benchmark", "tenderId": tender["id"],
+        "authorType": "User", "authorId": str(author.id)
+    }), results)
+    measure("update_bid", args.requests, lambda: client.patch(
+        f"/api/bids/{bid['id']}/edit", params={"username": author.username}, json={"description": "edited"}), results)
+    measure("rollback_bid", args.requests, lambda: client.put(
+        f"/api/bids/{bid['id']}/rollback/1", params={"username": author.username}), results)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
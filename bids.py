@@ -1,12 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 import schemas
 import models
 from database import get_db
-from typing import List
+from pagination import paginate
+from serialization import list_columns, list_query, list_response
+from history import add_snapshot, load_version
+from bulk import bulk_items, import_bids
+from list_cache import bids_generation, cached_list_response
+from query_budget import query_budget
+from http_cache import conditional, entity_etag
+from export import ExportFormat, export_response, history_statement
+from search import search_rows
+from events import publish
+from stats import count_decision, count_new_bid, count_review, set_bid_status
+from status_batch import batch_statuses, check_batch_size, statuses_response
+from versioning import expected_version, next_version
+from identity import resolve_identity, remember_responsible, remembered_responsible
+from typing import Dict, List, Optional
+import os
+import uuid
 
 router = APIRouter()
 
+# QUORUM_MODE: count — одобрения считаются COUNT по BidDecisionUsers, counter — по счетчику bid.approvalCount
+quorum_mode = os.getenv("QUORUM_MODE", "count")
+
 error_responses = {
     400: {
         "description": "Неверный формат запроса или его параметры.",
@@ -39,6 +61,22 @@ error_responses = {
                 "example": {"reason": "Предложение не найдено."}
             }
         }
+    },
+    409: {
+        "description": "Версия изменена параллельным запросом.",
+        "content": {
+            "application/json": {
+                "example": {"reason": "Версия изменена параллельным запросом."}
+            }
+        }
+    },
+    412: {
+        "description": "Версия изменилась.",
+        "content": {
+            "application/json": {
+                "example": {"reason": "Версия изменилась."}
+            }
+        }
     }
 }
 
@@ -75,54 +113,125 @@ def create_bid(bid: schemas.BidCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения действия.")
 
     db_bid = models.Bid(
+        id=uuid.uuid4(),
         name=bid.name,
         description=bid.description,
         status=models.BidStatus.CREATED,
         tenderId=bid.tenderId,
         authorType=bid.authorType,
-        authorId=bid.authorId
+        authorId=bid.authorId,
+        version=1
     )
 
     db.add(db_bid)
-    db.commit()
-    db.refresh(db_bid)
-
     add_bid_backup(db, db_bid)
+    count_new_bid(db, tender.id)
+    db.commit()
 
     return db_bid
 
 
+@router.post("/bulk", response_model=schemas.BulkResult,
+             responses={
+                 400: error_responses[400]
+             })
+def create_bids_bulk(items: list = Depends(bulk_items), db: Session = Depends(get_db)):
+    return import_bids(db, items)
+
+
 @router.get("/my", response_model=List[schemas.Bid],
             responses={
                 401: error_responses[401]
             })
-def get_employee_bids(username: str,
+def get_employee_bids(username: str, request: Request, response: Response,
                       limit: int = 5, offset: int = 0,
+                      cursor: Optional[str] = None,
                       db: Session = Depends(get_db)):
-    user = db.query(models.Employee).filter(
-        models.Employee.username == username).first()
+    user = resolve_identity(db, username).user
+    if not user:
+        raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
+
+    db_bids = list_query(db, models.Bid, schemas.Bid).filter(models.Bid.authorId == user.id)
+    db_bids = paginate(db_bids, [models.Bid.createdAt, models.Bid.id], limit, offset, cursor, response)
+    return list_response(db_bids, schemas.Bid, response, request)
+
+
+# Видны предложения, автор которых — пользователь, и предложения к тендерам организаций, где он ответственный
+@router.get("/search", response_model=List[schemas.Bid],
+            responses={
+                400: error_responses[400],
+                401: error_responses[401]
+            })
+@query_budget(queries=4)
+def search_bids(q: str, username: str, request: Request, response: Response,
+                limit: int = 5, offset: int = 0,
+                fuzzy: bool = False,
+                status: Optional[models.BidStatus] = None,
+                tenderId: Optional[uuid.UUID] = None,
+                cursor: Optional[str] = None,
+                db: Session = Depends(get_db)):
+    user = resolve_identity(db, username).user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
-    db_bids = db.query(models.Bid).filter(models.Bid.authorId == user.id)
-    response = db_bids.limit(limit).offset(offset).all()
-    return response
+    organization_ids = db.scalars(
+        select(models.OrganizationResponsible.organization_id).where(
+            models.OrganizationResponsible.user_id == user.id
+        )
+    ).all()
+    organizations = {str(organization_id) for organization_id in organization_ids}
+    visible = or_(
+        models.Bid.authorId == user.id,
+        models.Bid.tenderId.in_(select(models.Tender.id).where(models.Tender.organizationId.in_(organization_ids)))
+    )
+
+    def accept(attributes: dict) -> bool:
+        return attributes["authorId"] == str(user.id) or attributes["organizationId"] in organizations
+
+    filters = {"status": status, "tenderId": tenderId}
+    bids = search_rows(db, models.Bid, schemas.Bid, q, fuzzy, filters, limit, offset, cursor, response,
+                       visible=visible, accept=accept)
+    return list_response(bids, schemas.Bid, response, request)
+
+
+# Статусы нескольких предложений: ?ids=...&ids=..., не больше STATUS_BATCH_MAX; права — как у /{bidId}/status
+@router.get("/status", response_model=Dict[str, schemas.StatusItem], response_model_exclude_none=True,
+            responses={
+                400: error_responses[400],
+                401: error_responses[401]
+            })
+@query_budget(queries=3)
+def get_bids_status(username: str, request: Request, response: Response,
+                    ids: List[str] = Query(...),
+                    db: Session = Depends(get_db)):
+    check_batch_size(ids)
+    user = resolve_identity(db, username).user
+    if not user:
+        raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
+
+    items = batch_statuses(db, user, models.Bid, ids, models.Bid.authorId,
+                           not_found="Предложение не найдено", forbidden_code=400, owner_column=models.Bid.authorId)
+    return statuses_response(items, request, response)
 
 
 @router.get("/{bidId}/status")
-def get_bid_status(bidId: str, username: str, db: Session = Depends(get_db)):
-    bid = db.query(models.Bid).get(bidId)
+def get_bid_status(bidId: str, username: str, request: Request, response: Response,
+                   db: Session = Depends(get_db)):
+    identity = resolve_identity(db, username, bid_id=bidId)
+    bid = identity.bid
     if not bid:
         raise HTTPException(status_code=404, detail="Предложение не найдено")
 
-    user = db.query(models.Employee).filter(
-        models.Employee.username == username).first()
+    user = identity.user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
     if bid.authorId != user.id:
         check_organization_responsible(db, user_id=user.id,
                                        organization_id=bid.authorId)
+    not_modified = conditional(request, response, entity_etag(bid))
+    if not_modified is not None:
+        return not_modified
     return bid.status
 
 
@@ -140,21 +249,23 @@ def get_bid_status(bidId: str, username: str, db: Session = Depends(get_db)):
                 }
             })
 def put_bid_status(bidId: str, status: models.BidStatus, username: str, db: Session = Depends(get_db)):
-    bid = db.query(models.Bid).get(bidId)
+    identity = resolve_identity(db, username, bid_id=bidId)
+    bid = identity.bid
     if not bid:
         raise HTTPException(status_code=404, detail="Предложение не найдено")
 
-    user = db.query(models.Employee).filter(
-        models.Employee.username == username).first()
+    user = identity.user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
     if bid.authorId != user.id:
         check_organization_responsible(db, user_id=user.id,
                                        organization_id=bid.authorId)
-    bid.status = status
+    set_bid_status(db, bid, status)
+    # у Bid.tenderId нет внешнего ключа: тендер мог быть удален, тогда событие получат только подписчики тендера
+    organization_id = identity.tender.organizationId if identity.tender else None
+    publish(db, "bid.status", bid.tenderId, organization_id, bidId=bid.id, status=status)
     db.commit()
-    db.refresh(bid)
 
     return bid
 
@@ -173,35 +284,76 @@ def put_bid_status(bidId: str, status: models.BidStatus, username: str, db: Sess
                     }
                 }
             })
-def get_bids_tender(tenderId: str, username: str,
+@query_budget(queries=4)
+def get_bids_tender(tenderId: str, username: str, request: Request, response: Response,
                     limit: int = 5, offset: int = 0,
+                    cursor: Optional[str] = None,
                     db: Session = Depends(get_db)):
-    tender = db.query(models.Tender).get(tenderId)
+    identity = resolve_identity(db, username, tender_id=tenderId)
+    tender = identity.tender
     if not tender:
         raise HTTPException(status_code=404, detail="Тендер или предложение не найдено.")
-    user = db.query(models.Employee).filter(
-        models.Employee.username == username).first()
+    user = identity.user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
-    organization_responsible = check_organization_responsible(db, user_id=user.id,
-                                                              organization_id=tender.organizationId)
-    is_author = db.query(models.Bid).filter(
-        models.Bid.tenderId == tenderId,
-        models.Bid.authorId == user.id
-    ).first()
+    check_organization_responsible(db, user_id=user.id, organization_id=tender.organizationId)
 
-    if not organization_responsible and not is_author:
-        raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения действия.")
+    def load_bids():
+        bids = list_query(db, models.Bid, schemas.Bid).filter(models.Bid.tenderId == tenderId)
+        bids = paginate(bids, [models.Bid.name, models.Bid.id], limit, offset, cursor, response)
 
-    bids = db.query(models.Bid).filter(
-        models.Bid.tenderId == tenderId
-    ).order_by(models.Bid.name).limit(limit).offset(offset).all()
+        if not bids:
+            raise HTTPException(status_code=404, detail="Тендер или предложение не найдено.")
+        return bids
 
-    if not bids:
-        raise HTTPException(status_code=404, detail="Тендер или предложение не найдено.")
+    return cached_list_response(request, response, bids_generation(tender.id), schemas.Bid, load_bids)
+
+
+@router.get("/{tenderId}/export",
+            responses={
+                400: error_responses[400],
+                401: error_responses[401],
+                403: error_responses[403],
+                404: {
+                    "description": "Тендер не найден.",
+                    "content": {
+                        "application/json": {
+                            "example": {"reason": "Тендер не найден."}
+                        }
+                    }
+                }
+            })
+def export_bids_tender(tenderId: str, username: str, format: ExportFormat = "ndjson",
+                       db: Session = Depends(get_db)):
+    tender = check_tender_export(db, tenderId, username)
 
-    return bids
+    statement = select(*list_columns(models.Bid, schemas.Bid)).where(
+        models.Bid.tenderId == tender.id
+    ).order_by(models.Bid.name, models.Bid.id)
+    return export_response(statement, format, "bids")
+
+
+@router.get("/{tenderId}/history/export",
+            responses={
+                400: error_responses[400],
+                401: error_responses[401],
+                403: error_responses[403],
+                404: {
+                    "description": "Тендер не найден.",
+                    "content": {
+                        "application/json": {
+                            "example": {"reason": "Тендер не найден."}
+                        }
+                    }
+                }
+            })
+def export_bids_history(tenderId: str, username: str, format: ExportFormat = "ndjson",
+                        db: Session = Depends(get_db)):
+    tender = check_tender_export(db, tenderId, username)
+
+    statement = history_statement(models.BidVersion, models.Bid, "bidId", models.Bid.tenderId == tender.id)
+    return export_response(statement, format, "bid_history")
 
 
 @router.patch("/{bidId}/edit", response_model=schemas.Bid,
@@ -209,14 +361,17 @@ def get_bids_tender(tenderId: str, username: str,
                   400: error_responses[400],
                   401: error_responses[401],
                   403: error_responses[403],
-                  404: error_responses[404]
+                  404: error_responses[404],
+                  409: error_responses[409],
+                  412: error_responses[412]
               })
-def update_bid(bidId: str, username: str, bid_update: schemas.BidUpdate, db: Session = Depends(get_db)):
-    db_bid = db.query(models.Bid).get(bidId)
+def update_bid(bidId: str, username: str, bid_update: schemas.BidUpdate,
+               if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    identity = resolve_identity(db, username, bid_id=bidId)
+    db_bid = identity.bid
     if not db_bid:
         raise HTTPException(status_code=404, detail="Предложение не найдено.")
-    user = db.query(models.Employee).filter(
-        models.Employee.username == username).first()
+    user = identity.user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
@@ -226,16 +381,14 @@ def update_bid(bidId: str, username: str, bid_update: schemas.BidUpdate, db: Ses
         if not organization:
             raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения действия.")
 
+    next_version(db, db_bid, expected_version(if_match))
     if bid_update.name is not None:
         db_bid.name = bid_update.name
     if bid_update.description is not None:
         db_bid.description = bid_update.description
 
-    db_bid.version += 1
-    db.commit()
-    db.refresh(db_bid)
-
     add_bid_backup(db, db_bid)
+    db.commit()
 
     return db_bid
 
@@ -252,15 +405,18 @@ def update_bid(bidId: str, username: str, bid_update: schemas.BidUpdate, db: Ses
                             "example": {"reason": "Предложение или версия не найдены."}
                         }
                     }
-                }
+                },
+                409: error_responses[409],
+                412: error_responses[412]
             })
-def rollback_bid(bidId: str, version: int, username: str, db: Session = Depends(get_db)):
-    db_bid = db.query(models.Bid).get(bidId)
+def rollback_bid(bidId: str, version: int, username: str,
+                 if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    identity = resolve_identity(db, username, bid_id=bidId)
+    db_bid = identity.bid
     if not db_bid:
         raise HTTPException(status_code=400, detail="Предложение или версия не найдены.")
 
-    user = db.query(models.Employee).filter(
-        models.Employee.username == username).first()
+    user = identity.user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
@@ -270,23 +426,17 @@ def rollback_bid(bidId: str, version: int, username: str, db: Session = Depends(
         if not organization:
             raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения действия.")
 
-    db_bid_history = db.query(models.BidVersion).filter(
-        models.BidVersion.bidId == bidId,
-        models.BidVersion.version == version
-    ).first()
+    db_bid_history = load_version(db, models.Bid, bidId, version)
 
     if not db_bid_history:
         raise HTTPException(status_code=404, detail="Предложение или версия не найдены.")
 
+    next_version(db, db_bid, expected_version(if_match))
     db_bid.name = db_bid_history.name
     db_bid.description = db_bid_history.description
-    db_bid.status = db_bid_history.status
-    db_bid.version += 1
-
-    db.commit()
-    db.refresh(db_bid)
-
+    set_bid_status(db, db_bid, db_bid_history.status)
     add_bid_backup(db, db_bid)
+    db.commit()
 
     return db_bid
 
@@ -305,41 +455,34 @@ def rollback_bid(bidId: str, version: int, username: str, db: Session = Depends(
                     }
                 }
             })
+@query_budget(queries=7)
 def submit_decision(bidId: str, decision: models.BibDecision, username: str, db: Session = Depends(get_db)):
-    bid = db.query(models.Bid).get(bidId)
+    identity = resolve_identity(db, username, bid_id=bidId)
+    bid = identity.bid
     if not bid:
         raise HTTPException(status_code=404, detail="Предложение не найдено.")
     if bid.status == models.BidStatus.CANCELED:
         raise HTTPException(status_code=400, detail="Решение не может быть отправлено.")
-    user = db.query(models.Employee).filter(
-        models.Employee.username == username).first()
+    user = identity.user
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден.")
-    tender = db.query(models.Tender).get(bid.tenderId)
+    tender = identity.tender
     check_organization_responsible(db, user_id=user.id, organization_id=tender.organizationId)
 
-    db_decision = models.BidDecisionUsers(
-        bidId=bidId,
-        decision=decision,
-        username=username
-    )
-    db.add(db_decision)
-    db.commit()
-    db.refresh(db_decision)
+    voted = add_decision(db, bid, decision, username)
+    if voted:
+        count_decision(db, bid.tenderId, decision)
 
     if decision == models.BibDecision.REJECTED:
-        bid.status = models.BidStatus.CANCELED
-    else:
-        current_quorum = len(db.query(models.BidDecisionUsers).filter(
-            models.BidDecisionUsers.bidId == bidId).all())
-        quorum = len(db.query(models.OrganizationResponsible).filter(
-            models.OrganizationResponsible.organization_id == tender.organizationId
-        ).all())
-        if current_quorum >= min(3, quorum):
-            tender.status = models.TenderStatus.CLOSED
-
+        set_bid_status(db, bid, models.BidStatus.CANCELED)
+    elif voted and has_quorum(db, bid, tender):
+        tender.status = models.TenderStatus.CLOSED
+        publish(db, "tender.status", tender.id, tender.organizationId, status=tender.status, version=tender.version)
+
+    if voted:
+        publish(db, "bid.decision", tender.id, tender.organizationId, bidId=bid.id, decision=decision,
+                status=bid.status)
     db.commit()
-    db.refresh(bid)
 
     return bid
 
@@ -359,23 +502,25 @@ def submit_decision(bidId: str, decision: models.BibDecision, username: str, db:
                 }
             })
 def submit_review(bidId: str, bidFeedback: str, username: str, db: Session = Depends(get_db)):
-    bid = db.query(models.Bid).get(bidId)
+    identity = resolve_identity(db, username, bid_id=bidId)
+    bid = identity.bid
     if not bid:
         raise HTTPException(status_code=404, detail="Предложение не найдено.")
-    user = db.query(models.Employee).filter(
-        models.Employee.username == username).first()
+    user = identity.user
     if not user:
         raise HTTPException(status_code=403, detail="Пользователь не существует или некорректен.")
-    tender = db.query(models.Tender).get(bid.tenderId)
+    tender = identity.tender
     check_organization_responsible(db, user_id=user.id, organization_id=tender.organizationId)
 
     feedback = models.BidReview(
         bidAuthorId=bid.authorId,
+        bidId=bid.id,
         description=bidFeedback
     )
     db.add(feedback)
+    count_review(db, bid.tenderId)
+    publish(db, "bid.review", tender.id, tender.organizationId, bidId=bid.id)
     db.commit()
-    db.refresh(feedback)
 
     return bid
 
@@ -394,44 +539,48 @@ def submit_review(bidId: str, bidFeedback: str, username: str, db: Session = Dep
                     }
                 }
             })
+@query_budget(queries=4)
 def get_reviews(tenderId: str,
                 authorUsername: str,
                 requesterUsername: str,
+                request: Request,
+                response: Response,
                 limit: int = 5, offset: int = 0,
+                cursor: Optional[str] = None,
                 db: Session = Depends(get_db)):
-    tender = db.query(models.Tender).get(tenderId)
+    identity = resolve_identity(db, requesterUsername, tender_id=tenderId, author_username=authorUsername)
+    tender = identity.tender
     if not tender:
         raise HTTPException(status_code=404, detail="Тендер или отзывы не найдены")
-    user_author = db.query(models.Employee).filter(
-        models.Employee.username == authorUsername
-    ).first()
+    user_author = identity.author
     if not user_author:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
-    user_requester = db.query(models.Employee).filter(
-        models.Employee.username == requesterUsername
-    ).first()
+    user_requester = identity.user
     if not user_requester:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
     check_organization_responsible(db, user_id=user_requester.id, organization_id=tender.organizationId)
 
-    query_reviews = db.query(models.BidReview).filter(
+    query_reviews = list_query(db, models.BidReview, schemas.BidReview).filter(
         models.BidReview.bidAuthorId == user_author.id
     )
 
-    reviews = query_reviews.limit(limit).offset(offset).all()
+    reviews = paginate(query_reviews, [models.BidReview.createdAt, models.BidReview.id], limit, offset, cursor, response)
 
     if not reviews:
         raise HTTPException(status_code=404, detail="Тендер или отзывы не найдены")
 
-    return reviews
+    return list_response(reviews, schemas.BidReview, response, request)
 
 
 def check_organization_responsible(db: Session, user_id: int, organization_id: int):
-    query = db.query(models.OrganizationResponsible).filter(
-        models.OrganizationResponsible.organization_id == organization_id,
-        models.OrganizationResponsible.user_id == user_id
-    ).first()
+    query = remembered_responsible(db, user_id, organization_id)
+    if query is None:
+        query = db.query(models.OrganizationResponsible).filter(
+            models.OrganizationResponsible.organization_id == organization_id,
+            models.OrganizationResponsible.user_id == user_id
+        ).first() is not None
+        remember_responsible(db, user_id, organization_id, query)
 
     if not query:
         raise HTTPException(status_code=400, detail="Недостаточно прав для выполнения действия.")
@@ -439,17 +588,65 @@ def check_organization_responsible(db: Session, user_id: int, organization_id: i
     return query
 
 
-def add_bid_backup(db: Session, bid: models.Bid):
-    bid = models.BidVersion(
-        bidId=bid.id,
-        name=bid.name,
-        description=bid.description,
-        status=bid.status,
-        version=bid.version
-    )
+def check_tender_export(db: Session, tender_id: str, username: str) -> models.Tender:
+    identity = resolve_identity(db, username, tender_id=tender_id)
+    tender = identity.tender
+    if not tender:
+        raise HTTPException(status_code=404, detail="Тендер не найден.")
+    user = identity.user
+    if not user:
+        raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
-    db.add(bid)
-    db.commit()
-    db.refresh(bid)
+    check_organization_responsible(db, user_id=user.id, organization_id=tender.organizationId)
+    return tender
 
-    return bid
+
+def add_bid_backup(db: Session, bid: models.Bid):
+    return add_snapshot(db, bid)
+
+
+# Повторный голос пользователя отсекает уникальный индекс (bidId, username), а не поиск по таблице.
+# Повтор того же решения ничего не меняет (False), поменять поданное решение нельзя — 400.
+# Счетчик approvalCount растет только вместе с записанным одобрением и в обоих режимах QUORUM_MODE,
+# поэтому режим можно переключать без пересчета
+def add_decision(db: Session, bid: models.Bid, decision: models.BibDecision, username: str) -> bool:
+    inserted = db.execute(
+        insert(models.BidDecisionUsers).values(id=uuid.uuid4(), bidId=bid.id, decision=decision, username=username)
+        .on_conflict_do_nothing(index_elements=["bidId", "username"])
+        .returning(models.BidDecisionUsers.id)
+    ).first()
+    if inserted is None:
+        recorded = db.execute(select(models.BidDecisionUsers.decision).where(
+            models.BidDecisionUsers.bidId == bid.id,
+            models.BidDecisionUsers.username == username
+        )).scalar_one()
+        if recorded != decision:
+            raise HTTPException(status_code=400, detail="Решение не может быть отправлено.")
+        return False
+
+    if decision == models.BibDecision.APPROVED:
+        approvals = db.execute(
+            update(models.Bid.__table__)
+            .where(models.Bid.__table__.c.id == bid.id)
+            .values(approvalCount=models.Bid.__table__.c.approvalCount + 1)
+            .returning(models.Bid.__table__.c.approvalCount)
+        ).scalar_one()
+        set_committed_value(bid, "approvalCount", approvals)
+    return True
+
+
+# Кворум — не меньше min(3, число ответственных) одобрений, проверяется одним запросом и ничего не меняет
+def has_quorum(db: Session, bid: models.Bid, tender: models.Tender) -> bool:
+    responsible = select(func.count()).where(
+        models.OrganizationResponsible.organization_id == tender.organizationId
+    ).scalar_subquery()
+    quorum = func.least(3, responsible)
+
+    if quorum_mode == "counter":
+        approvals = select(models.Bid.approvalCount).where(models.Bid.id == bid.id).scalar_subquery()
+    else:
+        approvals = select(func.count()).where(
+            models.BidDecisionUsers.bidId == bid.id,
+            models.BidDecisionUsers.decision == models.BibDecision.APPROVED
+        ).scalar_subquery()
+    return db.execute(select(approvals >= quorum)).scalar_one()
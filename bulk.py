@@ -0,0 +1,176 @@
+import os
+import uuid
+from typing import List, Optional
+
+import orjson
+from fastapi import HTTPException, Request
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+import models
+import schemas
+from history import add_initial_snapshots
+from stats import count_new_bid
+
+
+# МАССОВЫЙ ИМПОРТ ТЕНДЕРОВ И ПРЕДЛОЖЕНИЙ
+# Тело — JSON-массив или NDJSON (Content-Type: application/x-ndjson). Авторы и организации проверяются
+# несколькими запросами на весь пакет, сущности, первые версии и tender_user вставляются multi-row INSERT
+# пачками по BULK_INSERT_BATCH строк в одной транзакции. Результат — статус по каждому элементу.
+bulk_insert_batch = int(os.getenv("BULK_INSERT_BATCH", "1000"))
+
+BAD_REQUEST = "Неверный формат запроса или его параметры."
+UNAUTHORIZED = "Пользователь не существует или некорректен."
+FORBIDDEN = "Недостаточно прав для выполнения действия."
+TENDER_NOT_FOUND = "Тендер не найден."
+
+adapters = {}
+
+
+async def bulk_items(request: Request) -> list:
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            return [orjson.loads(line) for line in body.splitlines() if line.strip()]
+        items = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail=BAD_REQUEST)
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail=BAD_REQUEST)
+    return items
+
+
+class BulkImport:
+    def __init__(self, items: list, schema):
+        if schema not in adapters:
+            adapters[schema] = TypeAdapter(schema)
+        self.results: List[Optional[schemas.BulkItem]] = [None] * len(items)
+        self.valid = []
+        for index, item in enumerate(items):
+            try:
+                self.valid.append((index, adapters[schema].validate_python(item)))
+            except ValidationError:
+                self.fail(index, 400, BAD_REQUEST)
+
+    def fail(self, index: int, status: int, reason: str):
+        self.results[index] = schemas.BulkItem(index=index, status=status, reason=reason)
+
+    def accept(self, index: int, entity_id: uuid.UUID):
+        self.results[index] = schemas.BulkItem(index=index, status=200, id=entity_id)
+
+    def result(self) -> schemas.BulkResult:
+        created = sum(1 for item in self.results if item.status == 200)
+        return schemas.BulkResult(created=created, failed=len(self.results) - created, items=self.results)
+
+
+def parse_uuid(value: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        return None
+
+
+def insert_rows(db: Session, model, rows: list):
+    for start in range(0, len(rows), bulk_insert_batch):
+        db.execute(insert(model), rows[start:start + bulk_insert_batch])
+
+
+def import_tenders(db: Session, items: list) -> schemas.BulkResult:
+    batch = BulkImport(items, schemas.TenderCreate)
+
+    usernames = {tender.creatorUsername for _, tender in batch.valid}
+    users = dict(db.execute(
+        select(models.Employee.username, models.Employee.id).where(models.Employee.username.in_(usernames))
+    ).all()) if usernames else {}
+    organization_ids = {parse_uuid(tender.organizationId) for _, tender in batch.valid} - {None}
+    responsible = set(db.execute(
+        select(models.OrganizationResponsible.user_id, models.OrganizationResponsible.organization_id).where(
+            models.OrganizationResponsible.user_id.in_(set(users.values())),
+            models.OrganizationResponsible.organization_id.in_(organization_ids)
+        )
+    ).all()) if users and organization_ids else set()
+
+    tenders, links = [], []
+    for index, tender in batch.valid:
+        user_id = users.get(tender.creatorUsername)
+        if user_id is None:
+            batch.fail(index, 401, UNAUTHORIZED)
+            continue
+        organization_id = parse_uuid(tender.organizationId)
+        if (user_id, organization_id) not in responsible:
+            batch.fail(index, 403, FORBIDDEN)
+            continue
+
+        tender_id = uuid.uuid4()
+        tenders.append({
+            "id": tender_id,
+            "name": tender.name,
+            "description": tender.description,
+            "serviceType": tender.serviceType,
+            "status": models.TenderStatus.CREATED,
+            "organizationId": organization_id,
+            "version": 1,
+        })
+        links.append({"tenderId": tender_id, "userId": user_id})
+        batch.accept(index, tender_id)
+
+    insert_rows(db, models.Tender, tenders)
+    add_initial_snapshots(db, models.Tender, tenders)
+    insert_rows(db, models.TenderUser, links)
+    db.commit()
+
+    return batch.result()
+
+
+def import_bids(db: Session, items: list) -> schemas.BulkResult:
+    batch = BulkImport(items, schemas.BidCreate)
+
+    tender_ids = {parse_uuid(bid.tenderId) for _, bid in batch.valid} - {None}
+    tender_statuses = dict(db.execute(
+        select(models.Tender.id, models.Tender.status).where(models.Tender.id.in_(tender_ids))
+    ).all()) if tender_ids else {}
+
+    author_models = {models.BidAuthorType.ORGANIZATION: models.Organization,
+                     models.BidAuthorType.USER: models.Employee}
+    authors = set()
+    for author_type, model in author_models.items():
+        ids = {parse_uuid(bid.authorId) for _, bid in batch.valid if bid.authorType == author_type} - {None}
+        if ids:
+            authors.update((author_type, author_id)
+                           for author_id in db.scalars(select(model.id).where(model.id.in_(ids))))
+
+    bids = []
+    for index, bid in batch.valid:
+        tender_id = parse_uuid(bid.tenderId)
+        if tender_id not in tender_statuses:
+            batch.fail(index, 404, TENDER_NOT_FOUND)
+            continue
+        author_id = parse_uuid(bid.authorId)
+        if (bid.authorType, author_id) not in authors:
+            batch.fail(index, 401, UNAUTHORIZED)
+            continue
+        if tender_statuses[tender_id] != models.TenderStatus.PUBLISHED:
+            batch.fail(index, 403, FORBIDDEN)
+            continue
+
+        bid_id = uuid.uuid4()
+        bids.append({
+            "id": bid_id,
+            "name": bid.name,
+            "description": bid.description,
+            "status": models.BidStatus.CREATED,
+            "tenderId": tender_id,
+            "authorType": bid.authorType,
+            "authorId": author_id,
+            "version": 1,
+        })
+        batch.accept(index, bid_id)
+
+    insert_rows(db, models.Bid, bids)
+    add_initial_snapshots(db, models.Bid, bids)
+    for bid in bids:
+        count_new_bid(db, bid["tenderId"])
+    db.commit()
+
+    return batch.result()
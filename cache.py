@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+import models
+
+
+cache_ttl = float(os.getenv("CACHE_TTL", "60"))
+cache_max_size = int(os.getenv("CACHE_MAX_SIZE", "10000"))
+
+_missing = object()
+
+
+# Ограниченный по размеру кэш с TTL и вытеснением давно не использованных записей
+class TTLCache:
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+        with self._lock:
+            item = self._data.get(key, _missing)
+            if item is _missing or item[1] < time.monotonic():
+                if item is not _missing:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# username -> значения колонок Employee
+employee_cache = TTLCache(cache_max_size, cache_ttl)
+# (user_id, organization_id) -> является ли пользователь ответственным
+responsible_cache = TTLCache(cache_max_size, cache_ttl)
+
+
+def cache_stats():
+    return {
+        "employee": employee_cache.stats(),
+        "responsible": responsible_cache.stats(),
+    }
+
+
+# ИНВАЛИДАЦИЯ ПРИ ЗАПИСИ В employee И organization_responsible
+# Затронутые ключи собираются в session.info и удаляются из кэшей после коммита: удаление при flush оставляло
+# окно, в котором параллельный запрос снова кэшировал старую строку, и сбрасывало кэш при откате
+ALL_KEYS = object()
+
+
+def evict_after_commit(session, *entries):
+    if session is not None:
+        session.info.setdefault("cache_evictions", set()).update(entries)
+
+
+@event.listens_for(models.Employee, "after_insert")
+@event.listens_for(models.Employee, "after_update")
+@event.listens_for(models.Employee, "after_delete")
+def invalidate_employee(mapper, connection, target):
+    usernames = [target.username, *(inspect(target).attrs.username.history.deleted or ())]
+    evict_after_commit(object_session(target), ("user", str(target.id)),
+                       *(("employee", username) for username in usernames))
+
+
+@event.listens_for(models.OrganizationResponsible, "after_insert")
+@event.listens_for(models.OrganizationResponsible, "after_update")
+@event.listens_for(models.OrganizationResponsible, "after_delete")
+def invalidate_responsible(mapper, connection, target):
+    attrs = inspect(target).attrs
+    evict_after_commit(object_session(target), *(
+        ("responsible", (str(user_id), str(organization_id)))
+        for user_id in [target.user_id, *(attrs.user_id.history.deleted or ())]
+        for organization_id in [target.organization_id, *(attrs.organization_id.history.deleted or ())]
+    ))
+
+
+# Массовые INSERT/UPDATE/DELETE через сессию не вызывают событий маппера, поэтому кэш сбрасывается целиком
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_on_bulk_write(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is models.Employee:
+        evict_after_commit(orm_execute_state.session, ("employee", ALL_KEYS), ("responsible", ALL_KEYS))
+    elif mapper is not None and mapper.class_ is models.OrganizationResponsible:
+        evict_after_commit(orm_execute_state.session, ("responsible", ALL_KEYS))
+
+
+@event.listens_for(Session, "after_commit")
+def apply_evictions(session):
+    for kind, key in session.info.pop("cache_evictions", ()):
+        if kind == "user":
+            responsible_cache.delete_where(lambda cached: cached[0] == key)
+            continue
+        cache = employee_cache if kind == "employee" else responsible_cache
+        if key is ALL_KEYS:
+            cache.clear()
+        else:
+            cache.delete(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_evictions(session):
+    session.info.pop("cache_evictions", None)
@@ -1,6 +1,9 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from db_pool import TimedQueuePool, TimedAsyncAdaptedQueuePool
 import os
 
 
@@ -20,11 +23,53 @@ postgres_host = os.getenv("POSTGRES_HOST", "localhost")
 postgres_port = os.getenv("POSTGRES_PORT", "5432")
 postgres_database = os.getenv("POSTGRES_DATABASE")
 
+# РЕЖИМ РАБОТЫ С БАЗОЙ: sync (Session в threadpool) или async (AsyncSession на asyncpg)
+db_mode = os.getenv("DB_MODE", "sync")
+# ЗАЩИТА ВЕРСИЙ ПРИ ПАРАЛЛЕЛЬНЫХ ПРАВКАХ: cas (UPDATE ... WHERE version = :expected),
+# lock (SELECT ... FOR UPDATE) или none
+version_mode = os.getenv("VERSION_MODE", "cas")
+
 SQLALCHEMY_DATABASE_URL = f"postgresql://{postgres_username}:{postgres_password}@{postgres_host}:{postgres_port}/{postgres_database}"
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SQLALCHEMY_ASYNC_DATABASE_URL = f"postgresql+asyncpg://{postgres_username}:{postgres_password}@{postgres_host}:{postgres_port}/{postgres_database}"
+# ПАРАМЕТРЫ ПУЛА СОЕДИНЕНИЙ
+# DB_PGBOUNCER=1 — режим совместимости с PgBouncer: без пула на стороне приложения
+# и без серверных prepared statements
+db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "0") == "1"
+db_pgbouncer = os.getenv("DB_PGBOUNCER", "0") == "1"
+
+
+def engine_options(poolclass):
+    if db_pgbouncer:
+        return {"poolclass": NullPool, "pool_pre_ping": db_pool_pre_ping}
+    return {
+        "poolclass": poolclass,
+        "pool_size": db_pool_size,
+        "max_overflow": db_max_overflow,
+        "pool_timeout": db_pool_timeout,
+        "pool_recycle": db_pool_recycle,
+        "pool_pre_ping": db_pool_pre_ping,
+    }
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(TimedQueuePool))
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
+async_engine = None
+AsyncSessionLocal = None
+if db_mode == "async":
+    async_connect_args = {}
+    if db_pgbouncer:
+        async_connect_args = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+    async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, connect_args=async_connect_args,
+                                       **engine_options(TimedAsyncAdaptedQueuePool))
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession,
+                                           autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -32,3 +77,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
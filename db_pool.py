@@ -0,0 +1,58 @@
+import threading
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+# Пул соединений с учетом времени выдачи соединения: ожидание в очереди пула
+# и, если свободных нет и overflow не исчерпан, открытие нового соединения
+class AcquireTimeMixin:
+    def __init__(self, *args, **kwargs):
+        self._acquire_lock = threading.Lock()
+        self.acquire_count = 0
+        self.acquire_total = 0.0
+        self.acquire_max = 0.0
+        super().__init__(*args, **kwargs)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self._record_acquire(time.perf_counter() - started)
+
+    def _record_acquire(self, elapsed: float):
+        with self._acquire_lock:
+            self.acquire_count += 1
+            self.acquire_total += elapsed
+            self.acquire_max = max(self.acquire_max, elapsed)
+
+
+class TimedQueuePool(AcquireTimeMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(AcquireTimeMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(engine):
+    if engine is None:
+        return None
+
+    pool = engine.pool
+    if isinstance(pool, NullPool):
+        return {"pool": "NullPool"}
+
+    acquire_count = getattr(pool, "acquire_count", 0)
+    acquire_total = getattr(pool, "acquire_total", 0.0)
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "acquire_count": acquire_count,
+        "acquire_avg_ms": round(acquire_total / acquire_count * 1000, 3) if acquire_count else 0.0,
+        "acquire_max_ms": round(getattr(pool, "acquire_max", 0.0) * 1000, 3),
+    }
@@ -0,0 +1,238 @@
+import asyncio
+import enum
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event, func
+from sqlalchemy import select as sql_select
+from sqlalchemy.orm import Session
+
+from database import engine, get_db
+from identity import remembered_responsible, resolve_identity
+
+
+# ЛЕНТА ИЗМЕНЕНИЙ ТЕНДЕРОВ И ПРЕДЛОЖЕНИЙ (Server-Sent Events)
+# Обработчики добавляют события в session.info, подписчики получают их только после коммита.
+# EVENTS_BROKER: memory — рассылка внутри процесса (один воркер, проверка без Postgres),
+#   postgres — NOTIFY в транзакции изменения (Postgres доставляет его только после коммита), каждый воркер
+#   слушает канал отдельным соединением и раздает события своим подписчикам
+# У каждого подписчика очередь на EVENTS_QUEUE_SIZE событий; если клиент не успевает ее разбирать,
+# он получает событие overflow и поток закрывается — клиент перечитывает статусы и подписывается снова.
+events_broker = os.getenv("EVENTS_BROKER", "memory")
+events_queue_size = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+events_heartbeat = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+
+CHANNEL = "tender_events"
+OVERFLOW = {"type": "overflow"}
+
+logger = logging.getLogger("events")
+router = APIRouter()
+
+
+def encode(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def publish(db: Session, event_type: str, tender_id, organization_id, **fields):
+    db.info.setdefault("events", []).append({
+        "type": event_type,
+        "tenderId": str(tender_id),
+        "organizationId": str(organization_id) if organization_id is not None else None,
+        **{name: encode(value) for name, value in fields.items()},
+    })
+
+
+class Subscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, tender_id: Optional[str], organization_id: Optional[str]):
+        self.loop = loop
+        self.tender_id = tender_id
+        self.organization_id = organization_id
+        self.queue = asyncio.Queue(events_queue_size)
+        self.overflowed = False
+
+    def matches(self, change: dict) -> bool:
+        if self.tender_id is not None:
+            return change["tenderId"] == self.tender_id
+        return change["organizationId"] == self.organization_id
+
+    # Выполняется в цикле событий подписчика
+    def offer(self, change: dict):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(change)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+
+class Broker:
+    def __init__(self):
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+        self.stats = {"published": 0, "delivered": 0, "overflowed": 0}
+
+    def subscribe(self, tender_id: Optional[str], organization_id: Optional[str]) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), tender_id, organization_id)
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            if subscription in self.subscriptions and subscription.overflowed:
+                self.stats["overflowed"] += 1
+            self.subscriptions.discard(subscription)
+
+    # Вызывается из любого потока: после коммита в обработчике или из слушателя NOTIFY
+    def publish(self, changes: list):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        deliveries = [(subscription, change) for subscription in subscriptions
+                      for change in changes if subscription.matches(change)]
+        with self.lock:
+            self.stats["published"] += len(changes)
+            self.stats["delivered"] += len(deliveries)
+        for subscription, change in deliveries:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, change)
+            except RuntimeError:
+                # цикл событий подписчика уже закрыт
+                self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+# Слушатель канала: отдельное соединение вне пула в автокоммите, переподключается при ошибке
+class Listener(threading.Thread):
+    def __init__(self):
+        super().__init__(name="events-listener", daemon=True)
+        self.started_lock = threading.Lock()
+
+    def ensure_started(self):
+        with self.started_lock:
+            if not self.is_alive():
+                self.start()
+
+    def run(self):
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.exception("events listener failed, reconnecting")
+                time.sleep(1)
+
+    def listen(self):
+        connection = engine.raw_connection()
+        connection.detach()
+        dbapi_connection = connection.dbapi_connection
+        dbapi_connection.autocommit = True
+        try:
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            while True:
+                if select.select([dbapi_connection], [], [], events_heartbeat) == ([], [], []):
+                    continue
+                dbapi_connection.poll()
+                changes = []
+                while dbapi_connection.notifies:
+                    changes.append(orjson.loads(dbapi_connection.notifies.pop(0).payload))
+                if changes:
+                    broker.publish(changes)
+        finally:
+            dbapi_connection.close()
+
+
+listener = Listener()
+
+
+@event.listens_for(Session, "before_commit")
+def notify_changes(session):
+    if events_broker != "postgres":
+        return
+    for change in session.info.pop("events", ()):
+        session.execute(sql_select(func.pg_notify(CHANNEL, orjson.dumps(change).decode())))
+
+
+@event.listens_for(Session, "after_commit")
+def publish_changes(session):
+    changes = session.info.pop("events", None)
+    if changes:
+        broker.publish(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changes(session):
+    session.info.pop("events", None)
+
+
+def format_event(change: dict) -> bytes:
+    return b"event: " + change["type"].encode() + b"\ndata: " + orjson.dumps(change) + b"\n\n"
+
+
+# Подписка на тендер (tenderId) или на все тендеры организации (organizationId) — для ответственных
+def subscription_filter(username: str, tenderId: Optional[str] = None, organizationId: Optional[uuid.UUID] = None,
+                        db: Session = Depends(get_db)) -> dict:
+    if (tenderId is None) == (organizationId is None):
+        raise HTTPException(status_code=400, detail="Неверный формат запроса или его параметры.")
+
+    organization_id = str(organizationId) if organizationId is not None else None
+    identity = resolve_identity(db, username, tender_id=tenderId, organization_id=organization_id)
+    if tenderId is not None:
+        if not identity.tender:
+            raise HTTPException(status_code=404, detail="Тендер не найден.")
+        organization_id = str(identity.tender.organizationId)
+    if not identity.user:
+        raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
+    if not remembered_responsible(db, identity.user.id, organization_id):
+        raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения действия.")
+
+    return {"tender_id": str(identity.tender.id) if tenderId is not None else None,
+            "organization_id": None if tenderId is not None else organization_id}
+
+
+async def stream(request: Request, subscription: Subscription):
+    try:
+        yield b": connected\n\n"
+        while True:
+            try:
+                change = await asyncio.wait_for(subscription.queue.get(), events_heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield b": ping\n\n"
+                continue
+            yield format_event(change)
+            if change is OVERFLOW:
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@router.get("/")
+async def get_events(request: Request, scope: dict = Depends(subscription_filter)):
+    if events_broker == "postgres":
+        listener.ensure_started()
+    subscription = broker.subscribe(**scope)
+    return StreamingResponse(stream(request, subscription), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/stats")
+def get_events_stats():
+    return {**broker.stats, "subscribers": len(broker.subscriptions)}
@@ -0,0 +1,70 @@
+import csv
+import enum
+import io
+import os
+from typing import Literal
+
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from database import SessionLocal
+
+
+# ПОТОКОВЫЙ ЭКСПОРТ
+# Строки читаются серверным курсором (yield_per — stream_results) пачками по EXPORT_BATCH и сразу отдаются
+# клиенту, поэтому память не зависит от объема выгрузки. Генератор работает в своей сессии: сессия из get_db
+# закрывается до начала отправки тела ответа.
+export_batch = int(os.getenv("EXPORT_BATCH", "1000"))
+
+ExportFormat = Literal["ndjson", "csv"]
+
+media_types = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def csv_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, dict):
+        return orjson.dumps(value).decode()
+    return value
+
+
+def encode_ndjson(keys, rows) -> bytes:
+    return b"".join(orjson.dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+
+
+def encode_csv(keys, rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if keys is not None:
+        writer.writerow(keys)
+    writer.writerows([csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def stream_rows(statement, format: ExportFormat):
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=export_batch))
+        keys = list(result.keys())
+        if format == "csv":
+            yield encode_csv(keys, [])
+        for rows in result.partitions():
+            yield encode_ndjson(keys, rows) if format == "ndjson" else encode_csv(None, rows)
+    finally:
+        db.close()
+
+
+def export_response(statement, format: ExportFormat, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(statement, format),
+        media_type=media_types[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    )
+
+
+def history_statement(model, entity_model, foreign_key: str, *criteria):
+    return select(*model.__table__.columns).join(entity_model, entity_model.id == getattr(model, foreign_key)).where(
+        *criteria
+    ).order_by(getattr(model, foreign_key), model.version)
@@ -0,0 +1,200 @@
+import os
+import sys
+
+from sqlalchemy import insert, inspect, text
+from sqlalchemy.orm import Session
+
+import models
+
+
+# ИСТОРИЯ ВЕРСИЙ ТЕНДЕРОВ И ПРЕДЛОЖЕНИЙ
+# HISTORY_MODE: app — снимки пишет приложение, trigger — триггеры Postgres (python history.py install-triggers)
+# HISTORY_FORMAT: full — полный снимок на каждую версию, delta — только изменившиеся поля;
+#   каждая HISTORY_KEYFRAME_INTERVAL-я версия хранится полностью
+# HISTORY_RETENTION: сколько последних версий хранить для каждой сущности (0 — без ограничения)
+history_mode = os.getenv("HISTORY_MODE", "app")
+history_format = os.getenv("HISTORY_FORMAT", "full")
+history_keyframe_interval = int(os.getenv("HISTORY_KEYFRAME_INTERVAL", "10"))
+history_retention = int(os.getenv("HISTORY_RETENTION", "0"))
+
+TENDER_FIELDS = ("name", "description", "serviceType", "status")
+BID_FIELDS = ("name", "description", "status")
+
+histories = {
+    models.Tender: (models.TenderVersion, "tenderId", TENDER_FIELDS),
+    models.Bid: (models.BidVersion, "bidId", BID_FIELDS),
+}
+
+
+def is_keyframe(version: int) -> bool:
+    return history_format != "delta" or (version - 1) % history_keyframe_interval == 0
+
+
+def encode(value):
+    return value.name if hasattr(value, "name") else value
+
+
+def decode(model, field, value):
+    enum_class = getattr(model.__table__.c[field].type, "enum_class", None)
+    if enum_class is not None and value is not None:
+        return enum_class[value]
+    return value
+
+
+# Статус меняется и без новой версии (put_*_status, submit_decision), поэтому в дельту попадает всегда
+def changed_fields(entity, fields) -> dict:
+    state = inspect(entity)
+    changes = {}
+    for field in fields:
+        history = state.attrs[field].history
+        if field == "status" or (history.deleted and history.deleted[0] != getattr(entity, field)):
+            changes[field] = encode(getattr(entity, field))
+    return changes
+
+
+def add_snapshot(db: Session, entity):
+    model, foreign_key, fields = histories[type(entity)]
+    if history_mode == "trigger":
+        db.flush()
+        enforce_retention(db, entity)
+        return None
+
+    if is_keyframe(entity.version) or history_retention == 1:
+        snapshot = model(version=entity.version, **{foreign_key: entity.id},
+                         **{field: getattr(entity, field) for field in fields})
+    else:
+        snapshot = model(version=entity.version, delta=changed_fields(entity, fields), **{foreign_key: entity.id})
+
+    db.add(snapshot)
+    enforce_retention(db, entity)
+    return snapshot
+
+
+# Первые версии при массовом импорте: всегда полные снимки, одним multi-row INSERT
+def add_initial_snapshots(db: Session, entity_class, rows: list):
+    if history_mode == "trigger" or not rows:
+        return
+
+    model, foreign_key, fields = histories[entity_class]
+    db.execute(insert(model), [
+        {"version": row["version"], foreign_key: row["id"], **{field: row[field] for field in fields}}
+        for row in rows
+    ])
+
+
+# Полная версия: ближайший полный снимок не позже version плюс последующие дельты
+def load_version(db: Session, entity_class, entity_id, version: int):
+    model, foreign_key, fields = histories[entity_class]
+    query = db.query(model).filter(
+        getattr(model, foreign_key) == entity_id,
+        model.version <= version
+    ).order_by(model.version.desc())
+
+    rows = query.limit(history_keyframe_interval).all()
+    if rows and all(row.delta is not None for row in rows):
+        rows = query.all()
+    if not rows or rows[0].version != version:
+        return None
+    if rows[0].delta is None:
+        return rows[0]
+
+    chain = []
+    for row in rows:
+        chain.append(row)
+        if row.delta is None:
+            break
+
+    values = {field: getattr(chain[-1], field) for field in fields}
+    for row in reversed(chain[:-1]):
+        for field, value in row.delta.items():
+            values[field] = decode(model, field, value)
+    return model(version=version, **{foreign_key: entity_id}, **values)
+
+
+def enforce_retention(db: Session, entity):
+    if history_retention <= 0:
+        return
+
+    oldest = entity.version - history_retention + 1
+    if oldest <= 1:
+        return
+
+    model, foreign_key, fields = histories[type(entity)]
+    entity_filter = getattr(model, foreign_key) == entity.id
+    boundary = db.query(model).filter(entity_filter, model.version == oldest).first()
+    if boundary is not None and boundary.delta is not None:
+        full = load_version(db, type(entity), entity.id, oldest)
+        for field in fields:
+            setattr(boundary, field, getattr(full, field))
+        boundary.delta = None
+
+    db.query(model).filter(entity_filter, model.version < oldest).delete(synchronize_session=False)
+
+
+TRIGGER_TEMPLATE = """
+CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+DECLARE
+    changes jsonb;
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.version IS NOT DISTINCT FROM OLD.version THEN
+        RETURN NEW;
+    END IF;
+
+    IF TG_OP = 'INSERT' OR TG_ARGV[0] <> 'delta' OR (NEW.version - 1) % TG_ARGV[1]::integer = 0 THEN
+        INSERT INTO "{history}" (id, "{foreign_key}", version, {columns})
+        VALUES (uuid_generate_v4(), NEW.id, NEW.version, {new_values});
+    ELSE
+        SELECT jsonb_object_agg(n.key, n.value) INTO changes
+        FROM jsonb_each(jsonb_build_object({new_pairs})) n
+        JOIN jsonb_each(jsonb_build_object({old_pairs})) o USING (key)
+        WHERE n.key = 'status' OR n.value IS DISTINCT FROM o.value;
+
+        INSERT INTO "{history}" (id, "{foreign_key}", version, delta)
+        VALUES (uuid_generate_v4(), NEW.id, NEW.version, changes);
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS {function} ON "{table}";
+CREATE TRIGGER {function} AFTER INSERT OR UPDATE ON "{table}"
+FOR EACH ROW EXECUTE FUNCTION {function}('{format}', '{keyframe_interval}');
+"""
+
+
+def trigger_ddl():
+    statements = []
+    for entity_class, (model, foreign_key, fields) in histories.items():
+        statements.append(TRIGGER_TEMPLATE.format(
+            function=f"{entity_class.__tablename__}_version_snapshot",
+            table=entity_class.__tablename__,
+            history=model.__tablename__,
+            foreign_key=foreign_key,
+            columns=", ".join(f'"{field}"' for field in fields),
+            new_values=", ".join(f'NEW."{field}"' for field in fields),
+            new_pairs=", ".join(f"'{field}', NEW.\"{field}\"" for field in fields),
+            old_pairs=", ".join(f"'{field}', OLD.\"{field}\"" for field in fields),
+            format=history_format,
+            keyframe_interval=history_keyframe_interval,
+        ))
+    return statements
+
+
+def drop_trigger_ddl():
+    return [
+        f'DROP TRIGGER IF EXISTS {entity_class.__tablename__}_version_snapshot ON "{entity_class.__tablename__}"; '
+        f'DROP FUNCTION IF EXISTS {entity_class.__tablename__}_version_snapshot()'
+        for entity_class in histories
+    ]
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    commands = {"install-triggers": trigger_ddl, "drop-triggers": drop_trigger_ddl}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        sys.exit(f"usage: python history.py {'|'.join(commands)}")
+
+    with engine.begin() as connection:
+        for statement in commands[sys.argv[1]]():
+            connection.execute(text(statement))
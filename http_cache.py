@@ -0,0 +1,48 @@
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+# HTTP-КЭШИРОВАНИЕ ЧТЕНИЙ
+# Слабый ETag строится из id, version и status сущности (статус меняется без новой версии), для списка —
+# из этих полей каждой строки страницы. Совпавший If-None-Match дает 304 без сериализации ответа.
+# HTTP_CACHE_CONTROL_PUBLIC — для общедоступного списка тендеров, HTTP_CACHE_CONTROL_PRIVATE — для ответов,
+# зависящих от пользователя
+cache_control_public = os.getenv("HTTP_CACHE_CONTROL_PUBLIC", "public, no-cache")
+cache_control_private = os.getenv("HTTP_CACHE_CONTROL_PRIVATE", "private, no-cache")
+
+ETAG_FIELDS = ("id", "version", "status")
+
+
+def etag(*parts) -> str:
+    digest = hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def entity_etag(entity) -> str:
+    return etag(*(getattr(entity, field, None) for field in ETAG_FIELDS))
+
+
+def rows_etag(rows) -> str:
+    return etag(len(rows), *(getattr(row, field, None) for row in rows for field in ETAG_FIELDS))
+
+
+# Слабое сравнение: W/"x" и "x" совпадают, * совпадает с любым ETag
+def matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    opaque = tag.removeprefix("W/")
+    return any(candidate == "*" or candidate.removeprefix("W/") == opaque
+               for candidate in (value.strip() for value in if_none_match.split(",")))
+
+
+def conditional(request: Request, response: Response, tag: str, public: bool = False) -> Optional[Response]:
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = cache_control_public if public else cache_control_private
+    if not matches(request.headers.get("if-none-match"), tag):
+        return None
+    return Response(status_code=304, headers={
+        key: value for key, value in response.headers.items() if key != "content-length"
+    })
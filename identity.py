@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import and_, literal, select
+from sqlalchemy.orm import Session, aliased, make_transient_to_detached
+
+import models
+from cache import employee_cache, responsible_cache
+
+
+@dataclass
+class Identity:
+    user: Optional[models.Employee] = None
+    tender: Optional[models.Tender] = None
+    bid: Optional[models.Bid] = None
+    author: Optional[models.Employee] = None
+
+
+# Пользователь, его членство в организациях и целевой тендер/предложение одним запросом.
+# Результат сохраняется в db.info и переиспользуется до конца запроса.
+def resolve_identity(db: Session, username: str,
+                     tender_id: Optional[str] = None,
+                     bid_id: Optional[str] = None,
+                     organization_id: Optional[str] = None,
+                     author_username: Optional[str] = None) -> Identity:
+    key = (username, tender_id, bid_id, organization_id, author_username)
+    identities = db.info.setdefault("identities", {})
+    if key in identities:
+        return identities[key]
+
+    if tender_id is None and bid_id is None and organization_id is None and author_username is None:
+        user = remembered_user(db, username)
+        if user is not None:
+            identities[key] = Identity(user=user)
+            return identities[key]
+
+    anchor = select(literal(1).label("anchor")).subquery()
+    entities = {"user": models.Employee}
+    joins = [(models.Employee, models.Employee.username == username)]
+    organization_ids = []
+
+    if bid_id is not None:
+        entities.update(bid=models.Bid, tender=models.Tender)
+        joins += [(models.Bid, models.Bid.id == bid_id),
+                  (models.Tender, models.Tender.id == models.Bid.tenderId)]
+        organization_ids += [models.Tender.organizationId, models.Bid.authorId]
+    elif tender_id is not None:
+        entities["tender"] = models.Tender
+        joins.append((models.Tender, models.Tender.id == tender_id))
+        organization_ids.append(models.Tender.organizationId)
+
+    if organization_id is not None:
+        organization_ids.append(literal(organization_id, models.OrganizationResponsible.organization_id.type))
+
+    if author_username is not None:
+        author = aliased(models.Employee)
+        entities["author"] = author
+        joins.append((author, author.username == author_username))
+
+    if organization_ids:
+        entities["organization_id"] = models.OrganizationResponsible.organization_id
+        joins.append((models.OrganizationResponsible, and_(
+            models.OrganizationResponsible.user_id == models.Employee.id,
+            models.OrganizationResponsible.organization_id.in_(organization_ids)
+        )))
+
+    query = select(*entities.values()).select_from(anchor)
+    for target, onclause in joins:
+        query = query.outerjoin(target, onclause)
+    rows = db.execute(query).all()
+
+    identity = Identity()
+    memberships = set()
+    for row in rows:
+        for field, value in zip(entities, row):
+            if field == "organization_id":
+                if value is not None:
+                    memberships.add(str(value))
+            else:
+                setattr(identity, field, value)
+
+    if identity.user is not None:
+        remember_user(db, identity.user)
+        candidates = [organization_id]
+        if identity.tender is not None:
+            candidates.append(identity.tender.organizationId)
+        if identity.bid is not None:
+            candidates.append(identity.bid.authorId)
+        for candidate in candidates:
+            if candidate is not None:
+                remember_responsible(db, identity.user.id, candidate, str(candidate) in memberships)
+    if identity.author is not None:
+        remember_user(db, identity.author)
+
+    identities[key] = identity
+    return identity
+
+
+# Сначала значения текущего запроса (db.info), затем общий кэш процесса
+def remember_user(db: Session, user: models.Employee):
+    db.info.setdefault("users", {})[user.username] = user
+    employee_cache.set(user.username, {
+        column.key: getattr(user, column.key) for column in models.Employee.__table__.columns
+    })
+
+
+def remembered_user(db: Session, username: str) -> Optional[models.Employee]:
+    users = db.info.setdefault("users", {})
+    if username in users:
+        return users[username]
+
+    values = employee_cache.get(username)
+    if values is None:
+        return None
+
+    user = models.Employee(**values)
+    make_transient_to_detached(user)
+    users[username] = db.merge(user, load=False)
+    return users[username]
+
+
+def remember_responsible(db: Session, user_id, organization_id, is_responsible: bool):
+    key = (str(user_id), str(organization_id))
+    db.info.setdefault("responsible", {})[key] = is_responsible
+    responsible_cache.set(key, is_responsible)
+
+
+def remembered_responsible(db: Session, user_id, organization_id) -> Optional[bool]:
+    key = (str(user_id), str(organization_id))
+    responsible = db.info.setdefault("responsible", {})
+    if key not in responsible:
+        cached = responsible_cache.get(key)
+        if cached is None:
+            return None
+        responsible[key] = cached
+    return responsible[key]
@@ -0,0 +1,279 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+import orjson
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+
+import models
+from cache import TTLCache
+from http_cache import conditional, rows_etag
+from serialization import list_adapter, list_response
+
+
+# ОБЩИЙ КЭШ СПИСКОВ ТЕНДЕРОВ И ПРЕДЛОЖЕНИЙ
+# LIST_CACHE_BACKEND: none — кэш выключен, memory — в памяти процесса, redis — общий для всех воркеров
+#   сервер с протоколом Redis по адресу LIST_CACHE_URL
+# Ключ записи включает поколение: общее для GET /api/tenders/ и свое для предложений каждого тендера.
+# Поколение увеличивается после коммита, изменившего тендер или предложение, и старые записи
+# больше не читаются (истекают по LIST_CACHE_TTL). Промах загружает один запрос, остальные ждут
+# его результата до LIST_CACHE_LOCK_TIMEOUT секунд.
+list_cache_backend = os.getenv("LIST_CACHE_BACKEND", "none")
+list_cache_url = os.getenv("LIST_CACHE_URL", "redis://localhost:6379/0")
+list_cache_ttl = int(os.getenv("LIST_CACHE_TTL", "30"))
+list_cache_max_size = int(os.getenv("LIST_CACHE_MAX_SIZE", "10000"))
+list_cache_lock_timeout = float(os.getenv("LIST_CACHE_LOCK_TIMEOUT", "5"))
+
+PREFIX = "lists:"
+WAIT_INTERVAL = 0.01
+TENDERS_GENERATION = "tenders"
+
+
+class MemoryBackend:
+    errors = ()
+
+    def __init__(self, max_size: int, ttl: float):
+        self._entries = TTLCache(max_size, ttl)
+        self._counters = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: bytes, ttl: int):
+        self._entries.set(key, value)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def generation(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def acquire(self, key: str, token: str, ttl: float) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self._locks.get(key, (None, 0))[1] > now:
+                return False
+            self._locks[key] = (token, now + ttl)
+            return True
+
+    def release(self, key: str, token: str):
+        with self._lock:
+            if self._locks.get(key, (None, 0))[0] == token:
+                del self._locks[key]
+
+
+# В DB_MODE=async обработчик и события коммита выполняются в greenlet в цикле событий (async_routes.py):
+# блокирующие вызовы (сокет redis-py, ожидание чужой загрузки) уходят в поток, чтобы не останавливать
+# остальные запросы воркера
+def off_loop(function, *args, **kwargs):
+    if in_greenlet():
+        return await_only(asyncio.to_thread(function, *args, **kwargs))
+    return function(*args, **kwargs)
+
+
+# Клиент redis-py; подходит любой сервер с протоколом Redis (Redis, Valkey, KeyDB, Dragonfly)
+class RedisBackend:
+    RELEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str):
+        import redis
+
+        self.errors = (redis.RedisError,)
+        self._client = redis.Redis.from_url(url)
+        self._release = self._client.register_script(self.RELEASE)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return off_loop(self._client.get, key)
+
+    def set(self, key: str, value: bytes, ttl: int):
+        off_loop(self._client.set, key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return off_loop(self._client.incr, key)
+
+    def generation(self, key: str) -> int:
+        return int(off_loop(self._client.get, key) or 0)
+
+    def acquire(self, key: str, token: str, ttl: float) -> bool:
+        return bool(off_loop(self._client.set, key, token, nx=True, px=int(ttl * 1000)))
+
+    def release(self, key: str, token: str):
+        off_loop(self._release, keys=[key], args=[token])
+
+
+def create_backend():
+    if list_cache_backend == "memory":
+        return MemoryBackend(list_cache_max_size, list_cache_ttl)
+    if list_cache_backend == "redis":
+        return RedisBackend(list_cache_url)
+    return None
+
+
+backend = create_backend()
+counters = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+counters_lock = threading.Lock()
+
+
+def count(name: str):
+    with counters_lock:
+        counters[name] += 1
+
+
+def list_cache_stats():
+    with counters_lock:
+        stats = dict(counters)
+    requests = stats["hits"] + stats["misses"] + stats["coalesced"]
+    stats["backend"] = list_cache_backend
+    stats["hit_ratio"] = round((stats["hits"] + stats["coalesced"]) / requests, 4) if requests else 0.0
+    return stats
+
+
+def bids_generation(tender_id) -> str:
+    return f"tender:{uuid.UUID(str(tender_id))}"
+
+
+def generation_counter(generation_key: str) -> str:
+    return PREFIX + "generation:" + generation_key
+
+
+def bump_generation(generation_key: str):
+    backend.incr(generation_counter(generation_key))
+
+
+def entry_key(generation_key: str, request: Request) -> str:
+    generation = backend.generation(generation_counter(generation_key))
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items())
+                      if key != "username")
+    return f"{PREFIX}{generation_key}:{generation}:{request.url.path}?{params}"
+
+
+def wait_for_entry(key: str) -> Optional[bytes]:
+    deadline = time.monotonic() + list_cache_lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        value = backend.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def read_through(key: str, load: Callable[[], bytes]) -> bytes:
+    value = backend.get(key)
+    if value is not None:
+        count("hits")
+        return value
+
+    lock_key = key + ":lock"
+    token = uuid.uuid4().hex
+    if not backend.acquire(lock_key, token, list_cache_lock_timeout):
+        value = off_loop(wait_for_entry, key)
+        if value is not None:
+            count("coalesced")
+            return value
+        token = None
+
+    count("misses")
+    try:
+        value = load()
+        backend.set(key, value, list_cache_ttl)
+        return value
+    finally:
+        if token is not None:
+            backend.release(lock_key, token)
+
+
+# Страница списка в кэше хранится вместе с заголовками ETag и X-Next-Cursor
+def cached_list_response(request: Request, response: Response, generation_key: str, schema,
+                         load_rows: Callable[[], list], public: bool = False):
+    if backend is None:
+        return list_response(load_rows(), schema, response, request, public)
+
+    def load() -> bytes:
+        rows = load_rows()
+        headers = {"ETag": rows_etag(rows)}
+        if "X-Next-Cursor" in response.headers:
+            headers["X-Next-Cursor"] = response.headers["X-Next-Cursor"]
+        adapter = list_adapter(schema)
+        body = adapter.dump_json(adapter.validate_python([row._asdict() for row in rows]))
+        return orjson.dumps(headers) + b"\n" + body
+
+    try:
+        entry = read_through(entry_key(generation_key, request), load)
+    except backend.errors:
+        count("errors")
+        return list_response(load_rows(), schema, response, request, public)
+
+    headers, body = entry.split(b"\n", 1)
+    headers = orjson.loads(headers)
+    for key, value in headers.items():
+        response.headers[key] = value
+    not_modified = conditional(request, response, headers["ETag"], public)
+    if not_modified is not None:
+        return not_modified
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={key: value for key, value in response.headers.items() if key != "content-length"}
+    )
+
+
+# ИНВАЛИДАЦИЯ: поколения, затронутые транзакцией, собираются в session.info и увеличиваются после коммита
+def touch(session: Optional[Session], generation_key: str):
+    if backend is not None and session is not None:
+        session.info.setdefault("list_generations", set()).add(generation_key)
+
+
+@event.listens_for(models.Tender, "after_insert")
+@event.listens_for(models.Tender, "after_update")
+@event.listens_for(models.Tender, "after_delete")
+def invalidate_tenders(mapper, connection, target):
+    touch(object_session(target), TENDERS_GENERATION)
+
+
+@event.listens_for(models.Bid, "after_insert")
+@event.listens_for(models.Bid, "after_update")
+@event.listens_for(models.Bid, "after_delete")
+def invalidate_bids(mapper, connection, target):
+    touch(object_session(target), bids_generation(target.tenderId))
+
+
+# Массовые вставки (bulk.py) идут мимо событий маппера
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_on_bulk_write(orm_execute_state):
+    if backend is None or not (orm_execute_state.is_insert or orm_execute_state.is_update):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is models.Tender:
+        touch(orm_execute_state.session, TENDERS_GENERATION)
+    elif mapper is not None and mapper.class_ is models.Bid:
+        parameters = orm_execute_state.parameters
+        rows = parameters if isinstance(parameters, list) else [parameters or {}]
+        for row in rows:
+            if "tenderId" in row:
+                touch(orm_execute_state.session, bids_generation(row["tenderId"]))
+
+
+@event.listens_for(Session, "after_commit")
+def bump_generations(session):
+    for generation_key in session.info.pop("list_generations", ()):
+        try:
+            bump_generation(generation_key)
+        except backend.errors:
+            count("errors")
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_generations(session):
+    session.info.pop("list_generations", None)
@@ -1,16 +1,45 @@
+import asyncio
 from fastapi import FastAPI, Depends, HTTPException, Request
 import models
 import tenders
 import bids
-from database import engine
+import events
+from database import engine, async_engine, db_mode
+from db_pool import pool_status
+from cache import cache_stats
+from list_cache import list_cache_stats
+from metrics import MetricsMiddleware, metrics_response, register_pools
+from query_budget import QueryBudgetMiddleware
+from stats import rebuild_periodically, stats_rebuild_interval
+from outbox import outbox_mode, register_outbox_metrics
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from database import get_db
-from fastapi.responses import JSONResponse
+from async_routes import to_async_router
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 
-models.Base.metadata.create_all(bind=engine)
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(QueryBudgetMiddleware)
+app.add_middleware(MetricsMiddleware)
+register_pools({"sync": engine, "async": async_engine})
+if outbox_mode == "outbox":
+    register_outbox_metrics()
 
-app = FastAPI()
+
+# STATS_REBUILD_INTERVAL > 0: периодический полный пересчет tenderStats
+@app.on_event("startup")
+async def start_stats_rebuild():
+    if stats_rebuild_interval > 0:
+        app.state.stats_rebuild = asyncio.create_task(rebuild_periodically())
+
+
+@app.on_event("shutdown")
+async def stop_stats_rebuild():
+    task = getattr(app.state, "stats_rebuild", None)
+    if task is not None:
+        task.cancel()
 
 
 @app.exception_handler(HTTPException)
@@ -21,6 +50,30 @@ async def custom_http_exception_handler(request: Request, exc: HTTPException):
     )
 
 
+# VERSION_MODE=cas: строку изменил параллельный запрос между чтением и UPDATE
+@app.exception_handler(StaleDataError)
+async def stale_data_exception_handler(request: Request, exc: StaleDataError):
+    return JSONResponse(
+        status_code=409,
+        content={"reason": "Версия изменена параллельным запросом."}
+    )
+
+
+# VERSION_MODE=none: параллельная правка записала в историю тот же номер версии
+# (уникальные индексы ix_tender_version_tender_id_version и ix_bid_version_bid_id_version)
+version_indexes = ("ix_tender_version_tender_id_version", "ix_bid_version_bid_id_version")
+
+
+@app.exception_handler(IntegrityError)
+async def integrity_exception_handler(request: Request, exc: IntegrityError):
+    if not any(name in str(exc.orig) for name in version_indexes):
+        raise exc
+    return JSONResponse(
+        status_code=409,
+        content={"reason": "Версия изменена параллельным запросом."}
+    )
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     return JSONResponse(
@@ -29,8 +82,13 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     )
 
 
-app.include_router(tenders.router, prefix="/api/tenders")
-app.include_router(bids.router, prefix="/api/bids")
+if db_mode == "async":
+    app.include_router(to_async_router(tenders.router), prefix="/api/tenders")
+    app.include_router(to_async_router(bids.router), prefix="/api/bids")
+else:
+    app.include_router(tenders.router, prefix="/api/tenders")
+    app.include_router(bids.router, prefix="/api/bids")
+app.include_router(events.router, prefix="/api/events")
 
 
 @app.get("/api/ping")
@@ -38,6 +96,24 @@ def ping():
     return "ok"
 
 
+@app.get("/api/pool")
+def get_pool_status():
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return metrics_response()
+
+
+@app.get("/api/cache")
+def get_cache_stats():
+    return {**cache_stats(), "lists": list_cache_stats()}
+
+
 @app.get("/api/users")
 def get_users(db: Session = Depends(get_db)):
     return db.query(models.Employee).all()
@@ -0,0 +1,144 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from db_pool import pool_status
+
+
+# МЕТРИКИ PROMETHEUS
+# Запросы, коды ответов и задержка по шаблону маршрута (route) и имени обработчика (operation: submit_decision,
+# rollback_bid, ...), число и время SQL-запросов на запрос, состояние пулов и запросы в работе.
+# При нескольких воркерах uvicorn задайте PROMETHEUS_MULTIPROC_DIR — /metrics соберет значения всех процессов.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUESTS = Counter("http_requests_total", "HTTP requests", ["method", "route", "operation", "status"])
+LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency",
+                    ["method", "route", "operation"], buckets=LATENCY_BUCKETS)
+IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests in progress", multiprocess_mode="livesum")
+DB_QUERIES = Histogram("http_request_db_queries", "SQL statements per HTTP request",
+                       ["method", "route", "operation"], buckets=QUERY_BUCKETS)
+DB_TIME = Histogram("http_request_db_seconds", "SQL execution time per HTTP request",
+                    ["method", "route", "operation"], buckets=LATENCY_BUCKETS)
+
+# Воркер outbox (outbox.py): результат обработки сообщений и время обработчиков
+OUTBOX_MESSAGES = Counter("outbox_messages_total", "Outbox messages handled by the worker", ["kind", "result"])
+OUTBOX_HANDLER_TIME = Histogram("outbox_handler_seconds", "Outbox handler execution time", ["kind"],
+                                buckets=LATENCY_BUCKETS)
+
+request_stats: ContextVar[Optional[dict]] = ContextVar("request_stats", default=None)
+
+# Коллекторы, которые считают значения при чтении /metrics (пулы, отставание outbox); в режиме
+# PROMETHEUS_MULTIPROC_DIR они добавляются к реестру MultiProcessCollector
+collectors = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_query(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def finish_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = request_stats.get()
+    if stats is not None:
+        stats["queries"] += 1
+        stats["db_seconds"] += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "handle_error")
+def fail_query(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+        stats = {"queries": 0, "db_seconds": 0.0}
+        token = request_stats.set(stats)
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            request_stats.reset(token)
+            route = scope.get("route")
+            labels = (scope["method"], route.path if route else "unmatched", route.name if route else "")
+            REQUESTS.labels(*labels, str(status["code"])).inc()
+            LATENCY.labels(*labels).observe(time.perf_counter() - started)
+            DB_QUERIES.labels(*labels).observe(stats["queries"])
+            DB_TIME.labels(*labels).observe(stats["db_seconds"])
+
+
+def multiprocess_mode() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+# Пул принадлежит процессу: при нескольких воркерах /metrics отдает пулы ответившего воркера с меткой pid
+class PoolCollector:
+    def __init__(self, engines: dict):
+        self.engines = engines
+
+    def collect(self):
+        labels = ["engine", "pid"] if multiprocess_mode() else ["engine"]
+        families = {
+            "checked_out": GaugeMetricFamily("db_pool_checked_out", "Connections in use", labels=labels),
+            "idle": GaugeMetricFamily("db_pool_idle", "Idle connections", labels=labels),
+            "overflow": GaugeMetricFamily("db_pool_overflow", "Overflow connections", labels=labels),
+            "acquire_avg_ms": GaugeMetricFamily("db_pool_acquire_avg_ms",
+                                                "Average connection acquire time, including new connections",
+                                                labels=labels),
+        }
+        for name, engine in self.engines.items():
+            status = pool_status(engine)
+            if status is None:
+                continue
+            values = [name, str(os.getpid())][:len(labels)]
+            for key, family in families.items():
+                if key in status:
+                    family.add_metric(values, status[key])
+        return list(families.values())
+
+
+def register_collector(collector):
+    REGISTRY.register(collector)
+    collectors.append(collector)
+
+
+def register_pools(engines: dict):
+    register_collector(PoolCollector(engines))
+
+
+def metrics_response() -> Response:
+    registry = REGISTRY
+    if multiprocess_mode():
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in collectors:
+            registry.register(collector)
+    return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,141 @@
+"""initial schema
+
+Схема, которую раньше создавал models.Base.metadata.create_all. Уже существующие
+таблицы пропускаются, поэтому ревизия применяется и к базам, созданным через create_all.
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2024-09-20 12:00:00
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0001_initial'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+enums = {
+    "organizationtype": ("IE", "LLC", "JSC"),
+    "tenderstatus": ("CREATED", "PUBLISHED", "CLOSED"),
+    "tenderservicetype": ("CONSTRUCTION", "DELIVERY", "MANUFACTURE"),
+    "bidstatus": ("CREATED", "PUBLISHED", "CANCELED"),
+    "bidauthortype": ("ORGANIZATION", "USER"),
+    "bibdecision": ("APPROVED", "REJECTED"),
+}
+
+
+def enum(name):
+    return postgresql.ENUM(*enums[name], name=name, create_type=False)
+
+
+def uuid_pk():
+    return sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True)
+
+
+def create_table(name, *columns):
+    if context.is_offline_mode() or not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns)
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS "uuid-ossp"')
+    for name, labels in enums.items():
+        postgresql.ENUM(*labels, name=name).create(op.get_bind(), checkfirst=not context.is_offline_mode())
+
+    create_table(
+        "employee",
+        uuid_pk(),
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("first_name", sa.String(50)),
+        sa.Column("last_name", sa.String(50)),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    create_table(
+        "organization",
+        uuid_pk(),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("type", enum("organizationtype"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    create_table(
+        "organization_responsible",
+        uuid_pk(),
+        sa.Column("organization_id", postgresql.UUID(), sa.ForeignKey("organization.id", ondelete="CASCADE")),
+        sa.Column("user_id", postgresql.UUID(), sa.ForeignKey("employee.id", ondelete="CASCADE")),
+    )
+    create_table(
+        "tender",
+        uuid_pk(),
+        sa.Column("name", sa.String(100)),
+        sa.Column("description", sa.String(500)),
+        sa.Column("serviceType", enum("tenderservicetype")),
+        sa.Column("status", enum("tenderstatus")),
+        sa.Column("organizationId", postgresql.UUID(), sa.ForeignKey("organization.id", ondelete="CASCADE")),
+        sa.Column("version", sa.Integer()),
+        sa.Column("createdAt", sa.DateTime(), server_default=sa.func.now()),
+    )
+    create_table(
+        "bid",
+        uuid_pk(),
+        sa.Column("name", sa.String(100)),
+        sa.Column("description", sa.String(500)),
+        sa.Column("status", enum("bidstatus")),
+        sa.Column("tenderId", postgresql.UUID()),
+        sa.Column("authorType", enum("bidauthortype")),
+        sa.Column("authorId", postgresql.UUID()),
+        sa.Column("version", sa.Integer()),
+        sa.Column("createdAt", sa.DateTime(), server_default=sa.func.now()),
+    )
+    create_table(
+        "tender_user",
+        uuid_pk(),
+        sa.Column("tenderId", postgresql.UUID(), sa.ForeignKey("tender.id", ondelete="CASCADE")),
+        sa.Column("userId", postgresql.UUID(), sa.ForeignKey("employee.id", ondelete="CASCADE")),
+    )
+    create_table(
+        "tenderVersion",
+        uuid_pk(),
+        sa.Column("tenderId", postgresql.UUID(), sa.ForeignKey("tender.id", ondelete="CASCADE")),
+        sa.Column("name", sa.String(100)),
+        sa.Column("description", sa.String(500)),
+        sa.Column("serviceType", enum("tenderservicetype")),
+        sa.Column("status", enum("tenderstatus")),
+        sa.Column("version", sa.Integer()),
+    )
+    create_table(
+        "bidVersion",
+        uuid_pk(),
+        sa.Column("bidId", postgresql.UUID(), sa.ForeignKey("bid.id", ondelete="CASCADE")),
+        sa.Column("name", sa.String(100)),
+        sa.Column("description", sa.String(500)),
+        sa.Column("status", enum("bidstatus"), nullable=False),
+        sa.Column("version", sa.Integer()),
+    )
+    create_table(
+        "bidReview",
+        uuid_pk(),
+        sa.Column("bidAuthorId", postgresql.UUID()),
+        sa.Column("description", sa.String(1000)),
+        sa.Column("createdAt", sa.DateTime(), server_default=sa.func.now()),
+    )
+    create_table(
+        "BidDecisionUsers",
+        uuid_pk(),
+        sa.Column("bidId", postgresql.UUID(), sa.ForeignKey("bid.id", ondelete="CASCADE")),
+        sa.Column("decision", enum("bibdecision")),
+        sa.Column("username", sa.String(100)),
+    )
+
+
+def downgrade():
+    for name in ("BidDecisionUsers", "bidReview", "bidVersion", "tenderVersion", "tender_user",
+                 "bid", "tender", "organization_responsible", "organization", "employee"):
+        op.drop_table(name)
+    for name in enums:
+        postgresql.ENUM(name=name).drop(op.get_bind(), checkfirst=True)
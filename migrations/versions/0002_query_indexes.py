@@ -0,0 +1,47 @@
+"""indexes for router query predicates
+
+Revision ID: 0002_query_indexes
+Revises: 0001_initial
+Create Date: 2024-09-20 12:30:00
+
+"""
+from alembic import op
+
+revision = '0002_query_indexes'
+down_revision = '0001_initial'
+branch_labels = None
+depends_on = None
+
+indexes = [
+    ("ix_organization_responsible_organization_id_user_id", "organization_responsible",
+     ["organization_id", "user_id"], True),
+    ("ix_organization_responsible_user_id", "organization_responsible", ["user_id"], False),
+    ("ix_tender_created_at_id", "tender", ["createdAt", "id"], False),
+    ("ix_tender_service_type_created_at_id", "tender", ["serviceType", "createdAt", "id"], False),
+    ("ix_tender_organization_id", "tender", ["organizationId"], False),
+    ("ix_bid_tender_id_name_id", "bid", ["tenderId", "name", "id"], False),
+    ("ix_bid_author_id_created_at_id", "bid", ["authorId", "createdAt", "id"], False),
+    ("ix_tender_user_user_id_tender_id", "tender_user", ["userId", "tenderId"], True),
+    ("ix_tender_version_tender_id_version", "tenderVersion", ["tenderId", "version"], False),
+    ("ix_bid_version_bid_id_version", "bidVersion", ["bidId", "version"], False),
+    ("ix_bid_review_bid_author_id_created_at_id", "bidReview", ["bidAuthorId", "createdAt", "id"], False),
+    ("ix_bid_decision_users_bid_id", "BidDecisionUsers", ["bidId"], False),
+]
+
+
+def delete_duplicates(table, columns):
+    # Повторные строки членства/связей не несут информации, оставляем по одной
+    condition = " AND ".join(f'a."{column}" = b."{column}"' for column in columns)
+    op.execute(f'DELETE FROM "{table}" a USING "{table}" b WHERE {condition} AND a.ctid > b.ctid')
+
+
+def upgrade():
+    for name, table, columns, unique in indexes:
+        if unique:
+            delete_duplicates(table, columns)
+        op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(indexes):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,27 @@
+"""delta-encoded version history
+
+Revision ID: 0003_version_delta
+Revises: 0002_query_indexes
+Create Date: 2024-09-21 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0003_version_delta'
+down_revision = '0002_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("tenderVersion", sa.Column("delta", postgresql.JSONB()))
+    op.add_column("bidVersion", sa.Column("delta", postgresql.JSONB()))
+    op.alter_column("bidVersion", "status", nullable=True)
+
+
+def downgrade():
+    op.alter_column("bidVersion", "status", nullable=False)
+    op.drop_column("bidVersion", "delta")
+    op.drop_column("tenderVersion", "delta")
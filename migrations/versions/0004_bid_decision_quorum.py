@@ -0,0 +1,32 @@
+"""unique bid decisions and approval counter
+
+Revision ID: 0004_bid_decision_quorum
+Revises: 0003_version_delta
+Create Date: 2024-09-22 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004_bid_decision_quorum'
+down_revision = '0003_version_delta'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Повторный голос пользователя по тому же предложению кворум не меняет, оставляем первый
+    op.execute('DELETE FROM "BidDecisionUsers" a USING "BidDecisionUsers" b '
+               'WHERE a."bidId" = b."bidId" AND a.username = b.username AND a.ctid > b.ctid')
+    op.drop_index("ix_bid_decision_users_bid_id", table_name="BidDecisionUsers")
+    op.create_index("ix_bid_decision_users_bid_id_username", "BidDecisionUsers", ["bidId", "username"], unique=True)
+
+    op.add_column("bid", sa.Column("approvalCount", sa.Integer(), server_default="0", nullable=False))
+    op.execute('UPDATE bid SET "approvalCount" = (SELECT count(*) FROM "BidDecisionUsers" d '
+               'WHERE d."bidId" = bid.id AND d.decision = \'APPROVED\')')
+
+
+def downgrade():
+    op.drop_column("bid", "approvalCount")
+    op.drop_index("ix_bid_decision_users_bid_id_username", table_name="BidDecisionUsers")
+    op.create_index("ix_bid_decision_users_bid_id", "BidDecisionUsers", ["bidId"])
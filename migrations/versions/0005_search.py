@@ -0,0 +1,32 @@
+"""full-text and trigram search indexes
+
+Revision ID: 0005_search
+Revises: 0004_bid_decision_quorum
+Create Date: 2024-09-24 10:00:00
+
+"""
+from alembic import op
+
+revision = '0005_search'
+down_revision = '0004_bid_decision_quorum'
+branch_labels = None
+depends_on = None
+
+# Выражение совпадает с models.search_vector, иначе планировщик не использует индекс
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table in ("tender", "bid"):
+        op.execute(f"CREATE INDEX ix_{table}_search ON {table} USING gin (({SEARCH_VECTOR}))")
+        op.execute(f"CREATE INDEX ix_{table}_name_trgm ON {table} USING gin (name gin_trgm_ops)")
+
+
+def downgrade():
+    for table in ("bid", "tender"):
+        op.drop_index(f"ix_{table}_name_trgm", table_name=table)
+        op.drop_index(f"ix_{table}_search", table_name=table)
@@ -0,0 +1,53 @@
+"""materialized per-tender bid statistics
+
+Revision ID: 0006_tender_stats
+Revises: 0005_search
+Create Date: 2024-09-25 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0006_tender_stats'
+down_revision = '0005_search'
+branch_labels = None
+depends_on = None
+
+COUNTERS = ("bids", "bidsCreated", "bidsPublished", "bidsCanceled", "approvals", "rejections", "reviews")
+
+
+def upgrade():
+    op.add_column("bidReview", sa.Column("bidId", postgresql.UUID()))
+    op.create_table(
+        "tenderStats",
+        sa.Column("tenderId", postgresql.UUID(), sa.ForeignKey("tender.id", ondelete="CASCADE"), primary_key=True),
+        *(sa.Column(counter, sa.Integer(), server_default="0", nullable=False) for counter in COUNTERS),
+        sa.Column("updatedAt", sa.DateTime(), server_default=sa.func.now()),
+    )
+    # Отзывы до миграции не связаны с предложением и в счетчик не попадают
+    op.execute("""
+        INSERT INTO "tenderStats" ("tenderId", bids, "bidsCreated", "bidsPublished", "bidsCanceled", approvals, rejections)
+        SELECT b."tenderId",
+               count(*),
+               count(*) FILTER (WHERE b.status = 'CREATED'),
+               count(*) FILTER (WHERE b.status = 'PUBLISHED'),
+               count(*) FILTER (WHERE b.status = 'CANCELED'),
+               coalesce(sum(d.approvals), 0),
+               coalesce(sum(d.rejections), 0)
+        FROM bid b
+        JOIN tender t ON t.id = b."tenderId"
+        LEFT JOIN (
+            SELECT "bidId",
+                   count(*) FILTER (WHERE decision = 'APPROVED') AS approvals,
+                   count(*) FILTER (WHERE decision = 'REJECTED') AS rejections
+            FROM "BidDecisionUsers"
+            GROUP BY "bidId"
+        ) d ON d."bidId" = b.id
+        GROUP BY b."tenderId"
+    """)
+
+
+def downgrade():
+    op.drop_table("tenderStats")
+    op.drop_column("bidReview", "bidId")
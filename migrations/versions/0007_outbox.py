@@ -0,0 +1,40 @@
+"""transactional outbox
+
+Revision ID: 0007_outbox
+Revises: 0006_tender_stats
+Create Date: 2024-09-26 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0007_outbox'
+down_revision = '0006_tender_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("idempotencyKey", sa.String(200), nullable=False),
+        sa.Column("kind", sa.String(100), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("lastError", sa.Text()),
+        sa.Column("createdAt", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("availableAt", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("processedAt", sa.DateTime()),
+        sa.Column("failedAt", sa.DateTime()),
+    )
+    op.create_index("ix_outbox_idempotency_key", "outbox", ["idempotencyKey"], unique=True)
+    op.create_index("ix_outbox_pending_available_at_id", "outbox", ["availableAt", "id"],
+                    postgresql_where=sa.text('"processedAt" IS NULL AND "failedAt" IS NULL'))
+
+
+def downgrade():
+    op.drop_index("ix_outbox_pending_available_at_id", table_name="outbox")
+    op.drop_index("ix_outbox_idempotency_key", table_name="outbox")
+    op.drop_table("outbox")
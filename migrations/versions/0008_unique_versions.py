@@ -0,0 +1,33 @@
+"""unique entity versions in history
+
+Revision ID: 0008_unique_versions
+Revises: 0007_outbox
+Create Date: 2024-09-27 10:00:00
+
+"""
+from alembic import op
+
+revision = '0008_unique_versions'
+down_revision = '0007_outbox'
+branch_labels = None
+depends_on = None
+
+indexes = [
+    ("ix_tender_version_tender_id_version", "tenderVersion", "tenderId"),
+    ("ix_bid_version_bid_id_version", "bidVersion", "bidId"),
+]
+
+
+def upgrade():
+    for name, table, entity_column in indexes:
+        # Дубли номера версии оставлены параллельными правками в VERSION_MODE=none, оставляем первую запись
+        op.execute(f'DELETE FROM "{table}" a USING "{table}" b WHERE a."{entity_column}" = b."{entity_column}" '
+                   f'AND a.version = b.version AND a.ctid > b.ctid')
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, [entity_column, "version"], unique=True)
+
+
+def downgrade():
+    for name, table, entity_column in indexes:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, [entity_column, "version"])
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, ForeignKey, DateTime, func
-from database import Base
+from sqlalchemy import Column, BigInteger, Integer, String, Text, Enum, ForeignKey, DateTime, Index, JSON, func, literal_column, text
+from database import Base, version_mode
 import enum
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 
 class OrganizationType(str, enum.Enum):
@@ -39,10 +39,31 @@ class BibDecision(str, enum.Enum):
     REJECTED = 'Rejected'
 
 
+# В режиме cas ORM добавляет к UPDATE условие version = <прочитанная версия>, а новую версию задает приложение;
+# если строку успели изменить, UPDATE не затрагивает ни одной строки и поднимается StaleDataError
+def versioned(version_column) -> dict:
+    if version_mode != "cas":
+        return {"eager_defaults": True}
+    return {"eager_defaults": True, "version_id_col": version_column, "version_id_generator": False}
+
+
+# Документ полнотекстового поиска (search.py): название с весом A, описание с весом B.
+# Конфигурация и веса — литералы SQL, а не параметры, иначе выражение запроса не совпадет с выражением GIN-индекса
+SEARCH_CONFIG = "russian"
+
+
+def search_vector(name, description):
+    config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    empty = literal_column("''")
+    return func.setweight(func.to_tsvector(config, func.coalesce(name, empty)), literal_column("'A'")).op("||")(
+        func.setweight(func.to_tsvector(config, func.coalesce(description, empty)), literal_column("'B'"))
+    )
+
+
 class Employee(Base):
     __tablename__ = "employee"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     username = Column(String(50), unique=True, nullable=False)
     first_name = Column(String(50))
     last_name = Column(String(50))
@@ -53,7 +74,7 @@ class Employee(Base):
 class Organization(Base):
     __tablename__ = "organization"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
     description = Column(Text)
     type = Column(Enum(OrganizationType), nullable=False)
@@ -63,16 +84,25 @@ class Organization(Base):
 
 class OrganizationResponsible(Base):
     __tablename__ = "organization_responsible"
+    __table_args__ = (
+        Index("ix_organization_responsible_organization_id_user_id", "organization_id", "user_id", unique=True),
+        Index("ix_organization_responsible_user_id", "user_id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     organization_id = Column(UUID, ForeignKey('organization.id', ondelete='CASCADE'))
     user_id = Column(UUID, ForeignKey('employee.id', ondelete='CASCADE'))
 
 
 class Tender(Base):
     __tablename__ = "tender"
+    __table_args__ = (
+        Index("ix_tender_created_at_id", "createdAt", "id"),
+        Index("ix_tender_service_type_created_at_id", "serviceType", "createdAt", "id"),
+        Index("ix_tender_organization_id", "organizationId"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100))
     description = Column(String(500))
     serviceType = Column(Enum(TenderServiceType))
@@ -81,11 +111,17 @@ class Tender(Base):
     version = Column(Integer, default=1)
     createdAt = Column(DateTime, server_default=func.now())
 
+    __mapper_args__ = versioned(version)
+
 
 class Bid(Base):
     __tablename__ = 'bid'
+    __table_args__ = (
+        Index("ix_bid_tender_id_name_id", "tenderId", "name", "id"),
+        Index("ix_bid_author_id_created_at_id", "authorId", "createdAt", "id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100))
     description = Column(String(500))
     status = Column(Enum(BidStatus), default=BidStatus.CREATED)
@@ -93,53 +129,117 @@ class Bid(Base):
     authorType = Column(Enum(BidAuthorType))
     authorId = Column(UUID)
     version = Column(Integer, default=1)
+    approvalCount = Column(Integer, default=0, server_default="0", nullable=False)
     createdAt = Column(DateTime, server_default=func.now())
 
+    __mapper_args__ = versioned(version)
+
+
+# Индексы поиска по выражениям, поэтому объявлены после классов: GIN по документу и триграммы pg_trgm по названию
+Index("ix_tender_search", search_vector(Tender.name, Tender.description), postgresql_using="gin")
+Index("ix_tender_name_trgm", Tender.name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"})
+Index("ix_bid_search", search_vector(Bid.name, Bid.description), postgresql_using="gin")
+Index("ix_bid_name_trgm", Bid.name, postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"})
+
 
 class TenderUser(Base):
     __tablename__ = "tender_user"
+    __table_args__ = (
+        Index("ix_tender_user_user_id_tender_id", "userId", "tenderId", unique=True),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenderId = Column(UUID, ForeignKey('tender.id', ondelete='CASCADE'))
     userId = Column(UUID, ForeignKey('employee.id', ondelete='CASCADE'))
 
 
 class TenderVersion(Base):
     __tablename__ = "tenderVersion"
+    __table_args__ = (
+        Index("ix_tender_version_tender_id_version", "tenderId", "version", unique=True),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenderId = Column(UUID, ForeignKey('tender.id', ondelete='CASCADE'))
     name = Column(String(100))
     description = Column(String(500))
     serviceType = Column(Enum(TenderServiceType))
     status = Column(Enum(TenderStatus))
     version = Column(Integer, default=1)
+    delta = Column(JSON().with_variant(JSONB, "postgresql"))
 
 
 class BidVersion(Base):
     __tablename__ = 'bidVersion'
+    __table_args__ = (
+        Index("ix_bid_version_bid_id_version", "bidId", "version", unique=True),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bidId = Column(UUID, ForeignKey('bid.id', ondelete='CASCADE'))
     name = Column(String(100))
     description = Column(String(500))
-    status = Column(Enum(BidStatus), default=BidStatus.CREATED, nullable=False)
+    status = Column(Enum(BidStatus))
     version = Column(Integer, default=1)
+    delta = Column(JSON().with_variant(JSONB, "postgresql"))
 
 
 class BidReview(Base):
     __tablename__ = 'bidReview'
+    __table_args__ = (
+        Index("ix_bid_review_bid_author_id_created_at_id", "bidAuthorId", "createdAt", "id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bidAuthorId = Column(UUID)
+    bidId = Column(UUID)
     description = Column(String(1000))
     createdAt = Column(DateTime, server_default=func.now())
 
 
 class BidDecisionUsers(Base):
     __tablename__ = 'BidDecisionUsers'
+    __table_args__ = (
+        Index("ix_bid_decision_users_bid_id_username", "bidId", "username", unique=True),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=func.uuid_generate_v4())
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     bidId = Column(UUID, ForeignKey('bid.id', ondelete='CASCADE'))
     decision = Column(Enum(BibDecision))
     username = Column(String(100))
+
+
+# Счетчики предложений, решений и отзывов по тендеру (stats.py); обновляются в транзакции изменения
+class TenderStats(Base):
+    __tablename__ = 'tenderStats'
+
+    tenderId = Column(UUID, ForeignKey('tender.id', ondelete='CASCADE'), primary_key=True)
+    bids = Column(Integer, default=0, server_default="0", nullable=False)
+    bidsCreated = Column(Integer, default=0, server_default="0", nullable=False)
+    bidsPublished = Column(Integer, default=0, server_default="0", nullable=False)
+    bidsCanceled = Column(Integer, default=0, server_default="0", nullable=False)
+    approvals = Column(Integer, default=0, server_default="0", nullable=False)
+    rejections = Column(Integer, default=0, server_default="0", nullable=False)
+    reviews = Column(Integer, default=0, server_default="0", nullable=False)
+    updatedAt = Column(DateTime, server_default=func.now())
+
+
+# Побочные действия после изменения (outbox.py): пишутся в транзакции изменения, выполняются воркером
+class Outbox(Base):
+    __tablename__ = 'outbox'
+    __table_args__ = (
+        Index("ix_outbox_idempotency_key", "idempotencyKey", unique=True),
+        Index("ix_outbox_pending_available_at_id", "availableAt", "id",
+              postgresql_where=text('"processedAt" IS NULL AND "failedAt" IS NULL')),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    idempotencyKey = Column(String(200), nullable=False)
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    lastError = Column(Text)
+    createdAt = Column(DateTime, server_default=func.now(), nullable=False)
+    availableAt = Column(DateTime, server_default=func.now(), nullable=False)
+    processedAt = Column(DateTime)
+    failedAt = Column(DateTime)
@@ -0,0 +1,178 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import timedelta
+from typing import Callable, Dict
+
+import orjson
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+from metrics import OUTBOX_HANDLER_TIME, OUTBOX_MESSAGES, register_collector
+
+
+# ТРАНЗАКЦИОННЫЙ OUTBOX
+# Побочные действия после изменения (связь тендера с создателем) описаны обработчиками @outbox_handler;
+# то, что должно быть видно сразу после коммита изменения (кворум и закрытие тендера), в outbox не попадает.
+# OUTBOX_MODE: inline — обработчик выполняется сразу в транзакции запроса,
+#   outbox — перед коммитом в таблицу outbox пишется сообщение, его выполняет воркер: python outbox.py
+# Воркер берет сообщения пачками по OUTBOX_BATCH (FOR UPDATE SKIP LOCKED — несколько воркеров не мешают друг
+# другу), выполняет обработчик и отмечает сообщение в одной транзакции: после падения воркера пачка
+# откатывается целиком и будет выполнена заново. Ошибка обработчика — повтор с экспоненциальной задержкой,
+# после OUTBOX_MAX_ATTEMPTS попыток сообщение помечается failedAt. Повтор одного и того же действия
+# отсекает уникальный idempotencyKey (вид действия и ключ сущности).
+outbox_mode = os.getenv("OUTBOX_MODE", "inline")
+outbox_batch = int(os.getenv("OUTBOX_BATCH", "100"))
+outbox_poll_interval = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+outbox_max_attempts = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+outbox_retention = int(os.getenv("OUTBOX_RETENTION", "86400"))
+outbox_metrics_port = int(os.getenv("OUTBOX_METRICS_PORT", "0"))
+
+MAX_BACKOFF = 300
+PURGE_INTERVAL = 60
+
+logger = logging.getLogger("outbox")
+handlers: Dict[str, Callable] = {}
+
+
+def outbox_handler(kind: str):
+    def register(function):
+        handlers[kind] = function
+        return function
+    return register
+
+
+# В обоих режимах обработчик получает payload после JSON (UUID — строки), чтобы код не зависел от режима.
+# Сессии работают без autoflush: перед обработчиком в inline-режиме новые объекты сбрасываются в базу,
+# иначе Core-запросы обработчика их не видят (как не видит их и воркер до коммита)
+def run_or_enqueue(db: Session, kind: str, key, **payload):
+    idempotency_key = f"{kind}:{key}"
+    payload = orjson.loads(orjson.dumps(payload))
+    if outbox_mode != "outbox":
+        db.flush()
+        handlers[kind](db, payload, idempotency_key)
+        return
+    db.info.setdefault("outbox", {})[idempotency_key] = {
+        "idempotencyKey": idempotency_key, "kind": kind, "payload": payload
+    }
+
+
+@event.listens_for(Session, "before_commit")
+def write_messages(session):
+    messages = session.info.pop("outbox", None)
+    if messages:
+        session.execute(insert(models.Outbox.__table__).values(list(messages.values()))
+                        .on_conflict_do_nothing(index_elements=["idempotencyKey"]))
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_messages(session):
+    session.info.pop("outbox", None)
+
+
+def pending_messages():
+    return select(models.Outbox).where(
+        models.Outbox.processedAt.is_(None),
+        models.Outbox.failedAt.is_(None),
+        models.Outbox.availableAt <= func.now()
+    ).order_by(models.Outbox.availableAt, models.Outbox.id)
+
+
+def process_batch(db: Session) -> int:
+    messages = db.scalars(pending_messages().limit(outbox_batch).with_for_update(skip_locked=True)).all()
+    for message in messages:
+        started = time.perf_counter()
+        try:
+            with db.begin_nested():
+                handlers[message.kind](db, message.payload, message.idempotencyKey)
+        except Exception as error:
+            message.attempts += 1
+            message.lastError = repr(error)[:1000]
+            if message.attempts >= outbox_max_attempts:
+                message.failedAt = func.now()
+                OUTBOX_MESSAGES.labels(message.kind, "failed").inc()
+                logger.error("outbox message %s failed: %r", message.idempotencyKey, error)
+            else:
+                message.availableAt = func.now() + timedelta(seconds=min(2 ** message.attempts, MAX_BACKOFF))
+                OUTBOX_MESSAGES.labels(message.kind, "retried").inc()
+        else:
+            message.processedAt = func.now()
+            OUTBOX_MESSAGES.labels(message.kind, "processed").inc()
+        OUTBOX_HANDLER_TIME.labels(message.kind).observe(time.perf_counter() - started)
+    db.commit()
+    return len(messages)
+
+
+def purge_processed(db: Session):
+    db.execute(models.Outbox.__table__.delete().where(
+        models.Outbox.processedAt < func.now() - timedelta(seconds=outbox_retention)
+    ))
+    db.commit()
+
+
+# Отставание считается по базе, поэтому растет и когда воркер не запущен
+class OutboxCollector:
+    def collect(self):
+        pending = GaugeMetricFamily("outbox_pending", "Outbox messages waiting for the worker")
+        lag = GaugeMetricFamily("outbox_lag_seconds", "Age of the oldest pending outbox message")
+        failed = GaugeMetricFamily("outbox_failed", "Outbox messages that exhausted retries")
+        db = SessionLocal()
+        try:
+            row = db.execute(select(
+                func.count().filter(models.Outbox.processedAt.is_(None), models.Outbox.failedAt.is_(None)),
+                func.coalesce(func.extract("epoch", func.now() - func.min(models.Outbox.createdAt).filter(
+                    models.Outbox.processedAt.is_(None), models.Outbox.failedAt.is_(None)
+                )), 0),
+                func.count().filter(models.Outbox.failedAt.isnot(None)),
+            ).where(models.Outbox.processedAt.is_(None))).one()
+        finally:
+            db.close()
+        pending.add_metric([], row[0])
+        lag.add_metric([], float(row[1]))
+        failed.add_metric([], row[2])
+        return [pending, lag, failed]
+
+
+def register_outbox_metrics():
+    register_collector(OutboxCollector())
+
+
+def run(once: bool = False):
+    db = SessionLocal()
+    purged = 0.0
+    try:
+        while True:
+            processed = process_batch(db)
+            if time.monotonic() - purged > PURGE_INTERVAL:
+                purge_processed(db)
+                purged = time.monotonic()
+            if processed < outbox_batch:
+                if once:
+                    return
+                time.sleep(outbox_poll_interval)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    from prometheus_client import start_http_server
+
+    # Обработчики регистрируются при импорте модулей эндпоинтов в модуле outbox, а не в __main__
+    import outbox
+    import tenders  # noqa: F401
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--once", action="store_true", help="обработать все готовые сообщения и завершиться")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    if outbox_metrics_port:
+        outbox.register_outbox_metrics()
+        start_http_server(outbox_metrics_port)
+    outbox.run(once=args.once)
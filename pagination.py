@@ -0,0 +1,51 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, Float, Uuid, tuple_
+
+
+# Курсор — непрозрачный токен с ключом сортировки и id последней строки страницы
+def encode_cursor(values) -> str:
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else str(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [_parse(column, value) for column, value in zip(columns, values)]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Неверный формат запроса или его параметры.")
+
+
+def _parse(column, value):
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Uuid):
+        return UUID(value)
+    if isinstance(column.type, Float):
+        return float(value)
+    return value
+
+
+# cursor=None — прежняя пагинация limit/offset; пустая строка — первая страница в режиме курсора
+def paginate(query, columns, limit: int, offset: int, cursor: Optional[str], response: Response):
+    query = query.order_by(*columns)
+    if cursor is None:
+        return query.limit(limit).offset(offset).all()
+
+    if cursor:
+        query = query.filter(tuple_(*columns) > tuple_(*decode_cursor(cursor, columns)))
+    rows = query.limit(limit).all()
+
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor([getattr(last, column.key) for column in columns])
+    return rows
@@ -0,0 +1,117 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# БЮДЖЕТ SQL-ЗАПРОСОВ НА HTTP-ЗАПРОС
+# QUERY_DEBUG: off — выключено, log — превышение бюджета и повторяющиеся запросы (N+1) пишутся в лог
+#   со списком запросов, raise — то же плюс исключение QueryBudgetExceeded (для TestClient в проверках)
+# Бюджет по умолчанию — QUERY_BUDGET_COUNT запросов и QUERY_BUDGET_MS миллисекунд SQL, обработчик может
+# объявить свой через @query_budget. Запрос одной формы, выполненный QUERY_REPEAT_THRESHOLD раз и больше,
+# считается N+1.
+query_debug = os.getenv("QUERY_DEBUG", "off")
+query_budget_count = int(os.getenv("QUERY_BUDGET_COUNT", "20"))
+query_budget_ms = float(os.getenv("QUERY_BUDGET_MS", "200"))
+query_repeat_threshold = int(os.getenv("QUERY_REPEAT_THRESHOLD", "3"))
+
+logger = logging.getLogger("query_budget")
+
+recorded_statements: ContextVar[Optional[list]] = ContextVar("recorded_statements", default=None)
+
+PARAMETER = re.compile(r"%\(\w+\)s|\$\d+|\?")
+PARAMETER_LIST = re.compile(r"\?(\s*,\s*\?)+")
+WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(queries: Optional[int] = None, db_ms: Optional[float] = None):
+    def declare(endpoint):
+        endpoint.query_budget = (queries, db_ms)
+        return endpoint
+    return declare
+
+
+# Форма запроса: параметры и списки IN (...) любой длины сводятся к ?
+def statement_shape(statement: str) -> str:
+    shape = PARAMETER.sub("?", WHITESPACE.sub(" ", statement).strip())
+    return PARAMETER_LIST.sub("?", shape)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def start_statement(conn, cursor, statement, parameters, context, executemany):
+    if recorded_statements.get() is not None:
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    statements = recorded_statements.get()
+    if statements is not None and conn.info.get("statement_started"):
+        elapsed = time.perf_counter() - conn.info["statement_started"].pop()
+        statements.append((statement, elapsed))
+
+
+@event.listens_for(Engine, "handle_error")
+def discard_statement(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("statement_started"):
+        connection.info["statement_started"].pop()
+
+
+def check_budget(label: str, statements: list, budget) -> Optional[str]:
+    queries, db_ms = budget
+    queries = query_budget_count if queries is None else queries
+    db_ms = query_budget_ms if db_ms is None else db_ms
+    total_ms = sum(elapsed for _, elapsed in statements) * 1000
+
+    problems = []
+    if len(statements) > queries:
+        problems.append(f"{len(statements)} queries > budget {queries}")
+    if total_ms > db_ms:
+        problems.append(f"{total_ms:.1f} ms of SQL > budget {db_ms:.1f} ms")
+    repeated = [(shape, count) for shape, count in Counter(statement_shape(statement) for statement, _ in statements)
+                .items() if count >= query_repeat_threshold]
+    for shape, count in repeated:
+        problems.append(f"N+1: {count}x {shape[:200]}")
+    if not problems:
+        return None
+
+    lines = [f"{label}: " + "; ".join(problems)]
+    lines += [f"  {elapsed * 1000:8.2f} ms  {WHITESPACE.sub(' ', statement)[:300]}" for statement, elapsed in statements]
+    return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if query_debug == "off" or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        statements = []
+        token = recorded_statements.set(statements)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            recorded_statements.reset(token)
+
+        route = scope.get("route")
+        label = f"{scope['method']} {route.path if route else scope['path']}"
+        budget = getattr(getattr(route, "endpoint", None), "query_budget", (None, None))
+        report = check_budget(label, statements, budget)
+        if report is None:
+            return
+        logger.warning(report)
+        if query_debug == "raise":
+            raise QueryBudgetExceeded(report)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 from models import TenderStatus, BidStatus, TenderServiceType, BidAuthorType
 
@@ -66,3 +66,37 @@ class BidReview(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TenderStats(BaseModel):
+    tenderId: UUID
+    bids: int
+    bidsCreated: int
+    bidsPublished: int
+    bidsCanceled: int
+    approvals: int
+    rejections: int
+    reviews: int
+    updatedAt: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class StatusItem(BaseModel):
+    code: int
+    status: Optional[str] = None
+    reason: Optional[str] = None
+
+
+class BulkItem(BaseModel):
+    index: int
+    status: int
+    id: Optional[UUID] = None
+    reason: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    items: List[BulkItem]
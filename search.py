@@ -0,0 +1,289 @@
+import enum
+import heapq
+import os
+import re
+import threading
+import uuid
+from collections import Counter, defaultdict
+from typing import Callable, Optional
+
+from fastapi import Response
+from sqlalchemy import Float, cast, event, func, literal_column, or_, select
+from sqlalchemy.orm import Session, object_session
+
+import models
+from database import SessionLocal
+from pagination import decode_cursor, encode_cursor, paginate
+from serialization import list_query
+
+
+# ПОИСК ПО ТЕНДЕРАМ И ПРЕДЛОЖЕНИЯМ
+# SEARCH_BACKEND: postgres — tsvector по name и description (GIN-индексы ix_*_search) и триграммы pg_trgm
+#   по name (ix_*_name_trgm) для нечеткого поиска; memory — инвертированный индекс в памяти процесса:
+#   строится при первом поиске и обновляется после коммитов, нужен для разработки и проверки без Postgres
+# Выдача упорядочена по убыванию релевантности, затем по id; курсор — релевантность и id последней строки.
+# ts_rank_cd и similarity возвращают real: релевантность приводится к double precision, иначе значение из
+# курсора (десятичная запись real) не совпадает с ним при сравнении и строки с равной релевантностью теряются.
+RANK_TYPE = Float(53)
+search_backend = os.getenv("SEARCH_BACKEND", "postgres")
+search_load_batch = int(os.getenv("SEARCH_LOAD_BATCH", "10000"))
+
+RANK = "search_rank"
+# Порог оператора % в pg_trgm по умолчанию (pg_trgm.similarity_threshold)
+FUZZY_THRESHOLD = 0.3
+# Веса названия и описания, как у ts_rank_cd для весов A и B
+FIELD_WEIGHTS = (1.0, 0.4)
+ATTRIBUTES = {
+    models.Tender: ("status", "serviceType", "organizationId"),
+    models.Bid: ("status", "tenderId", "authorId"),
+}
+
+WORD = re.compile(r"\w+")
+
+
+def words(text: Optional[str]) -> list:
+    return WORD.findall(text.lower()) if text else []
+
+
+# Триграммы слова с теми же пробелами по краям, что и в pg_trgm
+def trigrams(word: str) -> set:
+    padded = f"  {word} "
+    return {padded[start:start + 3] for start in range(len(padded) - 2)}
+
+
+def attribute_value(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value.value if isinstance(value, enum.Enum) else str(value)
+
+
+class InvertedIndex:
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.grams = defaultdict(set)
+        self.documents = {}
+        self.lock = threading.Lock()
+        self.load_lock = threading.Lock()
+        self.loaded = False
+
+    def add(self, document_id: uuid.UUID, fields, attributes: dict):
+        weights = Counter()
+        for text, weight in zip(fields, FIELD_WEIGHTS):
+            for word in words(text):
+                weights[word] += weight
+
+        with self.lock:
+            self._remove(document_id)
+            for word, weight in weights.items():
+                if word not in self.postings:
+                    for gram in trigrams(word):
+                        self.grams[gram].add(word)
+                self.postings[word][document_id] = weight
+            self.documents[document_id] = (tuple(weights), attributes)
+
+    def remove(self, document_id: uuid.UUID):
+        with self.lock:
+            self._remove(document_id)
+
+    def _remove(self, document_id: uuid.UUID):
+        document = self.documents.pop(document_id, None)
+        if document is None:
+            return
+        for word in document[0]:
+            posting = self.postings[word]
+            posting.pop(document_id, None)
+            if not posting:
+                del self.postings[word]
+                for gram in trigrams(word):
+                    self.grams[gram].discard(word)
+
+    def attributes(self, document_id: uuid.UUID) -> Optional[dict]:
+        document = self.documents.get(document_id)
+        return document[1] if document else None
+
+    # Слова словаря с похожестью по триграммам не ниже порога, как similarity() в pg_trgm
+    def similar_words(self, word: str) -> dict:
+        grams = trigrams(word)
+        shared = Counter(candidate for gram in grams for candidate in self.grams.get(gram, ()))
+        similar = {}
+        for candidate, count in shared.items():
+            similarity = count / (len(grams) + len(trigrams(candidate)) - count)
+            if similarity >= FUZZY_THRESHOLD:
+                similar[candidate] = similarity
+        return similar
+
+    # Все слова запроса обязательны, как & в websearch_to_tsquery; при fuzzy слово совпадает и с похожими.
+    # Возвращает пары (-релевантность, id) после after в порядке выдачи
+    def search(self, query: str, fuzzy: bool = False, accept: Optional[Callable[[dict], bool]] = None,
+               limit: int = 5, after: Optional[tuple] = None) -> list:
+        query_words = words(query)
+        if not query_words:
+            return []
+
+        with self.lock:
+            scores = None
+            for word in query_words:
+                matches = self.similar_words(word) if fuzzy else {}
+                matches[word] = 1.0
+                word_scores = {}
+                for candidate, similarity in matches.items():
+                    for document_id, weight in self.postings.get(candidate, {}).items():
+                        word_scores[document_id] = max(word_scores.get(document_id, 0.0), weight * similarity)
+                if scores is not None:
+                    word_scores = {document_id: scores[document_id] + score
+                                   for document_id, score in word_scores.items() if document_id in scores}
+                scores = word_scores
+                if not scores:
+                    return []
+
+            ranked = [(-score, document_id) for document_id, score in scores.items()
+                      if accept is None or accept(self.documents[document_id][1])]
+
+        if after is not None:
+            ranked = [key for key in ranked if key > after]
+        return heapq.nsmallest(limit, ranked)
+
+
+indexes = {models.Tender: InvertedIndex(), models.Bid: InvertedIndex()}
+
+
+def document_id(value) -> Optional[uuid.UUID]:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    return uuid.UUID(str(value))
+
+
+# Атрибуты для фильтров; у предложения еще и организация тендера — для проверки видимости
+def document_attributes(model, values: dict) -> dict:
+    attributes = {name: attribute_value(values.get(name)) for name in ATTRIBUTES[model]}
+    if model is models.Bid:
+        tender_id = document_id(values.get("tenderId"))
+        tender = indexes[models.Tender].attributes(tender_id) if tender_id else None
+        attributes["organizationId"] = tender["organizationId"] if tender else None
+    return attributes
+
+
+def index_document(model, values: dict):
+    indexes[model].add(document_id(values["id"]), (values.get("name"), values.get("description")),
+                       document_attributes(model, values))
+
+
+def load_index(model) -> InvertedIndex:
+    index = indexes[model]
+    if index.loaded:
+        return index
+
+    with index.load_lock:
+        if not index.loaded:
+            if model is models.Bid:
+                load_index(models.Tender)
+            columns = [model.id, model.name, model.description, *(getattr(model, name) for name in ATTRIBUTES[model])]
+            db = SessionLocal()
+            try:
+                rows = db.execute(select(*columns).execution_options(yield_per=search_load_batch))
+                for row in rows:
+                    index_document(model, row._asdict())
+            finally:
+                db.close()
+            index.loaded = True
+    return index
+
+
+def search_rows(db: Session, model, schema, query: str, fuzzy: bool, filters: dict,
+                limit: int, offset: int, cursor: Optional[str], response: Response,
+                visible=None, accept: Optional[Callable[[dict], bool]] = None):
+    filters = {name: value for name, value in filters.items() if value is not None}
+    if search_backend == "memory":
+        return memory_search(db, model, schema, query, fuzzy, filters, limit, offset, cursor, response, accept)
+
+    config = literal_column(f"'{models.SEARCH_CONFIG}'::regconfig")
+    vector = models.search_vector(model.name, model.description)
+    ts_query = func.websearch_to_tsquery(config, query)
+    matched = vector.op("@@")(ts_query)
+    rank = cast(func.ts_rank_cd(vector, ts_query), RANK_TYPE)
+    if fuzzy:
+        matched = or_(matched, model.name.op("%")(query))
+        rank = rank + cast(func.similarity(model.name, query), RANK_TYPE)
+    ranked = (-rank).label(RANK)
+
+    rows = list_query(db, model, schema).add_columns(ranked).filter(
+        matched, *(getattr(model, name) == value for name, value in filters.items())
+    )
+    if visible is not None:
+        rows = rows.filter(visible)
+    return paginate(rows, [ranked, model.id], limit, offset, cursor, response)
+
+
+def memory_search(db: Session, model, schema, query: str, fuzzy: bool, filters: dict,
+                  limit: int, offset: int, cursor: Optional[str], response: Response,
+                  accept: Optional[Callable[[dict], bool]]):
+    index = load_index(model)
+    expected = {name: attribute_value(value) for name, value in filters.items()}
+
+    def accept_document(attributes: dict) -> bool:
+        if any(attributes.get(name) != value for name, value in expected.items()):
+            return False
+        return accept is None or accept(attributes)
+
+    # Как в paginate: при курсоре offset не используется, пустой курсор — первая страница
+    after = None
+    if cursor is not None:
+        offset = 0
+    if cursor:
+        after = tuple(decode_cursor(cursor, [literal_column(RANK, Float), model.id]))
+    ranked = index.search(query, fuzzy, accept_document, limit + offset, after)[offset:]
+
+    # Строки читаются из базы: индекс хранит только слова и атрибуты фильтров
+    ids = [key[1] for key in ranked]
+    found = {row.id: row for row in list_query(db, model, schema).filter(model.id.in_(ids)).all()} if ids else {}
+
+    if cursor is not None and ranked and len(ranked) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(ranked[-1])
+    return [found[key] for key in ids if key in found]
+
+
+# ОБНОВЛЕНИЕ ИНДЕКСА В ПАМЯТИ: измененные документы собираются в session.info и попадают в индекс после коммита
+def touch(session: Optional[Session], model, values: dict):
+    if search_backend == "memory" and session is not None:
+        session.info.setdefault("search_documents", []).append((model, values))
+
+
+def entity_values(model, target) -> dict:
+    return {name: getattr(target, name) for name in ("id", "name", "description", *ATTRIBUTES[model])}
+
+
+@event.listens_for(models.Tender, "after_insert")
+@event.listens_for(models.Tender, "after_update")
+def reindex_tender(mapper, connection, target):
+    touch(object_session(target), models.Tender, entity_values(models.Tender, target))
+
+
+@event.listens_for(models.Bid, "after_insert")
+@event.listens_for(models.Bid, "after_update")
+def reindex_bid(mapper, connection, target):
+    touch(object_session(target), models.Bid, entity_values(models.Bid, target))
+
+
+# Массовые вставки (bulk.py) идут мимо событий маппера
+@event.listens_for(Session, "do_orm_execute")
+def reindex_on_bulk_insert(orm_execute_state):
+    if search_backend != "memory" or not orm_execute_state.is_insert:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in indexes:
+        return
+    parameters = orm_execute_state.parameters
+    for row in parameters if isinstance(parameters, list) else [parameters or {}]:
+        if "id" in row:
+            touch(orm_execute_state.session, mapper.class_, row)
+
+
+@event.listens_for(Session, "after_commit")
+def apply_documents(session):
+    for model, values in session.info.pop("search_documents", ()):
+        index_document(model, values)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_documents(session):
+    session.info.pop("search_documents", None)
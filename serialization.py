@@ -0,0 +1,48 @@
+import os
+from typing import List
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from http_cache import conditional, rows_etag
+
+
+# СЕРИАЛИЗАЦИЯ СПИСКОВ
+# Списки читаются кортежами только тех колонок, которые есть в схеме ответа, без ORM-объектов и identity map.
+# SERIALIZATION_MODE: model — список проверяет FastAPI по response_model (поэлементно),
+#   adapter — весь список валидируется одним вызовом TypeAdapter и кодируется в JSON в pydantic-core
+serialization_mode = os.getenv("SERIALIZATION_MODE", "model")
+
+adapters = {}
+
+
+def list_adapter(schema) -> TypeAdapter:
+    if schema not in adapters:
+        adapters[schema] = TypeAdapter(List[schema])
+    return adapters[schema]
+
+
+def list_columns(model, schema) -> list:
+    return [getattr(model, field) for field in schema.model_fields]
+
+
+def list_query(db: Session, model, schema):
+    return db.query(*list_columns(model, schema))
+
+
+# Заголовки (X-Next-Cursor, ETag) переносятся из Response, который FastAPI передал в обработчик
+def list_response(rows, schema, response: Response, request: Request, public: bool = False):
+    not_modified = conditional(request, response, rows_etag(rows), public)
+    if not_modified is not None:
+        return not_modified
+
+    if serialization_mode == "model":
+        return rows
+
+    adapter = list_adapter(schema)
+    return Response(
+        content=adapter.dump_json(adapter.validate_python([row._asdict() for row in rows])),
+        media_type="application/json",
+        headers={key: value for key, value in response.headers.items() if key != "content-length"}
+    )
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+import sys
+import uuid
+from collections import Counter
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+
+# СТАТИСТИКА ПРЕДЛОЖЕНИЙ ПО ТЕНДЕРАМ
+# tenderStats хранит счетчики для каждого тендера: предложения по статусам, одобрения и отклонения, отзывы.
+# Обработчики копят изменения в session.info, перед коммитом они пишутся одним UPSERT в той же транзакции,
+# поэтому чтение статистики тендера — одна строка по первичному ключу независимо от числа предложений.
+# STATS_REBUILD_INTERVAL: раз в сколько секунд пересчитывать таблицу целиком (0 — только вручную:
+#   python stats.py rebuild)
+stats_rebuild_interval = int(os.getenv("STATS_REBUILD_INTERVAL", "0"))
+
+COUNTERS = ("bids", "bidsCreated", "bidsPublished", "bidsCanceled", "approvals", "rejections", "reviews")
+STATUS_COUNTERS = {
+    models.BidStatus.CREATED: "bidsCreated",
+    models.BidStatus.PUBLISHED: "bidsPublished",
+    models.BidStatus.CANCELED: "bidsCanceled",
+}
+DECISION_COUNTERS = {
+    models.BibDecision.APPROVED: "approvals",
+    models.BibDecision.REJECTED: "rejections",
+}
+# Ключ pg_advisory_xact_lock: пересчет из нескольких воркеров не выполняется одновременно
+REBUILD_LOCK = 0x7374617473
+
+logger = logging.getLogger("stats")
+
+
+def count(db: Session, tender_id, **deltas):
+    pending = db.info.setdefault("tender_stats", {})
+    pending.setdefault(uuid.UUID(str(tender_id)), Counter()).update(deltas)
+
+
+def count_new_bid(db: Session, tender_id, status=models.BidStatus.CREATED):
+    count(db, tender_id, bids=1, **{STATUS_COUNTERS[status]: 1})
+
+
+def set_bid_status(db: Session, bid: models.Bid, status: models.BidStatus):
+    if status != bid.status:
+        deltas = Counter()
+        if status in STATUS_COUNTERS:
+            deltas[STATUS_COUNTERS[status]] += 1
+        if bid.status in STATUS_COUNTERS:
+            deltas[STATUS_COUNTERS[bid.status]] -= 1
+        count(db, bid.tenderId, **deltas)
+    bid.status = status
+
+
+def count_decision(db: Session, tender_id, decision: models.BibDecision):
+    count(db, tender_id, **{DECISION_COUNTERS[decision]: 1})
+
+
+def count_review(db: Session, tender_id):
+    count(db, tender_id, reviews=1)
+
+
+def empty_stats(tender_id) -> dict:
+    return {"tenderId": tender_id, **{counter: 0 for counter in COUNTERS}, "updatedAt": None}
+
+
+def write_counts(db: Session, pending: dict):
+    rows = [{"tenderId": tender_id, **{counter: deltas[counter] for counter in COUNTERS}}
+            for tender_id, deltas in pending.items() if any(deltas.values())]
+    if not rows:
+        return
+
+    table = models.TenderStats.__table__
+    statement = insert(table).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["tenderId"],
+        set_={**{counter: table.c[counter] + statement.excluded[counter] for counter in COUNTERS},
+              "updatedAt": func.now()}
+    ))
+
+
+@event.listens_for(Session, "before_commit")
+def flush_counts(session):
+    pending = session.info.pop("tender_stats", None)
+    if pending:
+        write_counts(session, pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_counts(session):
+    session.info.pop("tender_stats", None)
+
+
+# Полный пересчет. LOCK TABLE ждет транзакции с незаписанными счетчиками и не пускает новые до конца пересчета,
+# иначе инкремент, закоммиченный во время пересчета, был бы перезаписан значением из старого снимка
+def rebuild_stats(db: Session) -> bool:
+    if not db.execute(select(func.pg_try_advisory_xact_lock(REBUILD_LOCK))).scalar_one():
+        return False
+    db.execute(text('LOCK TABLE "tenderStats" IN SHARE ROW EXCLUSIVE MODE'))
+
+    bid = models.Bid
+    bids = select(
+        bid.tenderId.label("tenderId"),
+        func.count().label("bids"),
+        *(func.count().filter(bid.status == status).label(counter) for status, counter in STATUS_COUNTERS.items())
+    ).group_by(bid.tenderId).subquery()
+    decisions = select(
+        bid.tenderId.label("tenderId"),
+        *(func.count().filter(models.BidDecisionUsers.decision == decision).label(counter)
+          for decision, counter in DECISION_COUNTERS.items())
+    ).join(models.BidDecisionUsers, models.BidDecisionUsers.bidId == bid.id).group_by(bid.tenderId).subquery()
+    reviews = select(
+        bid.tenderId.label("tenderId"),
+        func.count().label("reviews")
+    ).join(models.BidReview, models.BidReview.bidId == bid.id).group_by(bid.tenderId).subquery()
+
+    sources = {"bids": bids, "approvals": decisions, "rejections": decisions, "reviews": reviews}
+    sources.update({counter: bids for counter in STATUS_COUNTERS.values()})
+    rows = select(
+        models.Tender.id,
+        *(func.coalesce(sources[counter].c[counter], literal(0)) for counter in COUNTERS),
+        func.now()
+    ).select_from(models.Tender).outerjoin(bids, bids.c.tenderId == models.Tender.id) \
+        .outerjoin(decisions, decisions.c.tenderId == models.Tender.id) \
+        .outerjoin(reviews, reviews.c.tenderId == models.Tender.id)
+
+    table = models.TenderStats.__table__
+    statement = insert(table).from_select(["tenderId", *COUNTERS, "updatedAt"], rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["tenderId"],
+        set_={column: statement.excluded[column] for column in (*COUNTERS, "updatedAt")}
+    ))
+    db.commit()
+    return True
+
+
+def rebuild() -> bool:
+    db = SessionLocal()
+    try:
+        return rebuild_stats(db)
+    finally:
+        db.close()
+
+
+async def rebuild_periodically():
+    while True:
+        await asyncio.sleep(stats_rebuild_interval)
+        try:
+            await run_in_threadpool(rebuild)
+        except Exception:
+            logger.exception("tender stats rebuild failed")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python stats.py rebuild")
+
+    print("rebuilt" if rebuild() else "rebuild is already running")
@@ -0,0 +1,68 @@
+import os
+from typing import Dict, List
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import models
+import schemas
+from bulk import parse_uuid
+from http_cache import conditional, etag
+
+
+# ПАКЕТНОЕ ЧТЕНИЕ СТАТУСОВ
+# Статусы до STATUS_BATCH_MAX тендеров или предложений за один HTTP-запрос и постоянное число запросов к базе:
+# пользователь, сущности по списку id и членство пользователя в их организациях.
+# Ответ — словарь по id; ошибка отдельного id (формат, не найден, нет прав) не мешает остальным.
+status_batch_max = int(os.getenv("STATUS_BATCH_MAX", "100"))
+
+BAD_REQUEST = "Неверный формат запроса или его параметры."
+FORBIDDEN = "Недостаточно прав для выполнения действия."
+
+
+def check_batch_size(ids: List[str]):
+    if not ids or len(ids) > status_batch_max:
+        raise HTTPException(status_code=400, detail=BAD_REQUEST)
+
+
+# organization_column — организация, ответственным за которую нужно быть; owner_column — автор,
+# которому статус доступен без этой проверки
+def batch_statuses(db: Session, user: models.Employee, model, ids: List[str], organization_column,
+                   not_found: str, forbidden_code: int, owner_column=None) -> Dict[str, schemas.StatusItem]:
+    parsed = {raw: parse_uuid(raw) for raw in dict.fromkeys(ids)}
+    entity_ids = {entity_id for entity_id in parsed.values() if entity_id is not None}
+
+    columns = [model.id, model.status, organization_column.label("organizationId")]
+    if owner_column is not None:
+        columns.append(owner_column.label("ownerId"))
+    rows = {row.id: row for row in db.execute(select(*columns).where(model.id.in_(entity_ids)))} if entity_ids else {}
+
+    organizations = {row.organizationId for row in rows.values() if row.organizationId is not None}
+    memberships = {str(organization_id) for organization_id in db.scalars(
+        select(models.OrganizationResponsible.organization_id).where(
+            models.OrganizationResponsible.user_id == user.id,
+            models.OrganizationResponsible.organization_id.in_(organizations)
+        )
+    )} if organizations else set()
+
+    items = {}
+    for raw, entity_id in parsed.items():
+        row = rows.get(entity_id)
+        if entity_id is None:
+            items[raw] = schemas.StatusItem(code=400, reason=BAD_REQUEST)
+        elif row is None:
+            items[raw] = schemas.StatusItem(code=404, reason=not_found)
+        elif (owner_column is not None and row.ownerId == user.id) or str(row.organizationId) in memberships:
+            items[raw] = schemas.StatusItem(code=200, status=row.status.value)
+        else:
+            items[raw] = schemas.StatusItem(code=forbidden_code, reason=FORBIDDEN)
+    return items
+
+
+def statuses_response(items: Dict[str, schemas.StatusItem], request: Request, response: Response):
+    tag = etag(*(f"{key}:{item.code}:{item.status}" for key, item in sorted(items.items())))
+    not_modified = conditional(request, response, tag)
+    if not_modified is not None:
+        return not_modified
+    return items
@@ -1,9 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 import schemas
 import models
 from database import get_db
-from typing import List, Optional
+from pagination import paginate
+from serialization import list_columns, list_query, list_response
+from history import add_snapshot, load_version
+from bulk import bulk_items, import_tenders
+from list_cache import TENDERS_GENERATION, cached_list_response
+from http_cache import conditional, entity_etag
+from export import ExportFormat, export_response, history_statement
+from search import search_rows
+from events import publish
+from outbox import outbox_handler, run_or_enqueue
+from stats import COUNTERS as STATS_COUNTERS, empty_stats
+from status_batch import batch_statuses, check_batch_size, statuses_response
+from query_budget import query_budget
+from versioning import expected_version, next_version
+from identity import resolve_identity, remember_responsible, remembered_responsible, remember_user, remembered_user
+from typing import Dict, List, Optional
+import uuid
 
 router = APIRouter()
 
@@ -39,6 +57,22 @@ error_responses = {
                 "example": {"reason": "Тендер не найден."}
             }
         }
+    },
+    409: {
+        "description": "Версия изменена параллельным запросом.",
+        "content": {
+            "application/json": {
+                "example": {"reason": "Версия изменена параллельным запросом."}
+            }
+        }
+    },
+    412: {
+        "description": "Версия изменилась.",
+        "content": {
+            "application/json": {
+                "example": {"reason": "Версия изменилась."}
+            }
+        }
     }
 }
 
@@ -47,17 +81,20 @@ error_responses = {
             responses={
                 400: error_responses[400]
             })
-def get_tenders(limit: int = 5, offset: int = 0,
+def get_tenders(request: Request, response: Response,
+                limit: int = 5, offset: int = 0,
                 service_type: Optional[models.TenderServiceType] = None,
+                cursor: Optional[str] = None,
                 db: Session = Depends(get_db)):
-    query = db.query(models.Tender)
+    def load_tenders():
+        query = list_query(db, models.Tender, schemas.Tender)
 
-    if service_type:
-        query = query.filter(models.Tender.serviceType == service_type)
+        if service_type:
+            query = query.filter(models.Tender.serviceType == service_type)
 
-    response = query.limit(limit).offset(offset).all()
+        return paginate(query, [models.Tender.createdAt, models.Tender.id], limit, offset, cursor, response)
 
-    return response
+    return cached_list_response(request, response, TENDERS_GENERATION, schemas.Tender, load_tenders, public=True)
 
 
 @router.post("/new", response_model=schemas.Tender,
@@ -66,50 +103,179 @@ def get_tenders(limit: int = 5, offset: int = 0,
                  403: error_responses[403],
              })
 def create_tender(tender: schemas.TenderCreate, db: Session = Depends(get_db)):
-    user = get_user_by_username(tender.creatorUsername, db)
+    user = resolve_identity(db, tender.creatorUsername, organization_id=tender.organizationId).user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
     check_organization_responsible(db, user_id=user.id, organization_id=tender.organizationId)
 
     db_tender = models.Tender(
+        id=uuid.uuid4(),
         name=tender.name,
         description=tender.description,
         serviceType=tender.serviceType,
-        organizationId=tender.organizationId
+        status=models.TenderStatus.CREATED,
+        organizationId=tender.organizationId,
+        version=1
     )
 
     db.add(db_tender)
+    add_tender_backup(db, db_tender)
+    run_or_enqueue(db, "tender.link_user", db_tender.id, tenderId=db_tender.id, userId=user.id)
     db.commit()
-    db.refresh(db_tender)
 
-    add_tender_backup(db, db_tender)
+    return db_tender
 
-    add_tender_user(db, tenderId=db_tender.id, userId=user.id)
 
-    return db_tender
+@router.post("/bulk", response_model=schemas.BulkResult,
+             responses={
+                 400: error_responses[400]
+             })
+def create_tenders_bulk(items: list = Depends(bulk_items), db: Session = Depends(get_db)):
+    return import_tenders(db, items)
+
+
+@router.get("/export",
+            responses={
+                400: error_responses[400]
+            })
+def export_tenders(format: ExportFormat = "ndjson",
+                   organizationId: Optional[uuid.UUID] = None,
+                   service_type: Optional[models.TenderServiceType] = None):
+    statement = select(*list_columns(models.Tender, schemas.Tender))
+
+    if organizationId:
+        statement = statement.where(models.Tender.organizationId == organizationId)
+    if service_type:
+        statement = statement.where(models.Tender.serviceType == service_type)
+
+    statement = statement.order_by(models.Tender.createdAt, models.Tender.id)
+    return export_response(statement, format, "tenders")
+
+
+@router.get("/history/export",
+            responses={
+                400: error_responses[400],
+                401: error_responses[401],
+                403: error_responses[403]
+            })
+def export_tenders_history(username: str, organizationId: uuid.UUID, format: ExportFormat = "ndjson",
+                           db: Session = Depends(get_db)):
+    user = resolve_identity(db, username, organization_id=str(organizationId)).user
+    if not user:
+        raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
+
+    check_organization_responsible(db, user_id=user.id, organization_id=organizationId)
+
+    statement = history_statement(models.TenderVersion, models.Tender, "tenderId",
+                                  models.Tender.organizationId == organizationId)
+    return export_response(statement, format, "tender_history")
 
 
 @router.get("/my", response_model=List[schemas.Tender],
             responses={
                 401: error_responses[401]
             })
-def get_user_tenders(username: str,
+def get_user_tenders(username: str, request: Request, response: Response,
                      limit: int = 5, offset: int = 0,
+                     cursor: Optional[str] = None,
                      db: Session = Depends(get_db)):
     user = get_user_by_username(username, db)
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
-    tender_user = db.query(models.TenderUser).filter(
-        models.TenderUser.userId == user.id
-    ).all()
+    tenders = user_tenders_query(db, user.id)
+    tenders = paginate(tenders, [models.Tender.createdAt, models.Tender.id], limit, offset, cursor, response)
+
+    return list_response(tenders, schemas.Tender, response, request)
+
+
+@router.get("/search", response_model=List[schemas.Tender],
+            responses={
+                400: error_responses[400]
+            })
+def search_tenders(q: str, request: Request, response: Response,
+                   limit: int = 5, offset: int = 0,
+                   fuzzy: bool = False,
+                   status: Optional[models.TenderStatus] = None,
+                   service_type: Optional[models.TenderServiceType] = None,
+                   organizationId: Optional[uuid.UUID] = None,
+                   cursor: Optional[str] = None,
+                   db: Session = Depends(get_db)):
+    filters = {"status": status, "serviceType": service_type, "organizationId": organizationId}
+    tenders = search_rows(db, models.Tender, schemas.Tender, q, fuzzy, filters, limit, offset, cursor, response)
+
+    return list_response(tenders, schemas.Tender, response, request, public=True)
+
+
+# Статусы нескольких тендеров: ?ids=...&ids=..., не больше STATUS_BATCH_MAX
+@router.get("/status", response_model=Dict[str, schemas.StatusItem], response_model_exclude_none=True,
+            responses={
+                400: error_responses[400],
+                401: error_responses[401]
+            })
+@query_budget(queries=3)
+def get_tenders_status(username: str, request: Request, response: Response,
+                       ids: List[str] = Query(...),
+                       db: Session = Depends(get_db)):
+    check_batch_size(ids)
+    user = get_user_by_username(username, db)
+    if not user:
+        raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
+
+    items = batch_statuses(db, user, models.Tender, ids, models.Tender.organizationId,
+                           not_found="Тендер не найден.", forbidden_code=403)
+    return statuses_response(items, request, response)
+
+
+# Дашборд организации: счетчики по каждому тендеру, одна строка tenderStats на тендер страницы
+@router.get("/stats", response_model=List[schemas.TenderStats],
+            responses={
+                400: error_responses[400],
+                401: error_responses[401],
+                403: error_responses[403]
+            })
+def get_organization_stats(username: str, organizationId: uuid.UUID, response: Response,
+                           limit: int = 5, offset: int = 0,
+                           cursor: Optional[str] = None,
+                           db: Session = Depends(get_db)):
+    user = resolve_identity(db, username, organization_id=str(organizationId)).user
+    if not user:
+        raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
+
+    check_organization_responsible(db, user_id=user.id, organization_id=organizationId)
+
+    tender_id = models.Tender.id.label("tenderId")
+    stats = db.query(
+        models.Tender.createdAt, tender_id,
+        *(func.coalesce(getattr(models.TenderStats, counter), 0).label(counter) for counter in STATS_COUNTERS),
+        models.TenderStats.updatedAt
+    ).outerjoin(models.TenderStats, models.TenderStats.tenderId == models.Tender.id).filter(
+        models.Tender.organizationId == organizationId
+    )
+    return paginate(stats, [models.Tender.createdAt, tender_id], limit, offset, cursor, response)
+
 
-    tender_ids = [row.tenderId for row in tender_user]
-    tenders = db.query(models.Tender).filter(models.Tender.id.in_(tender_ids))
+@router.get("/{tenderId}/stats", response_model=schemas.TenderStats,
+            responses={
+                401: error_responses[401],
+                403: error_responses[403],
+                404: error_responses[404]
+            })
+def get_tender_stats(tenderId: str, username: str, db: Session = Depends(get_db)):
+    identity = resolve_identity(db, username, tender_id=tenderId)
+    tender = identity.tender
+    if not tender:
+        raise HTTPException(status_code=404, detail="Тендер не найден.")
 
-    response = tenders.limit(limit).offset(offset).all()
-    return response
+    user = identity.user
+    if not user:
+        raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
+
+    check_organization_responsible(db, user_id=user.id, organization_id=tender.organizationId)
+
+    stats = db.get(models.TenderStats, tender.id)
+    return stats if stats is not None else empty_stats(tender.id)
 
 
 @router.get("/{tenderId}/status",
@@ -118,16 +284,21 @@ def get_user_tenders(username: str,
                 403: error_responses[403],
                 404: error_responses[404]
             })
-def get_tender_status(tenderId: str, username: str = "", db: Session = Depends(get_db)):
-    tender = db.query(models.Tender).get(tenderId)
+def get_tender_status(tenderId: str, request: Request, response: Response, username: str = "",
+                      db: Session = Depends(get_db)):
+    identity = resolve_identity(db, username, tender_id=tenderId)
+    tender = identity.tender
     if not tender:
         raise HTTPException(status_code=404, detail="Тендер не найден.")
 
-    user = get_user_by_username(username, db)
+    user = identity.user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
     check_organization_responsible(db, user_id=user.id, organization_id=tender.organizationId)
+    not_modified = conditional(request, response, entity_etag(tender))
+    if not_modified is not None:
+        return not_modified
     return tender.status
 
 
@@ -139,21 +310,21 @@ def get_tender_status(tenderId: str, username: str = "", db: Session = Depends(g
                 404: error_responses[404]
             })
 def put_tender_status(tenderId: str, status: models.TenderStatus, username: str, db: Session = Depends(get_db)):
-    tender = db.query(models.Tender).get(tenderId)
+    identity = resolve_identity(db, username, tender_id=tenderId)
+    tender = identity.tender
     if not tender:
         raise HTTPException(status_code=404, detail="Тендер не найден.")
 
     if tender.status == models.TenderStatus.CREATED or tender.status == models.TenderStatus.CLOSED:
-        user = get_user_by_username(username, db)
+        user = identity.user
         if not user:
             raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
         check_organization_responsible(db, user_id=user.id, organization_id=tender.organizationId)
 
     tender.status = status
-    db.add(tender)
+    publish(db, "tender.status", tender.id, tender.organizationId, status=status, version=tender.version)
     db.commit()
-    db.refresh(tender)
 
     return tender
 
@@ -170,19 +341,24 @@ def put_tender_status(tenderId: str, status: models.TenderStatus, username: str,
                   },
                   401: error_responses[401],
                   403: error_responses[403],
-                  404: error_responses[404]
+                  404: error_responses[404],
+                  409: error_responses[409],
+                  412: error_responses[412]
               })
-def update_tender(tenderId: str, username: str, tender_update: schemas.TenderUpdate, db: Session = Depends(get_db)):
-    db_tender = db.query(models.Tender).get(tenderId)
+def update_tender(tenderId: str, username: str, tender_update: schemas.TenderUpdate,
+                  if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    identity = resolve_identity(db, username, tender_id=tenderId)
+    db_tender = identity.tender
     if not db_tender:
         raise HTTPException(status_code=404, detail="Тендер не найден.")
 
-    user = get_user_by_username(username, db)
+    user = identity.user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
     check_organization_responsible(db, user_id=user.id, organization_id=db_tender.organizationId)
 
+    next_version(db, db_tender, expected_version(if_match))
     if tender_update.name is not None:
         db_tender.name = tender_update.name
     if tender_update.description is not None:
@@ -190,11 +366,10 @@ def update_tender(tenderId: str, username: str, tender_update: schemas.TenderUpd
     if tender_update.serviceType is not None:
         db_tender.serviceType = tender_update.serviceType
 
-    db_tender.version += 1
-    db.commit()
-    db.refresh(db_tender)
-
     add_tender_backup(db, db_tender)
+    publish(db, "tender.updated", db_tender.id, db_tender.organizationId,
+            status=db_tender.status, version=db_tender.version)
+    db.commit()
 
     return db_tender
 
@@ -211,79 +386,84 @@ def update_tender(tenderId: str, username: str, tender_update: schemas.TenderUpd
                             "example": {"reason": "Тендер или версия не найдены."}
                         }
                     }
-                }
+                },
+                409: error_responses[409],
+                412: error_responses[412]
             })
-def rollback_tender(tenderId: str, version: int, username: str, db: Session = Depends(get_db)):
-    db_tender = db.query(models.Tender).get(tenderId)
+def rollback_tender(tenderId: str, version: int, username: str,
+                    if_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    identity = resolve_identity(db, username, tender_id=tenderId)
+    db_tender = identity.tender
     if not db_tender:
         raise HTTPException(status_code=404, detail="Тендер или версия не найдены.")
 
-    user = get_user_by_username(username, db)
+    user = identity.user
     if not user:
         raise HTTPException(status_code=401, detail="Пользователь не существует или некорректен.")
 
     check_organization_responsible(db, user_id=user.id, organization_id=db_tender.organizationId)
 
-    db_tender_history = db.query(models.TenderVersion).filter(
-        models.TenderVersion.tenderId == tenderId,
-        models.TenderVersion.version == version
-    ).first()
+    db_tender_history = load_version(db, models.Tender, tenderId, version)
 
     if not db_tender_history:
         raise HTTPException(status_code=404, detail="Тендер или версия не найдены.")
 
+    next_version(db, db_tender, expected_version(if_match))
     db_tender.name = db_tender_history.name
     db_tender.description = db_tender_history.description
     db_tender.serviceType = db_tender_history.serviceType
     db_tender.status = db_tender_history.status
-    db_tender.version += 1
-
-    db.commit()
-    db.refresh(db_tender)
-
     add_tender_backup(db, db_tender)
+    publish(db, "tender.rollback", db_tender.id, db_tender.organizationId,
+            status=db_tender.status, version=db_tender.version)
+    db.commit()
 
     return db_tender
 
 
 def check_organization_responsible(db: Session, user_id: str, organization_id: str):
-    query = db.query(models.OrganizationResponsible).filter(
-        models.OrganizationResponsible.organization_id == organization_id,
-        models.OrganizationResponsible.user_id == user_id
-    ).first()
+    query = remembered_responsible(db, user_id, organization_id)
+    if query is None:
+        query = db.query(models.OrganizationResponsible).filter(
+            models.OrganizationResponsible.organization_id == organization_id,
+            models.OrganizationResponsible.user_id == user_id
+        ).first() is not None
+        remember_responsible(db, user_id, organization_id, query)
 
     if not query:
         raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения действия.")
 
 
 def add_tender_backup(db: Session, tender: models.Tender):
-    tender = models.TenderVersion(
-        tenderId=tender.id,
-        name=tender.name,
-        description=tender.description,
-        serviceType=tender.serviceType,
-        status=tender.status,
-        version=tender.version
-    )
+    return add_snapshot(db, tender)
 
-    db.add(tender)
-    db.commit()
-    db.refresh(tender)
 
-    return tender
+# Тендеры пользователя одним запросом: join по индексу tender_user (userId, tenderId)
+def user_tenders_query(db: Session, user_id):
+    return list_query(db, models.Tender, schemas.Tender).join(
+        models.TenderUser, models.TenderUser.tenderId == models.Tender.id
+    ).filter(models.TenderUser.userId == user_id)
 
 
-def add_tender_user(db: Session, tenderId: models.Tender.id, userId: models.Employee.id):
-    db_tender_user = models.TenderUser(
-        tenderId=tenderId,
-        userId=userId
+# Повтор сообщения outbox не создает вторую связь: уникальный индекс (userId, tenderId)
+@outbox_handler("tender.link_user")
+def add_tender_user(db: Session, payload: dict, idempotency_key: str):
+    db.execute(
+        insert(models.TenderUser).values(id=uuid.uuid4(), tenderId=uuid.UUID(payload["tenderId"]),
+                                         userId=uuid.UUID(payload["userId"]))
+        .on_conflict_do_nothing(index_elements=["userId", "tenderId"])
     )
-    db.add(db_tender_user)
-    db.commit()
-    db.refresh(db_tender_user)
 
 
 def get_user_by_username(username: str, db: Session):
-    return db.query(models.Employee).filter(
+    user = remembered_user(db, username)
+    if user is not None:
+        return user
+
+    user = db.query(models.Employee).filter(
         models.Employee.username == username
     ).first()
+    if user is not None:
+        remember_user(db, user)
+
+    return user
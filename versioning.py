@@ -0,0 +1,38 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from database import version_mode
+from http_cache import entity_etag, matches
+
+
+# If-Match: ETag из ответа GET .../status (W/"<хэш>", см. http_cache.entity_etag) или ожидаемая версия —
+# "3", W/"3" или 3; * и пустое значение — без проверки
+def expected_version(if_match: Optional[str]) -> Optional[str]:
+    if if_match is None:
+        return None
+    value = if_match.strip()
+    if value.removeprefix("W/").strip('"') in ("", "*"):
+        return None
+    return value
+
+
+def version_of(if_match: str) -> Optional[int]:
+    try:
+        return int(if_match.removeprefix("W/").strip('"'))
+    except ValueError:
+        return None
+
+
+# Новая версия сущности. Вызывается до изменения полей: в режиме lock строка перечитывается под FOR UPDATE,
+# в режиме cas условие на прочитанную версию проверяет сам UPDATE при flush (см. models.versioned).
+# Ожидание сверяется сначала с ETag сущности, затем как номер версии; несовпадение — 412
+def next_version(db: Session, entity, expected: Optional[str] = None) -> int:
+    if version_mode == "lock":
+        db.refresh(entity, with_for_update=True)
+    if expected is not None and not matches(expected, entity_etag(entity)) \
+            and version_of(expected) != entity.version:
+        raise HTTPException(status_code=412, detail="Версия изменилась.")
+    entity.version += 1
+    return entity.version